@@ -1,23 +1,76 @@
 # =====================================================
 # IMPORTS
 # =====================================================
+# Only light modules are imported here. Plotly and the analysis /
+# storage modules are imported by the pages that use them (lazy_import),
+# so the static pages render without paying for them.
+import hashlib
+import importlib
+import io
+import sys
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-from data_loader import load_income_statement, load_balance_sheet
-from validator import validate_income_statement, validate_balance_sheet
-from financial_metrics import merge_financials, compute_financial_ratios
-from forecasting import forecast_financials, calculate_break_even_revenue
-from cashflow import compute_cash_flow
-from insights import generate_insights
-from storage import (
-    init_db,
-    save_scenario,
-    load_scenarios,
-    load_scenario_forecast,
-    delete_scenario
-)
+
+import profiler
+
+# =====================================================
+# LAZY IMPORTS
+# =====================================================
+def lazy_import(name):
+    """Import a module on first use; the import is a profiled stage."""
+    module = sys.modules.get(name)
+    if module is None:
+        with profiler.stage(f"import {name}"):
+            module = importlib.import_module(name)
+    return module
+
+
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    """Storage module with the database initialised once per process."""
+    storage = lazy_import("storage")
+    storage.init_db()
+    return storage
+
+
+@st.cache_resource(show_spinner=False)
+def get_history():
+    """History module with its database opened once per process."""
+    history = lazy_import("history")
+    history.init_db()
+    return history
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_queue():
+    """
+    Shared write-behind queue for scenario saves and deletes, so a
+    rerun never waits on SQLite (flushed when the server exits).
+    """
+    get_storage()
+    return lazy_import("write_queue").get_queue()
+
+
+def show_write_status():
+    """Status of this session's queued scenario writes."""
+    tickets = st.session_state.setdefault("write_tickets", [])
+    if not tickets:
+        return
+
+    status = get_write_queue().status(tickets)
+    records = status["tickets"].values()
+    pending = sum(r["status"] == "pending" for r in records)
+    failed = [r for r in records if r["status"] == "failed"]
+
+    if pending:
+        st.info(f"⏳ {pending} scenario write(s) pending")
+    for record in failed:
+        st.error(f"Scenario {record['operation']} failed: {record['error']}")
+    if not pending:
+        # Finished tickets have been reported once; stop tracking them
+        st.session_state.write_tickets = []
+        if not failed:
+            st.success("All scenario changes saved")
 
 # =====================================================
 # PAGE ORDER + SESSION STATE
@@ -37,6 +90,75 @@ PAGES = [
 if "page" not in st.session_state:
     st.session_state.page = "Overview"
 
+# =====================================================
+# CACHED COMPUTATIONS
+# =====================================================
+# Stage results are keyed by a content hash of the uploaded bytes plus
+# the validation mode and mapping version. Arguments starting with "_"
+# are not hashed by Streamlit, so large inputs are only hashed once.
+CACHE_ENTRIES = 16
+
+LOADERS = {
+    "income": ("load_income_statement", "validate_income_statement"),
+    "balance": ("load_balance_sheet", "validate_balance_sheet")
+}
+
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def cached_load(kind, file_key, mapping_version, _data):
+    load = getattr(lazy_import("data_loader"), LOADERS[kind][0])
+    return load(io.BytesIO(_data))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def cached_validate(kind, file_key, mode, mapping_version, _data):
+    df = cached_load(kind, file_key, mapping_version, _data)
+    validate = getattr(lazy_import("validator"), LOADERS[kind][1])
+    return validate(df, mode=mode)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def cached_merge(merged_key, _income, _balance):
+    financial_metrics = lazy_import("financial_metrics")
+    return financial_metrics.merge_financials(_income, _balance)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def cached_ratios(merged_key, _merged_df):
+    financial_metrics = lazy_import("financial_metrics")
+    return financial_metrics.compute_financial_ratios(_merged_df)
+
+
+@st.cache_data(max_entries=64)
+def cached_tornado(merged_key, _merged_df, base_inputs, deltas,
+                   years_ahead, frequency, seasonality):
+    return lazy_import("sensitivity").tornado_analysis(
+        _merged_df,
+        base_inputs=dict(base_inputs),
+        deltas=dict(deltas),
+        years_ahead=years_ahead,
+        frequency=frequency,
+        seasonality=seasonality
+    )
+
+# =====================================================
+# CHARTS
+# =====================================================
+def plot_chart(kind, *args, **kwargs):
+    """Build a Plotly Express figure (px.<kind>) and render it."""
+    px = lazy_import("plotly.express")
+    with profiler.stage("app.plot_chart"):
+        fig = getattr(px, kind)(*args, **kwargs)
+        st.plotly_chart(fig, use_container_width=True)
+
 # =====================================================
 # PAGE NAVIGATION BUTTONS
 # =====================================================
@@ -68,11 +190,6 @@ st.set_page_config(
 st.title("📊 Financial Decision Support System")
 st.caption("Financial Analysis • Forecasting • Break-Even • Cash-Flow • Scenarios")
 
-# =====================================================
-# INIT DATABASE
-# =====================================================
-init_db()
-
 # =====================================================
 # SIDEBAR NAVIGATION
 # =====================================================
@@ -90,15 +207,30 @@ validation_mode = st.sidebar.selectbox(
     index=0
 )
 
+# Each session profiles into its own recorder, so one user's switch
+# or reset never touches another session's stages
+if "profiler" not in st.session_state:
+    st.session_state.profiler = profiler.Recorder()
+profiler.use(st.session_state.profiler)
+
+show_performance = st.sidebar.checkbox("Performance profiler")
+if show_performance:
+    profiler.enable(
+        memory=st.sidebar.checkbox("Track peak memory (slower)")
+    )
+else:
+    profiler.disable()
+
 page = st.session_state.page
 
 # =====================================================
 # SESSION VARIABLES
 # =====================================================
 for key in [
-    "income_df", "balance_df", "merged_df", "forecast_df",
+    "income_df", "balance_df", "merged_df", "merged_key", "forecast_df",
     "revenue_growth", "variable_cost_ratio", "fixed_cost",
-    "tax_rate", "interest_rate", "debt_change"
+    "tax_rate", "interest_rate", "debt_change",
+    "years_ahead", "frequency", "seasonality"
 ]:
     if key not in st.session_state:
         st.session_state[key] = None
@@ -169,21 +301,76 @@ elif page == "Upload Data":
 
     if income_file and balance_file:
         try:
-            income = validate_income_statement(
-                load_income_statement(income_file),
-                mode=validation_mode
+            mapping_version = lazy_import("schema_mapper").MAPPING_VERSION
+            income_bytes = income_file.getvalue()
+            balance_bytes = balance_file.getvalue()
+            income_key = content_hash(income_bytes)
+            balance_key = content_hash(balance_bytes)
+
+            income = cached_validate(
+                "income", income_key, validation_mode, mapping_version,
+                income_bytes
             )
-            balance = validate_balance_sheet(
-                load_balance_sheet(balance_file),
-                mode=validation_mode
+            balance = cached_validate(
+                "balance", balance_key, validation_mode, mapping_version,
+                balance_bytes
             )
 
-            st.session_state.merged_df = merge_financials(income, balance)
+            merged_key = content_hash(
+                income_key, balance_key, validation_mode, mapping_version
+            )
+            st.session_state.merged_df = cached_merge(merged_key, income, balance)
+            st.session_state.merged_key = merged_key
             st.success("Data uploaded and validated successfully")
 
+            for warning in (
+                income.attrs.get("warnings", [])
+                + balance.attrs.get("warnings", [])
+            ):
+                st.warning(warning)
+
         except Exception as e:
             st.error(str(e))
 
+    st.subheader("History")
+
+    # The history database is only opened once these controls are used
+    if st.checkbox("Use company history"):
+        history = get_history()
+
+        entity = st.text_input("Company", history.DEFAULT_ENTITY)
+        strict = st.checkbox("Reject gaps and large jumps", value=False)
+        if st.session_state.merged_df is not None and st.button(
+            "Add / Update Years"
+        ):
+            try:
+                report = history.upsert_history(
+                    st.session_state.merged_df, entity=entity, strict=strict
+                )
+                counts = report["Status"].value_counts()
+                st.success(", ".join(
+                    f"{counts[s]} {s}" for s in history.STATUSES if s in counts
+                ))
+                for warning in report["Warning"].dropna():
+                    st.warning(warning)
+                st.dataframe(report)
+            except Exception as e:
+                st.error(str(e))
+
+        entities = history.list_entities()
+        if entities:
+            stored_entity = st.selectbox("Stored company", entities)
+            if st.button("Load From History"):
+                stored = history.load_history(stored_entity)
+                st.session_state.merged_df = stored[
+                    ["Year"] + history.BASE_COLUMNS
+                ].dropna(axis=1, how="all")
+                st.session_state.merged_key = content_hash(
+                    "history", stored_entity,
+                    lazy_import("storage").hash_frame(stored)
+                )
+                st.success(f"Loaded {len(stored)} years of {stored_entity}")
+
     st.divider()
     page_navigation_buttons()
 
@@ -196,7 +383,10 @@ elif page == "Dashboard":
     if st.session_state.merged_df is None:
         st.warning("Upload data first.")
     else:
-        df = compute_financial_ratios(st.session_state.merged_df)
+        df = cached_ratios(
+            st.session_state.merged_key,
+            st.session_state.merged_df
+        )
         latest = df.iloc[-1]
 
         c1, c2, c3, c4 = st.columns(4)
@@ -205,19 +395,86 @@ elif page == "Dashboard":
         c3.metric("ROE", f"{latest['ROE']:.2%}")
         c4.metric("Debt Ratio", f"{latest['Debt_Ratio']:.2%}")
 
-        st.plotly_chart(
-            px.line(df, x="Year", y=["Revenue", "Net_Income"],
-                    title="Revenue & Net Income Trend"),
-            use_container_width=True
+        plot_chart(
+            "line", df, x="Year", y=["Revenue", "Net_Income"],
+            title="Revenue & Net Income Trend"
         )
 
-        be = calculate_break_even_revenue(
+        # Extra ratios are computed only when selected
+        financial_metrics = lazy_import("financial_metrics")
+        extra_ratios = st.multiselect("More Ratios", [
+            name for name in financial_metrics.available_ratios(df.columns)
+            if name not in financial_metrics.DEFAULT_RATIOS
+        ])
+        if extra_ratios:
+            st.dataframe(
+                financial_metrics.compute_financial_ratios(
+                    df, ratios=extra_ratios, columns_only=True
+                ).set_index(df["Year"])
+            )
+
+        st.subheader("🧾 Insights")
+        severity_icons = {
+            "positive": "✅", "info": "ℹ️", "warning": "⚠️", "critical": "🚨"
+        }
+        for _, insight in lazy_import("insights").evaluate_rules(
+            df, rules="all"
+        ).iterrows():
+            st.write(f"{severity_icons[insight['Severity']]} {insight['Message']}")
+
+        be = lazy_import("forecasting").calculate_break_even_revenue(
             st.session_state.fixed_cost,
             st.session_state.variable_cost_ratio
         )
         if be:
             st.metric("Break-Even Revenue", f"{be:,.0f}")
 
+        st.subheader("Break-Even Surface")
+        np = lazy_import("numpy")
+        pd = lazy_import("pandas")
+        breakeven = lazy_import("breakeven")
+
+        # Historical years plus forecast years once a forecast exists
+        revenue_by_year = df[["Year", "Revenue"]]
+        if st.session_state.forecast_df is not None:
+            forecast = st.session_state.forecast_df
+            revenue_by_year = pd.concat([
+                revenue_by_year,
+                forecast.loc[forecast["Type"] == "Forecast", ["Year", "Revenue"]]
+            ], ignore_index=True)
+
+        s1, s2 = st.columns(2)
+        surface_metric = s1.selectbox("Surface", breakeven.SURFACE_METRICS)
+        surface_year = s2.selectbox(
+            "Revenue Year", revenue_by_year["Year"].tolist(),
+            index=len(revenue_by_year) - 1,
+            disabled=surface_metric == "Break_Even_Revenue"
+        )
+
+        max_fixed = 2 * (st.session_state.fixed_cost or 200000)
+        fixed_grid = np.linspace(0, max_fixed, 101)
+        ratio_grid = np.linspace(0, 0.99, 100)
+        revenue = revenue_by_year.loc[
+            revenue_by_year["Year"] == surface_year, "Revenue"
+        ].iloc[:1]
+        surface = breakeven.break_even_surface(fixed_grid, ratio_grid, revenue)
+
+        color_range = {
+            "Margin_Of_Safety": (-1, 1),
+            "Operating_Leverage": (-10, 10)
+        }.get(surface_metric, (None, None))
+        z = surface[surface_metric]
+        plot_chart(
+            "imshow", z if z.ndim == 2 else z[0],
+            x=ratio_grid, y=fixed_grid, origin="lower", aspect="auto",
+            zmin=color_range[0], zmax=color_range[1],
+            labels={
+                "x": "Variable Cost Ratio", "y": "Fixed Cost",
+                "color": surface_metric
+            },
+            title=f"{surface_metric} by Fixed Cost and Variable Cost Ratio"
+        )
+
     st.divider()
     page_navigation_buttons()
 
@@ -251,6 +508,61 @@ elif page == "Decision Inputs":
         "Debt Change (%)", -50, 50, 0
     ) / 100
 
+    st.subheader("Forecast Horizon")
+    forecasting = lazy_import("forecasting")
+    h1, h2, h3 = st.columns(3)
+    st.session_state.years_ahead = h1.slider(
+        "Horizon (years)", 1, 30, 3
+    )
+    frequency_labels = {"Annual": "A", "Quarterly": "Q", "Monthly": "M"}
+    st.session_state.frequency = frequency_labels[
+        h2.selectbox("Frequency", list(frequency_labels))
+    ]
+    st.session_state.seasonality = h3.selectbox(
+        "Seasonality", list(forecasting.SEASONALITY_PROFILES),
+        disabled=st.session_state.frequency == "A"
+    )
+
+    if st.session_state.merged_df is not None:
+        st.subheader("🎯 Goal Seek")
+        goal_seek = lazy_import("goal_seek")
+
+        g1, g2, g3, g4 = st.columns(4)
+        seek_driver = g1.selectbox("Solve For", list(goal_seek.BASE_INPUTS))
+        seek_metric = g2.selectbox(
+            "Target Output", goal_seek.SEEK_METRICS, index=2
+        )
+        horizon = st.session_state.years_ahead
+        seek_year = g3.selectbox(
+            "Forecast Year", list(range(1, horizon + 1)), index=horizon - 1
+        )
+        seek_target = g4.number_input("Target Value", value=0.0, step=10000.0)
+
+        seek = goal_seek.goal_seek(
+            st.session_state.merged_df,
+            seek_driver,
+            seek_target,
+            metric=seek_metric,
+            year=seek_year,
+            years_ahead=horizon,
+            base_inputs={
+                key: st.session_state[key] for key in goal_seek.BASE_INPUTS
+            },
+            frequency=st.session_state.frequency,
+            seasonality=st.session_state.seasonality
+        ).iloc[0]
+
+        if seek["Status"] == "solved":
+            st.success(
+                f"{seek_driver} = {seek['Solution']:,.4f} gives "
+                f"{seek_metric} of {seek['Achieved']:,.2f} in {seek['Year']}"
+            )
+        else:
+            st.warning(
+                f"No {seek_driver} within its range reaches "
+                f"{seek_metric} = {seek_target:,.2f} in {seek['Year']}"
+            )
+
     st.divider()
     page_navigation_buttons()
 
@@ -261,8 +573,10 @@ elif page == "Forecast & Save Scenario":
     st.header("Forecast & Save Scenario")
 
     if st.session_state.merged_df is not None:
-        forecast = forecast_financials(
-            st.session_state.merged_df,
+        years_ahead = st.session_state.years_ahead or 3
+        frequency = st.session_state.frequency or "A"
+        seasonality = st.session_state.seasonality
+        drivers = dict(
             revenue_growth=st.session_state.revenue_growth,
             variable_cost_ratio=st.session_state.variable_cost_ratio,
             fixed_cost=st.session_state.fixed_cost,
@@ -271,25 +585,117 @@ elif page == "Forecast & Save Scenario":
             debt_change=st.session_state.debt_change
         )
 
+        # Quarterly / monthly forecasts are saved as their annual roll-up
+        forecast_key, forecast = lazy_import("forecast_cache").cached_forecast(
+            st.session_state.merged_df,
+            years_ahead=years_ahead,
+            frequency=frequency,
+            seasonality=seasonality,
+            **drivers
+        )
+
         st.session_state.forecast_df = forecast
 
-        st.plotly_chart(
-            px.line(forecast, x="Year", y="Revenue",
-                    color="Type",
-                    title="Historical vs Forecast Revenue"),
-            use_container_width=True
+        plot_chart(
+            "line", forecast, x="Year", y="Revenue",
+            color="Type",
+            title="Historical vs Forecast Revenue"
         )
 
+        if frequency != "A":
+            periods = lazy_import("forecasting").forecast_periods(
+                st.session_state.merged_df,
+                years_ahead=years_ahead,
+                frequency=frequency,
+                seasonality=seasonality,
+                **drivers
+            )
+            per_year = periods["Period"].max()
+            periods["Time"] = periods["Year"] + (periods["Period"] - 1) / per_year
+            plot_chart(
+                "line", periods, x="Time", y=["Revenue", "Net_Income"],
+                title=f"{'Monthly' if frequency == 'M' else 'Quarterly'} "
+                      f"Revenue and Net Income"
+            )
+
+        if st.checkbox("Simulation mode (Monte Carlo)"):
+            n_paths = st.select_slider(
+                "Simulated paths", [1000, 10000, 50000, 100000], value=10000
+            )
+            growth_std = st.slider("Revenue Growth Volatility (%)", 0, 20, 5) / 100
+            cost_std = st.slider("Variable Cost Volatility (%)", 0, 10, 3) / 100
+            rate_std = st.slider("Interest Rate Volatility (%)", 0, 5, 1) / 100
+            debt_std = st.slider("Debt Change Volatility (%)", 0, 20, 5) / 100
+            corr = st.slider("Growth / Cost Correlation", -0.9, 0.9, 0.0)
+            threshold = st.slider("Debt Ratio Threshold", 0.1, 1.0, 0.6)
+
+            sim = lazy_import("simulation").simulate_forecasts(
+                st.session_state.merged_df,
+                n_paths=n_paths,
+                years_ahead=years_ahead,
+                distributions={
+                    "revenue_growth": {
+                        "dist": "normal",
+                        "mean": st.session_state.revenue_growth,
+                        "std": growth_std
+                    },
+                    "variable_cost_ratio": {
+                        "dist": "normal",
+                        "mean": st.session_state.variable_cost_ratio,
+                        "std": cost_std,
+                        "low": 0.0,
+                        "high": 0.99
+                    },
+                    "fixed_cost": {
+                        "dist": "fixed",
+                        "value": st.session_state.fixed_cost
+                    },
+                    "tax_rate": {
+                        "dist": "fixed",
+                        "value": st.session_state.tax_rate
+                    },
+                    "interest_rate": {
+                        "dist": "normal",
+                        "mean": st.session_state.interest_rate,
+                        "std": rate_std,
+                        "low": 0.0
+                    },
+                    "debt_change": {
+                        "dist": "normal",
+                        "mean": st.session_state.debt_change,
+                        "std": debt_std
+                    }
+                },
+                correlation={("revenue_growth", "variable_cost_ratio"): corr},
+                seed=0,
+                debt_ratio_threshold=threshold,
+                frequency=frequency,
+                seasonality=seasonality
+            )
+
+            pct = sim["percentiles"]
+            metric = st.selectbox(
+                "Fan Chart Metric", pct["Metric"].unique().tolist()
+            )
+            plot_chart(
+                "line", pct[pct["Metric"] == metric], x="Year",
+                y=["P5", "P50", "P95"],
+                title=f"{metric} Forecast Percentiles"
+            )
+            st.dataframe(sim["probabilities"])
+
         name = st.text_input("Scenario Name")
         if st.button("Save Scenario"):
-            save_scenario(
+            ticket = get_write_queue().save(
                 name,
                 st.session_state.revenue_growth,
                 st.session_state.variable_cost_ratio,
                 st.session_state.debt_change,
-                forecast
+                forecast,
+                forecast_key=forecast_key
             )
-            st.success("Scenario saved")
+            st.session_state.setdefault("write_tickets", []).append(ticket)
+        show_write_status()
 
     st.divider()
     page_navigation_buttons()
@@ -300,13 +706,24 @@ elif page == "Forecast & Save Scenario":
 elif page == "Scenario Management":
     st.header("Scenario Management")
 
-    scenarios = load_scenarios()
+    storage = get_storage()
+    write_queue = get_write_queue()
+    show_write_status()
+    if st.button("Refresh"):
+        st.rerun()
+
+    # Queued deletes are hidden right away, before they are written
+    scenarios = storage.load_scenarios()
+    scenarios = scenarios[
+        ~scenarios["scenario_id"].isin(write_queue.pending_deletes())
+    ]
     st.dataframe(scenarios)
 
     if not scenarios.empty:
         sid = st.selectbox("Delete Scenario", scenarios["scenario_id"])
         if st.button("Delete"):
-            delete_scenario(sid)
+            ticket = write_queue.delete(sid)
+            st.session_state.setdefault("write_tickets", []).append(ticket)
             st.rerun()
 
     st.divider()
@@ -318,23 +735,34 @@ elif page == "Scenario Management":
 elif page == "Scenario Comparison":
     st.header("Scenario Comparison")
 
-    scenarios = load_scenarios()
+    storage = get_storage()
+
+    c1, c2, c3 = st.columns(3)
+    order_by = c1.selectbox("Rank By", storage.KPI_COLUMNS[1:], index=2)
+    max_debt_ratio = c2.slider("Max Final Debt Ratio", 0.0, 2.0, 2.0)
+    limit = c3.number_input("Top N", min_value=1, value=20, step=5)
+
+    ranked = storage.rank_scenarios(
+        order_by=order_by,
+        limit=limit,
+        filters={"final_debt_ratio": ("<=", max_debt_ratio)}
+    )
+    st.dataframe(ranked)
+
     selected = st.multiselect(
         "Select Scenarios",
-        scenarios["scenario_id"]
+        ranked["scenario_id"]
     )
 
-    frames = []
-    for sid in selected:
-        f = load_scenario_forecast(sid)
-        f["Scenario"] = sid
-        frames.append(f[f["Type"] == "Forecast"])
-
-    if frames:
-        comp = pd.concat(frames)
-        st.plotly_chart(
-            px.line(comp, x="Year", y="Revenue", color="Scenario"),
-            use_container_width=True
+    if selected:
+        comp = storage.load_scenario_forecasts(selected)
+        comp = comp[comp["Type"] == "Forecast"]
+        metric = st.selectbox(
+            "Metric",
+            ["Revenue", "Net_Income", "Equity", "Total_Liabilities"]
+        )
+        plot_chart(
+            "line", comp, x="Year", y=metric, color="scenario_id"
         )
 
     st.divider()
@@ -347,28 +775,69 @@ elif page == "Risk Sensitivity":
     st.header("Risk Sensitivity Analysis")
 
     if st.session_state.merged_df is not None:
-        base = forecast_financials(
-            st.session_state.merged_df
-        ).iloc[-1]["Net_Income"]
+        DEFAULT_DELTAS = lazy_import("sensitivity").DEFAULT_DELTAS
+
+        st.subheader("Flex (+/-) per Driver")
+        f1, f2, f3 = st.columns(3)
+        deltas = {
+            "revenue_growth": f1.slider(
+                "Revenue Growth (pp)", 0, 20, 5) / 100,
+            "variable_cost_ratio": f2.slider(
+                "Variable Cost Ratio (pp)", 0, 20, 5) / 100,
+            "fixed_cost": f3.number_input(
+                "Fixed Cost", value=DEFAULT_DELTAS["fixed_cost"], step=10000),
+            "tax_rate": f1.slider("Tax Rate (pp)", 0, 20, 5) / 100,
+            "interest_rate": f2.slider("Interest Rate (pp)", 0, 10, 2) / 100,
+            "debt_change": f3.slider("Debt Change (pp)", 0, 50, 10) / 100
+        }
+
+        tornado = cached_tornado(
+            st.session_state.merged_key,
+            st.session_state.merged_df,
+            tuple(
+                (key, st.session_state[key]) for key in [
+                    "revenue_growth", "variable_cost_ratio", "fixed_cost",
+                    "tax_rate", "interest_rate", "debt_change"
+                ]
+            ),
+            tuple(deltas.items()),
+            st.session_state.years_ahead or 3,
+            st.session_state.frequency or "A",
+            st.session_state.seasonality
+        )
 
-        impacts = []
-        for g in [0.0, 0.10]:
-            ni = forecast_financials(
-                st.session_state.merged_df,
-                revenue_growth=g
-            ).iloc[-1]["Net_Income"]
-            impacts.append({
-                "Growth": f"{int(g*100)}%",
-                "Impact": ni - base
-            })
-
-        df_imp = pd.DataFrame(impacts)
-        st.plotly_chart(
-            px.bar(df_imp, x="Impact", y="Growth",
-                   orientation="h",
-                   title="Net Income Sensitivity"),
-            use_container_width=True
+        metric = st.selectbox(
+            "Output", ["Net_Income", "Equity", "Debt_Ratio"]
         )
+        df_imp = tornado[tornado["Metric"] == metric].sort_values("Swing")
+
+        plot_chart(
+            "bar", df_imp, x=["Low_Impact", "High_Impact"], y="Driver",
+            orientation="h", barmode="overlay",
+            title=f"Final-Year {metric} Sensitivity"
+        )
+        st.dataframe(df_imp)
 
     st.divider()
     page_navigation_buttons()
+
+# =====================================================
+# PERFORMANCE PANEL
+# =====================================================
+# Rendered last so the stages of the current rerun are included.
+# Results of st.cache_data hits are not re-profiled.
+if show_performance:
+    with st.sidebar.expander("Performance", expanded=True):
+        st.dataframe(profiler.summary(), hide_index=True)
+
+        st.download_button(
+            "Download JSON", profiler.to_json(),
+            file_name="profile.json", mime="application/json"
+        )
+        st.download_button(
+            "Download Chrome Trace", profiler.to_chrome_trace(),
+            file_name="profile_trace.json", mime="application/json"
+        )
+        if st.button("Reset Profile"):
+            profiler.reset()
+            st.rerun()
@@ -0,0 +1,477 @@
+"""
+Benchmark suite for every pipeline stage.
+
+    python benchmark.py                       # quick sizes
+    python benchmark.py --full                # up to 1M rows / 10k entities
+    python benchmark.py --output bench.json
+    python benchmark.py --imports             # add cold import costs
+    python benchmark.py --compact             # float32 / categorical mode
+    python benchmark.py --peak-rss 1000000    # peak RSS, default vs compact
+    python benchmark.py --baseline bench.json --tolerance 0.25
+
+With --baseline, exits non-zero when any stage is slower than the
+baseline by more than the tolerance.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import profiler
+import storage
+from schema_mapper import (
+    map_columns,
+    INCOME_STATEMENT_MAPPING,
+    BALANCE_SHEET_MAPPING
+)
+from data_loader import load_income_statement, load_balance_sheet
+from validator import validate_income_statement, validate_balance_sheet
+from financial_metrics import merge_financials, compute_financial_ratios
+from forecasting import forecast_financials
+from cashflow import compute_cash_flow
+from insights import generate_insights, evaluate_rules
+from goal_seek import goal_seek
+from breakeven import break_even_surface
+from compact import compact_frame
+
+# (rows, entities)
+QUICK_CASES = [(10, 1), (10000, 1), (10000, 100)]
+FULL_CASES = QUICK_CASES + [(1000000, 1), (1000000, 10000)]
+
+# Targets solved in one vectorized goal_seek call
+GOAL_SEEK_TARGETS = 10000
+
+# Scenarios per storage.save_scenarios call in the bulk save stage
+# (a full driver sweep; the target is about a second)
+SAVE_SWEEP_SCENARIOS = 10000
+
+# Fixed cost x variable cost ratio grid for the break-even surface
+SURFACE_POINTS = 1000
+
+# Ignore differences smaller than this when comparing to a baseline
+NOISE_FLOOR_SECONDS = 0.001
+
+
+# =====================================================
+# Synthetic data generators
+# =====================================================
+def make_statements(n_rows, n_entities=1, seed=0):
+    """
+    Seeded synthetic income statement and balance sheet with the raw
+    headers of sample_*.csv. Each entity gets consecutive years; with
+    more than one entity an "Entity" column is added.
+    """
+    rng = np.random.default_rng(seed)
+    per_entity = max(1, n_rows // n_entities)
+    n = per_entity * n_entities
+
+    entity = np.repeat(np.arange(n_entities), per_entity)
+    year = 1900 + np.tile(np.arange(per_entity), n_entities)
+
+    revenue = rng.uniform(5e5, 5e6, n)
+    opex = revenue * rng.uniform(0.4, 0.9, n)
+    net_income = (revenue - opex) * 0.75
+    assets = revenue * rng.uniform(1.0, 3.0, n)
+    liabilities = assets * rng.uniform(0.2, 0.8, n)
+
+    income = pd.DataFrame({
+        "Year": year,
+        "Sales": revenue,
+        "Operating Cost": opex,
+        "Net Profit": net_income
+    })
+    balance = pd.DataFrame({
+        "Fiscal Year": year,
+        "Assets": assets,
+        "Liabilities": liabilities,
+        "Shareholders Equity": assets - liabilities
+    })
+
+    if n_entities > 1:
+        labels = np.char.add("E", entity.astype(str))
+        income.insert(0, "Entity", labels)
+        balance.insert(0, "Entity", labels)
+
+    return income, balance
+
+
+def make_panel(income_raw, balance_raw):
+    """Stacked multi-entity frame with standard column names."""
+    income = income_raw.rename(
+        columns=map_columns(income_raw.columns, INCOME_STATEMENT_MAPPING)
+    )
+    balance = balance_raw.rename(
+        columns=map_columns(balance_raw.columns, BALANCE_SHEET_MAPPING)
+    )
+    return pd.merge(income, balance, on=["Entity", "Year"])
+
+
+# =====================================================
+# Timing helpers
+# =====================================================
+def _time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_case(n_rows, n_entities, repeat=3, workdir=None, compact=False):
+    """
+    Time every stage for one (rows, entities) case. compact=True loads
+    with compact dtypes and suffixes stage names with " (compact)".
+    """
+    workdir = workdir or tempfile.mkdtemp()
+    income_raw, balance_raw = make_statements(n_rows, n_entities)
+
+    income_csv = os.path.join(workdir, f"income_{n_rows}_{n_entities}.csv")
+    balance_csv = os.path.join(workdir, f"balance_{n_rows}_{n_entities}.csv")
+    income_raw.to_csv(income_csv, index=False)
+    balance_raw.to_csv(balance_csv, index=False)
+
+    def load_income():
+        return load_income_statement(income_csv, compact=compact)
+
+    def load_balance():
+        return load_balance_sheet(balance_csv, compact=compact)
+
+    income = validate_income_statement(load_income())
+    balance = validate_balance_sheet(load_balance())
+
+    stages = {
+        "map_columns": lambda: map_columns(
+            income_raw.columns, INCOME_STATEMENT_MAPPING
+        ),
+        "load_income_statement": load_income,
+        "load_balance_sheet": load_balance,
+        "validate_income_statement": lambda: validate_income_statement(
+            load_income()
+        ),
+        "validate_balance_sheet": lambda: validate_balance_sheet(
+            load_balance()
+        ),
+    }
+
+    # The remaining stages work on one company (Year is the key)
+    if n_entities == 1:
+        merged = merge_financials(income, balance)
+        forecast = forecast_financials(merged)
+
+        stages.update({
+            "merge_financials": lambda: merge_financials(income, balance),
+            "compute_financial_ratios": lambda: compute_financial_ratios(merged),
+            "forecast_financials": lambda: forecast_financials(merged),
+            "compute_cash_flow": lambda: compute_cash_flow(forecast),
+            "generate_insights": lambda: generate_insights(merged),
+            "goal_seek": lambda: goal_seek(
+                merged, "revenue_growth",
+                np.linspace(0, 3e5, GOAL_SEEK_TARGETS)
+            ),
+            "break_even_surface": lambda: break_even_surface(
+                np.linspace(0, 1e6, SURFACE_POINTS),
+                np.linspace(0, 1.2, SURFACE_POINTS)
+            ),
+        })
+        stages.update(_storage_stages(forecast, workdir, n_rows))
+    else:
+        panel = make_panel(income_raw, balance_raw)
+        if compact:
+            panel = compact_frame(panel, entity_col="Entity")
+        stages["compute_cash_flow (panel)"] = lambda: compute_cash_flow(
+            panel, entity_col="Entity", columns_only=True
+        )
+        stages["evaluate_rules (panel)"] = lambda: evaluate_rules(
+            panel, entity_col="Entity", rules="all"
+        )
+
+    suffix = " (compact)" if compact else ""
+    results = []
+    for stage, func in stages.items():
+        results.append({
+            "stage": stage + suffix,
+            "rows": n_rows,
+            "entities": n_entities,
+            "seconds": _time(func, repeat)
+        })
+    return results
+
+
+def _storage_stages(forecast, workdir, n_rows):
+    db_path = os.path.join(workdir, f"bench_{n_rows}.db")
+
+    storage.init_db(path=db_path)
+    scenario_id = storage.save_scenario(
+        "bench", 0.05, 0.3, 0.0, forecast, path=db_path
+    )
+
+    def save_and_delete():
+        sid = storage.save_scenario(
+            "bench", 0.05, 0.3, 0.0, forecast, path=db_path
+        )
+        storage.delete_scenario(sid, path=db_path)
+
+    return {
+        "storage.init_db": lambda: storage.init_db(force=True, path=db_path),
+        "storage.save_and_delete_scenario": save_and_delete,
+        "storage.load_scenarios": lambda: storage.load_scenarios(path=db_path),
+        "storage.load_scenario_forecast": (
+            lambda: storage.load_scenario_forecast(scenario_id, path=db_path)
+        ),
+    }
+
+
+def bulk_save_case(n_scenarios=SAVE_SWEEP_SCENARIOS, repeat=3, workdir=None):
+    """
+    Time one storage.save_scenarios call of n_scenarios distinct
+    3-year forecasts, each repeat into a fresh database.
+    """
+    workdir = workdir or tempfile.mkdtemp()
+    income_raw, balance_raw = make_statements(3)
+    income_csv = os.path.join(workdir, "bulk_income.csv")
+    balance_csv = os.path.join(workdir, "bulk_balance.csv")
+    income_raw.to_csv(income_csv, index=False)
+    balance_raw.to_csv(balance_csv, index=False)
+    merged = merge_financials(
+        validate_income_statement(load_income_statement(income_csv)),
+        validate_balance_sheet(load_balance_sheet(balance_csv))
+    )
+    forecast = forecast_financials(merged)
+    scenarios = [
+        {
+            "scenario_name": f"sweep {i}",
+            "revenue_growth": 0.05,
+            "opex_ratio": 0.3,
+            "debt_change": 0.0,
+            "forecast_df": forecast.assign(
+                Revenue=forecast["Revenue"] * (1 + i * 1e-9)
+            )
+        }
+        for i in range(n_scenarios)
+    ]
+
+    runs = iter(range(repeat))
+
+    def save():
+        path = os.path.join(workdir, f"bulk_{n_scenarios}_{next(runs)}.db")
+        storage.init_db(path=path)
+        storage.save_scenarios(scenarios, path=path)
+
+    return [{
+        "stage": "storage.save_scenarios (bulk)",
+        "rows": n_scenarios,
+        "entities": 1,
+        "seconds": _time(save, repeat)
+    }]
+
+
+# =====================================================
+# Peak memory
+# =====================================================
+def _pipeline(income_csv, balance_csv, compact):
+    """The single-company run: load -> validate -> ratios -> forecast -> cash flow."""
+    income = validate_income_statement(
+        load_income_statement(income_csv, compact=compact)
+    )
+    balance = validate_balance_sheet(
+        load_balance_sheet(balance_csv, compact=compact)
+    )
+    merged = merge_financials(income, balance)
+    del income, balance
+    ratios = compute_financial_ratios(merged)
+    forecast = forecast_financials(merged)
+    cash_flow = compute_cash_flow(forecast)
+    return ratios, cash_flow
+
+
+def _status_mb(field):
+    """A memory field of /proc/self/status (VmRSS, VmHWM) in MB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def _peak_rss_child(income_csv, balance_csv, compact):
+    """Runs in a fresh interpreter; prints peak RSS (MB) of one run."""
+    # A small warm-up run loads everything the pipeline imports lazily,
+    # so only the data of the measured run is counted
+    warm_income, warm_balance = make_statements(10)
+    _pipeline(
+        io.StringIO(warm_income.to_csv(index=False)),
+        io.StringIO(warm_balance.to_csv(index=False)),
+        compact
+    )
+
+    if os.path.exists("/proc/self/clear_refs"):
+        # Reset the high-water mark (ru_maxrss would include the
+        # parent's RSS at fork time)
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        start = _status_mb("VmRSS")
+        results = _pipeline(income_csv, balance_csv, compact)
+        peak = _status_mb("VmHWM")
+    else:
+        import resource
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        results = _pipeline(income_csv, balance_csv, compact)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    del results
+    print(peak - start)
+
+
+def peak_rss(n_rows, workdir=None) -> dict:
+    """
+    Peak RSS (MB, above a warm-up run) of the single-company pipeline
+    on n_rows, in default and compact mode. Each mode runs in its own
+    interpreter, since peak RSS only ever grows within a process.
+    """
+    workdir = workdir or tempfile.mkdtemp()
+    income_raw, balance_raw = make_statements(n_rows)
+    income_csv = os.path.join(workdir, f"rss_income_{n_rows}.csv")
+    balance_csv = os.path.join(workdir, f"rss_balance_{n_rows}.csv")
+    income_raw.to_csv(income_csv, index=False)
+    balance_raw.to_csv(balance_csv, index=False)
+    del income_raw, balance_raw
+
+    peaks = {}
+    for mode in ("default", "compact"):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--peak-rss-child",
+             income_csv, balance_csv, mode],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        peaks[mode] = float(proc.stdout.split()[-1])
+    peaks["reduction"] = 1 - peaks["compact"] / peaks["default"]
+    return peaks
+
+
+# =====================================================
+# Baseline comparison
+# =====================================================
+def compare(results, baseline, tolerance):
+    """
+    Return the stages slower than baseline * (1 + tolerance).
+    Differences below NOISE_FLOOR_SECONDS are ignored.
+    """
+    previous = {
+        (r["stage"], r["rows"], r["entities"]): r["seconds"]
+        for r in baseline["results"]
+    }
+
+    regressions = []
+    for r in results:
+        old = previous.get((r["stage"], r["rows"], r["entities"]))
+        if old is None:
+            continue
+        if (
+            r["seconds"] > old * (1 + tolerance)
+            and r["seconds"] - old > NOISE_FLOOR_SECONDS
+        ):
+            regressions.append({**r, "baseline": old, "ratio": r["seconds"] / old})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--full", action="store_true",
+                        help="include 1M-row and 10k-entity cases")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare against a results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--imports", action="store_true",
+                        help="also time cold imports of the app modules")
+    parser.add_argument("--compact", action="store_true",
+                        help="run the stages on compact dtypes")
+    parser.add_argument("--peak-rss", type=int, metavar="ROWS",
+                        help="only compare peak RSS of default and compact "
+                             "mode on a ROWS-row company")
+    parser.add_argument("--peak-rss-child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.peak_rss_child:
+        income_csv, balance_csv, mode = args.peak_rss_child
+        _peak_rss_child(income_csv, balance_csv, mode == "compact")
+        return 0
+
+    if args.peak_rss:
+        peaks = peak_rss(args.peak_rss)
+        print(f"peak RSS, {args.peak_rss} rows: "
+              f"default {peaks['default']:.1f} MB, "
+              f"compact {peaks['compact']:.1f} MB "
+              f"({peaks['reduction']:.1%} lower)")
+        return 0
+
+    cases = FULL_CASES if args.full else QUICK_CASES
+    workdir = tempfile.mkdtemp(prefix="fdss_bench_")
+
+    results = []
+    for n_rows, n_entities in cases:
+        case = run_case(
+            n_rows, n_entities, args.repeat, workdir, args.compact
+        )
+        for r in case:
+            print(f"{r['stage']:<36} {r['rows']:>9} rows "
+                  f"{r['entities']:>6} ent  {r['seconds'] * 1000:10.2f} ms")
+        results.extend(case)
+
+    for r in bulk_save_case(repeat=args.repeat, workdir=workdir):
+        print(f"{r['stage']:<36} {r['rows']:>9} scen "
+              f"{r['entities']:>6} ent  {r['seconds'] * 1000:10.2f} ms")
+        results.append(r)
+
+    if args.imports:
+        for _, row in profiler.import_costs().iterrows():
+            results.append({
+                "stage": f"import {row['Module']}",
+                "rows": 0,
+                "entities": 0,
+                "seconds": row["Import_Seconds"]
+            })
+            print(f"{'import ' + row['Module']:<36} "
+                  f"{row['Import_Seconds'] * 1000:38.2f} ms")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} ({r['rows']} rows, "
+                  f"{r['entities']} entities): {r['baseline'] * 1000:.2f} ms "
+                  f"-> {r['seconds'] * 1000:.2f} ms ({r['ratio']:.2f}x)")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import numpy as np
+
+# =====================================================
+# Break-even analysis (array version)
+# =====================================================
+# Array counterparts of forecasting.calculate_break_even_revenue.
+# Inputs broadcast like NumPy arrays; undefined results are NaN instead
+# of None (variable_cost_ratio >= 1, zero revenue, zero operating income).
+
+SURFACE_METRICS = [
+    "Break_Even_Revenue",
+    "Margin_Of_Safety",
+    "Operating_Leverage"
+]
+
+
+def break_even_revenue(fixed_cost, variable_cost_ratio):
+    """Revenue where contribution margin covers fixed cost."""
+    fixed_cost = np.asarray(fixed_cost, dtype=float)
+    contribution = 1 - np.asarray(variable_cost_ratio, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(contribution > 0, fixed_cost / contribution, np.nan)
+
+
+def margin_of_safety(revenue, break_even):
+    """Share of revenue that could be lost before reaching break-even."""
+    revenue = np.asarray(revenue, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(revenue != 0, 1 - break_even / revenue, np.nan)
+
+
+def operating_leverage(revenue, fixed_cost, variable_cost_ratio):
+    """
+    Degree of operating leverage: contribution margin / operating income.
+    NaN at break-even (zero operating income) and where
+    variable_cost_ratio >= 1.
+    """
+    margin_ratio = 1 - np.asarray(variable_cost_ratio, dtype=float)
+    contribution = np.asarray(revenue, dtype=float) * margin_ratio
+    operating_income = contribution - np.asarray(fixed_cost, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            (operating_income != 0) & (margin_ratio > 0),
+            contribution / operating_income,
+            np.nan
+        )
+
+
+def break_even_surface(fixed_costs, variable_cost_ratios, revenues=None):
+    """
+    Break-even metrics over a fixed cost x variable cost ratio grid.
+
+    fixed_costs (F,) and variable_cost_ratios (V,) define the grid.
+    Returns a dict with "Break_Even_Revenue" of shape (F, V) and, when
+    revenues (R,) are given (e.g. each historical and forecast year),
+    "Margin_Of_Safety" and "Operating_Leverage" of shape (R, F, V).
+
+    Same results as the functions above, but invalid ratios are masked
+    once per grid column so each surface costs a single pass.
+    """
+    fixed = np.asarray(fixed_costs, dtype=float)[:, None]
+    margin_ratio = 1 - np.asarray(variable_cost_ratios, dtype=float)
+    margin_ratio = np.where(margin_ratio > 0, margin_ratio, np.nan)[None, :]
+
+    break_even = fixed / margin_ratio
+    surface = {"Break_Even_Revenue": break_even}
+    if revenues is None:
+        return surface
+
+    revenues = np.asarray(revenues, dtype=float).ravel()
+    shape = (len(revenues),) + break_even.shape
+    safety = np.full(shape, np.nan)
+    leverage = np.full(shape, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i, revenue in enumerate(revenues):
+            if revenue != 0:
+                np.divide(break_even, revenue, out=safety[i])
+                np.subtract(1, safety[i], out=safety[i])
+
+            contribution = revenue * margin_ratio
+            operating_income = contribution - fixed
+            np.divide(
+                contribution, operating_income,
+                out=leverage[i], where=operating_income != 0
+            )
+
+    surface["Margin_Of_Safety"] = safety
+    surface["Operating_Leverage"] = leverage
+    return surface
@@ -1,19 +1,139 @@
+import numpy as np
 import pandas as pd
 
-def compute_cash_flow(df):
+from profiler import profiled
+from compact import MONEY_DTYPE, is_compact
+
+CASH_FLOW_COLUMNS = [
+    "CFO",
+    "CFI",
+    "CFF",
+    "Change_In_Working_Capital",
+    "FCF"
+]
+
+# Optional inputs for the working-capital line
+WORKING_CAPITAL_COLS = ["Current_Assets", "Current_Liabilities"]
+
+
+def _entity_codes(df, entity_col):
+    """Entity codes, or None for a single company (no per-row array)."""
+    if entity_col is None:
+        return None
+    return pd.factorize(df[entity_col])[0]
+
+
+def _row_order(df, codes):
+    """
+    Positions that put rows in (entity, Year) order, or None when they
+    already are. Entities keep their order of first appearance.
+    """
+    if "Year" not in df.columns:
+        return None
+
+    if codes is None:
+        if df["Year"].is_monotonic_increasing:
+            return None
+        return np.argsort(df["Year"].to_numpy(), kind="stable")
+
+    year = df["Year"].to_numpy()
+    ordered = np.all(
+        (codes[1:] > codes[:-1])
+        | ((codes[1:] == codes[:-1]) & (year[1:] >= year[:-1]))
+    )
+    if ordered:
+        return None
+    return np.lexsort((year, codes))
+
+
+def _diff(values, first):
+    """Row-over-row difference, 0 on the first row of each entity."""
+    out = np.empty(len(values), dtype=values.dtype)
+    out[1:] = values[1:] - values[:-1]
+    out[first] = 0.0
+    return out
+
+
+def _zero_nan(values):
+    values[np.isnan(values)] = 0.0
+    return values
+
+
+@profiled
+def compute_cash_flow(df, entity_col=None, columns_only=False):
     """
     Simplified Cash Flow Statement
-    CFO ≈ Net Income
+    CFO ≈ Net Income - Change in Working Capital
     CFI ≈ Change in Assets
     CFF ≈ Change in Liabilities
+    FCF = CFO + CFI
+
+    Changes are taken per entity_col (if given) in Year order, in one
+    vectorized pass, so stacked companies never mix. The working-capital
+    line needs Current_Assets and Current_Liabilities and is 0 without
+    them. First years of each entity are 0.
+
+    columns_only=True returns just the cash-flow columns (same index)
+    instead of df with the columns added. Compact input (see compact.py)
+    gives float32 lines.
     """
+    codes = _entity_codes(df, entity_col)
+    order = _row_order(df, codes)
+    if order is not None and codes is not None:
+        codes = codes[order]
+
+    # Compact input is computed in float32 throughout
+    dtype = MONEY_DTYPE if is_compact(df) else float
+
+    def column(col, copy=True):
+        # copy=False when the caller won't modify the array in place
+        values = df[col].to_numpy(dtype=dtype)
+        if order is not None:
+            return values[order]
+        return values.copy() if copy else values
+
+    n = len(df)
+    if codes is None:
+        first = slice(0, 1)
+    else:
+        first = np.ones(n, dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+
+    if all(col in df.columns for col in WORKING_CAPITAL_COLS):
+        working_capital = (
+            column("Current_Assets") - column("Current_Liabilities")
+        )
+        change_wc = _zero_nan(_diff(working_capital, first))
+    else:
+        change_wc = np.zeros(n, dtype=dtype)
+
+    # Lines are built in place to avoid full-length temporaries
+    cfo = _zero_nan(column("Net_Income"))
+    cfo -= change_wc
+    cfi = _diff(column("Total_Assets", copy=False), first)
+    np.negative(cfi, out=cfi)
+    cfi[first] = 0.0
+    cfi = _zero_nan(cfi)
+    cff = _zero_nan(_diff(column("Total_Liabilities", copy=False), first))
 
-    df = df.copy()
+    lines = {
+        "CFO": cfo,
+        "CFI": cfi,
+        "CFF": cff,
+        "Change_In_Working_Capital": change_wc,
+        "FCF": cfo + cfi
+    }
 
-    df["CFO"] = df["Net_Income"]
-    df["CFI"] = -df["Total_Assets"].diff()
-    df["CFF"] = df["Total_Liabilities"].diff()
+    if order is not None:
+        inverse = np.empty(n, dtype=np.int64)
+        inverse[order] = np.arange(n)
+        lines = {name: values[inverse] for name, values in lines.items()}
 
-    df[["CFO", "CFI", "CFF"]] = df[["CFO", "CFI", "CFF"]].fillna(0)
+    # copy=False keeps each line as its own block instead of copying
+    # them all into one 2-D block
+    result = pd.DataFrame(lines, index=df.index, copy=False)
+    if columns_only:
+        return result
 
-    return df
+    existing = [col for col in CASH_FLOW_COLUMNS if col in df.columns]
+    return pd.concat([df.drop(columns=existing), result], axis=1)
@@ -0,0 +1,403 @@
+"""
+Headless batch runner for the full analysis pipeline.
+
+    python cli.py data/ --assumptions assumptions.json --db results.db
+    python cli.py data/ --output-dir out/ --format parquet --workers 8
+    python cli.py --income inc.csv --balance bal.csv --entity ACME
+    python cli.py data/ --db results.db --compact   # float32 in memory
+
+Each entity goes through load -> validate -> merge -> ratios ->
+forecast -> cash flow -> insights, once per scenario in the assumptions
+file. Entities run in a process pool; failures are collected and the
+command exits with status 1 and a per-entity error summary.
+
+Assumptions file (JSON):
+
+    {
+      "years_ahead": 3,
+      "scenarios": [
+        {"name": "Base", "revenue_growth": 0.05},
+        {"name": "Downside", "revenue_growth": -0.05, "debt_change": 0.1}
+      ],
+      "entities": {"ACME": {"scenarios": [{"name": "Base"}]}}
+    }
+
+Drivers left out of a scenario use the forecast_financials defaults;
+"entities" optionally overrides the scenario list per entity.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+import storage
+from data_loader import load_income_statement, load_balance_sheet
+from validator import validate_income_statement, validate_balance_sheet
+from financial_metrics import merge_financials, compute_financial_ratios
+from forecasting import forecast_financials
+from forecast_cache import DRIVER_DEFAULTS
+from cashflow import compute_cash_flow
+from insights import evaluate_rules
+from portfolio import discover_pairs
+
+DEFAULT_ASSUMPTIONS = {
+    "years_ahead": 3,
+    "scenarios": [{"name": "Base"}]
+}
+
+# Scenarios written to SQLite per transaction
+SAVE_BATCH_SIZE = 500
+
+
+# =====================================================
+# Assumptions
+# =====================================================
+def load_assumptions(path=None) -> dict:
+    """Read and check an assumptions file (defaults when path is None)."""
+    if path is None:
+        return DEFAULT_ASSUMPTIONS
+
+    with open(path) as f:
+        assumptions = json.load(f)
+
+    assumptions.setdefault("years_ahead", 3)
+    assumptions.setdefault("scenarios", DEFAULT_ASSUMPTIONS["scenarios"])
+
+    scenario_lists = [assumptions["scenarios"]] + [
+        spec.get("scenarios", []) for spec in
+        assumptions.get("entities", {}).values()
+    ]
+    for scenarios in scenario_lists:
+        for scenario in scenarios:
+            unknown = set(scenario) - set(DRIVER_DEFAULTS) - {"name"}
+            if unknown:
+                raise ValueError(
+                    f"Unknown assumption(s) {sorted(unknown)} in {path}"
+                )
+    return assumptions
+
+
+def scenarios_for(entity, assumptions) -> list:
+    """Scenario list for one entity with every driver filled in."""
+    override = assumptions.get("entities", {}).get(entity, {})
+    scenarios = override.get("scenarios", assumptions["scenarios"])
+    return [
+        {
+            "name": s.get("name", f"Scenario {i + 1}"),
+            **DRIVER_DEFAULTS,
+            **{k: v for k, v in s.items() if k != "name"}
+        }
+        for i, s in enumerate(scenarios)
+    ]
+
+
+# =====================================================
+# Per-entity pipeline
+# =====================================================
+def run_entity(task) -> dict:
+    """
+    Run the full pipeline for one entity. Never raises: errors are
+    returned in the "error" field so one bad company can't stop a run.
+    """
+    (
+        entity, income_path, balance_path, mode, scenarios, years_ahead,
+        compact
+    ) = task
+    start = time.perf_counter()
+    result = {
+        "entity": entity, "ratios": None, "forecasts": [],
+        "insights": None, "warnings": [], "error": None
+    }
+
+    try:
+        income = validate_income_statement(
+            load_income_statement(income_path, compact=compact), mode=mode
+        )
+        balance = validate_balance_sheet(
+            load_balance_sheet(balance_path, compact=compact), mode=mode
+        )
+        merged = merge_financials(income, balance)
+        if merged.empty:
+            raise ValueError("No overlapping years between statements")
+
+        result["warnings"] = (
+            income.attrs.get("warnings", [])
+            + balance.attrs.get("warnings", [])
+        )
+        result["ratios"] = compute_financial_ratios(merged)
+        result["insights"] = evaluate_rules(merged, rules="all")
+
+        for scenario in scenarios:
+            drivers = {k: v for k, v in scenario.items() if k != "name"}
+            forecast = forecast_financials(
+                merged, years_ahead=years_ahead, **drivers
+            )
+            # Hashing here keeps it out of the single writer process
+            cash_flow = compute_cash_flow(forecast)
+            result["forecasts"].append(
+                (scenario, cash_flow, storage.hash_frame(cash_flow))
+            )
+
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_pipeline(
+    pairs, assumptions, mode="auto_clean_warn", workers=None, compact=False
+):
+    """
+    Yield run_entity results for {entity: (income_path, balance_path)}.
+    workers=None uses all cores, workers=1 runs inline. compact=True
+    runs every entity on compact dtypes (see compact.py).
+    """
+    tasks = [
+        (
+            entity, income_path, balance_path, mode,
+            scenarios_for(entity, assumptions), assumptions["years_ahead"],
+            compact
+        )
+        for entity, (income_path, balance_path) in pairs.items()
+    ]
+
+    if workers == 1 or len(tasks) <= 1:
+        yield from map(run_entity, tasks)
+        return
+
+    n_workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (n_workers * 8))
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        yield from pool.map(run_entity, tasks, chunksize=chunksize)
+
+
+# =====================================================
+# Result writers
+# =====================================================
+def _tables(results, run_at):
+    """Combine entity results into ratios, forecasts and insights frames."""
+    ratios, forecasts, insights = [], [], []
+
+    for r in results:
+        if r["ratios"] is not None:
+            ratios.append(r["ratios"].assign(Entity=r["entity"]))
+        for scenario, df, _ in r["forecasts"]:
+            forecasts.append(df.assign(
+                Entity=r["entity"], Scenario=scenario["name"]
+            ))
+        if r["insights"] is not None:
+            insights.append(r["insights"].assign(Entity=r["entity"]))
+
+    def frame(parts, first):
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        df["Run_At"] = run_at
+        leading = [c for c in first if c in df.columns]
+        return df[leading + [c for c in df.columns if c not in leading]]
+
+    return {
+        "ratios": frame(ratios, ["Entity", "Year"]),
+        "forecasts": frame(forecasts, ["Entity", "Scenario", "Year"]),
+        "insights": frame(insights, ["Entity"])
+    }
+
+
+class SQLiteWriter:
+    """
+    Saves every forecast as a scenario ("<entity> / <scenario>") through
+    storage.apply_writes and appends ratios, cash-flow forecasts and
+    insights to pipeline_* tables in the same database.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        storage.init_db(path=self.path)
+        self.run_at = datetime.now().isoformat()
+        self.pending = []
+
+    def add(self, result):
+        self.pending.append(result)
+        if sum(len(r["forecasts"]) for r in self.pending) >= SAVE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        storage.apply_writes([
+            ("save", {
+                "scenario_name": f"{r['entity']} / {scenario['name']}",
+                "revenue_growth": scenario["revenue_growth"],
+                "opex_ratio": scenario["variable_cost_ratio"],
+                "debt_change": scenario["debt_change"],
+                "forecast_df": df,
+                "forecast_key": key
+            })
+            for r in self.pending
+            for scenario, df, key in r["forecasts"]
+        ], path=self.path)
+
+        conn = storage.get_connection(self.path)
+        with conn:
+            for name, df in _tables(self.pending, self.run_at).items():
+                if not df.empty:
+                    df.to_sql(
+                        f"pipeline_{name}", conn,
+                        if_exists="append", index=False
+                    )
+        self.pending = []
+
+    def close(self, report):
+        self.flush()
+        conn = storage.get_connection(self.path)
+        with conn:
+            report.assign(Run_At=self.run_at).to_sql(
+                "pipeline_runs", conn, if_exists="append", index=False
+            )
+
+
+class ColumnarWriter:
+    """
+    Writes ratios, forecasts (with cash flow), insights and the run
+    report as one file each in output_dir, in parquet or csv format.
+    """
+
+    def __init__(self, output_dir, fmt="parquet"):
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.run_at = datetime.now().isoformat()
+        self.results = []
+
+    def add(self, result):
+        self.results.append(result)
+
+    def _write(self, name, df):
+        path = os.path.join(self.output_dir, f"{name}.{self.fmt}")
+        if self.fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+
+    def close(self, report):
+        for name, df in _tables(self.results, self.run_at).items():
+            self._write(name, df)
+        self._write("report", report)
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# =====================================================
+# Entry point
+# =====================================================
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the financial analysis pipeline without the UI."
+    )
+    parser.add_argument(
+        "source", nargs="?",
+        help="directory or glob of <entity>_income.csv / "
+             "<entity>_balance.csv pairs"
+    )
+    parser.add_argument("--income", help="income statement CSV (one company)")
+    parser.add_argument("--balance", help="balance sheet CSV (one company)")
+    parser.add_argument("--entity", default="Company",
+                        help="entity name for --income/--balance")
+    parser.add_argument("--assumptions", help="assumptions JSON file")
+    parser.add_argument(
+        "--mode", default="auto_clean_warn",
+        choices=["auto_clean_warn", "auto_clean", "strict"]
+    )
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--db", help="write results to this SQLite file")
+    parser.add_argument("--output-dir", help="write columnar files here")
+    parser.add_argument("--format", default="parquet",
+                        choices=["parquet", "csv"])
+    parser.add_argument("--compact", action="store_true",
+                        help="use float32 / categorical dtypes in memory")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if bool(args.source) == bool(args.income or args.balance):
+        parser.error("give either SOURCE or --income and --balance")
+    if not args.source and not (args.income and args.balance):
+        parser.error("--income and --balance must be given together")
+    if bool(args.db) == bool(args.output_dir):
+        parser.error("give exactly one of --db or --output-dir")
+    if args.output_dir and args.format == "parquet" and not _parquet_available():
+        parser.error("parquet output needs pyarrow; use --format csv")
+
+    try:
+        assumptions = load_assumptions(args.assumptions)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.source:
+        pairs, unpaired = discover_pairs(args.source)
+    else:
+        pairs, unpaired = {args.entity: (args.income, args.balance)}, {}
+
+    writer = (
+        SQLiteWriter(args.db) if args.db
+        else ColumnarWriter(args.output_dir, args.format)
+    )
+
+    start = time.perf_counter()
+    rows = []
+    for result in run_pipeline(
+        pairs, assumptions, args.mode, args.workers, args.compact
+    ):
+        writer.add(result)
+        rows.append({
+            "Entity": result["entity"],
+            "status": "ok" if result["error"] is None else "error",
+            "scenarios": len(result["forecasts"]),
+            "warnings": len(result["warnings"]),
+            "seconds": result["seconds"],
+            "error": result["error"]
+        })
+    for entity, error in sorted(unpaired.items()):
+        rows.append({
+            "Entity": entity, "status": "error", "scenarios": 0,
+            "warnings": 0, "seconds": 0.0, "error": error
+        })
+
+    report = pd.DataFrame(
+        rows,
+        columns=["Entity", "status", "scenarios", "warnings", "seconds", "error"]
+    )
+    writer.close(report)
+
+    elapsed = time.perf_counter() - start
+    failed = report[report["status"] == "error"]
+    print(
+        f"{len(report) - len(failed)}/{len(report)} entities ok "
+        f"in {elapsed:.1f}s ({len(report) / max(elapsed, 1e-9):.0f}/s)"
+    )
+
+    if not failed.empty:
+        print("Errors:", file=sys.stderr)
+        for _, row in failed.iterrows():
+            print(f"  {row['Entity']}: {row['error']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# Compact dtypes
+# =====================================================
+# Opt-in memory-saving representation carried through the pipeline:
+# monetary columns as float32, Year as the smallest integer type that
+# holds it, and Type / entity columns as categoricals. Stages detect
+# compact input with is_compact() and keep their output compact.
+MONEY_DTYPE = np.float32
+
+# Year is read as int32, then narrowed to the first type that holds it
+YEAR_READ_DTYPE = np.int32
+YEAR_DTYPES = [np.int16, np.int32]
+
+MONETARY_COLS = [
+    "Revenue",
+    "Operating_Expense",
+    "Net_Income",
+    "EBIT",
+    "Interest_Expense",
+    "Tax",
+    "Total_Assets",
+    "Total_Liabilities",
+    "Equity",
+    "Current_Assets",
+    "Current_Liabilities"
+]
+
+TYPE_CATEGORIES = ["Historical", "Forecast"]
+
+
+def is_compact(df) -> bool:
+    """True when the frame carries float32 monetary columns."""
+    return any(
+        df[col].dtype == MONEY_DTYPE
+        for col in MONETARY_COLS if col in df.columns
+    )
+
+
+def compact_year(year: pd.Series) -> pd.Series:
+    """Downcast Year to int16/int32 when it has no missing values."""
+    if year.isna().any():
+        return year
+    if year.dtype.kind not in "iu":
+        return pd.to_numeric(year, downcast="integer")
+
+    # Pick the type from the range instead of trial conversions
+    values = year.to_numpy()
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for dtype in YEAR_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return year.astype(dtype)
+    return year
+
+
+def type_column(label, n):
+    """A Type column of n identical labels as a categorical."""
+    return pd.Categorical.from_codes(
+        np.full(n, TYPE_CATEGORIES.index(label), dtype=np.int8),
+        categories=TYPE_CATEGORIES
+    )
+
+
+def compact_frame(df, entity_col=None) -> pd.DataFrame:
+    """
+    Compact dtypes for a frame. Only the converted columns are
+    rebuilt; other columns are shared with df, not copied.
+    """
+    df = df.copy(deep=False)
+
+    for col in MONETARY_COLS:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(MONEY_DTYPE)
+
+    if "Year" in df.columns and pd.api.types.is_numeric_dtype(df["Year"]):
+        df["Year"] = compact_year(df["Year"])
+
+    for col in ("Type", entity_col):
+        if col is not None and col in df.columns:
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def frame_bytes(df) -> int:
+    """Memory held by a frame, counting string contents."""
+    return int(df.memory_usage(deep=True, index=True).sum())
@@ -4,21 +4,190 @@ from schema_mapper import (
     INCOME_STATEMENT_MAPPING,
     BALANCE_SHEET_MAPPING
 )
+from profiler import profiled
+from compact import MONEY_DTYPE, MONETARY_COLS, YEAR_READ_DTYPE, compact_frame
 
+# Rows read first in compact mode to tell text columns from numbers
+SAMPLE_ROWS = 100
 
-def load_income_statement(file):
-    df = pd.read_csv(file)
 
-    column_map = map_columns(df.columns, INCOME_STATEMENT_MAPPING)
-    df = df.rename(columns=column_map)
+def _read_compact(file, mapping_dict):
+    """
+    Read monetary columns straight into float32, Year into int32 and
+    text columns (entity, labels) as categoricals. Falls back to
+    a normal read of the numeric columns (then downcast) if one has
+    missing or non-numeric values, so the validator still sees and
+    reports them.
+    """
+    start = file.tell() if hasattr(file, "seek") else None
 
-    return df
+    sample = pd.read_csv(file, nrows=SAMPLE_ROWS)
+    header = sample.columns
+    column_map = map_columns(header, mapping_dict)
+    dtypes = {
+        raw: MONEY_DTYPE for raw, col in column_map.items()
+        if col in MONETARY_COLS
+    }
+    dtypes.update(
+        {raw: YEAR_READ_DTYPE for raw, col in column_map.items() if col == "Year"}
+    )
+    # Text columns (entity, labels) go straight to categories, never to
+    # a string per row
+    labels = {
+        raw: "category" for raw in header
+        if raw not in dtypes and not pd.api.types.is_numeric_dtype(sample[raw])
+    }
+
+    if start is not None:
+        file.seek(start)
+    try:
+        df = pd.read_csv(file, dtype={**dtypes, **labels})
+    except ValueError:
+        if start is not None:
+            file.seek(start)
+        df = pd.read_csv(file, dtype=labels)
 
+    return compact_frame(df.rename(columns=column_map))
+
+
+def _load_statement(file, mapping_dict, compact):
+    if compact:
+        return _read_compact(file, mapping_dict)
 
-def load_balance_sheet(file):
     df = pd.read_csv(file)
 
-    column_map = map_columns(df.columns, BALANCE_SHEET_MAPPING)
+    column_map = map_columns(df.columns, mapping_dict)
     df = df.rename(columns=column_map)
 
     return df
+
+
+@profiled
+def load_income_statement(file, compact=False):
+    """
+    compact=True reads monetary columns as float32 and Year as a small
+    integer (see compact.py).
+    """
+    return _load_statement(file, INCOME_STATEMENT_MAPPING, compact)
+
+
+@profiled
+def load_balance_sheet(file, compact=False):
+    """
+    compact=True reads monetary columns as float32 and Year as a small
+    integer (see compact.py).
+    """
+    return _load_statement(file, BALANCE_SHEET_MAPPING, compact)
+
+
+# =====================================================
+# STREAMING LEDGER INGESTION
+# =====================================================
+INCOME_FLOW_COLS = ["Revenue", "Operating_Expense", "Net_Income"]
+BALANCE_STOCK_COLS = ["Total_Assets", "Total_Liabilities", "Equity"]
+
+
+def _map_accounts(accounts, account_map):
+    """
+    Map account codes to standard columns. Keys ending in "*" are
+    prefixes ("4*" -> every account starting with 4); exact codes win,
+    then the longest matching prefix ("41*" before "4*").
+    """
+    exact = {k: v for k, v in account_map.items() if not k.endswith("*")}
+    mapped = accounts.map(exact)
+
+    prefixes = sorted(
+        (k for k in account_map if k.endswith("*")), key=len, reverse=True
+    )
+    for prefix in prefixes:
+        hit = mapped.isna() & accounts.str.startswith(prefix[:-1])
+        mapped = mapped.mask(hit, account_map[prefix])
+
+    return mapped
+
+
+@profiled
+def load_ledger(
+    file,
+    account_map,
+    date_col="Date",
+    account_col="Account",
+    amount_col="Amount",
+    fiscal_year_start_month=1,
+    opening_balances=None,
+    chunksize=500000
+):
+    """
+    Stream a transaction-level general ledger and aggregate it to
+    annual statements without loading the whole file.
+
+    account_map : {account code or "prefix*": standard column}, e.g.
+                  {"4*": "Revenue", "6*": "Operating_Expense",
+                   "1*": "Total_Assets", "2*": "Total_Liabilities"}
+    Amounts are taken in the natural sign of the line they map to.
+    Income lines are summed per fiscal year; balance lines are running
+    balances (opening_balances + postings to date) at year end.
+    Fiscal years are named after the calendar year they end in.
+
+    Net_Income defaults to Revenue - Operating_Expense and Equity to
+    Total_Assets - Total_Liabilities when not mapped explicitly.
+
+    Returns (income_df, balance_df) in the shape the validator expects.
+    Peak memory is bounded by chunksize, not by the file size.
+    """
+    totals = None
+
+    for chunk in pd.read_csv(
+        file,
+        usecols=[date_col, account_col, amount_col],
+        dtype={account_col: str},
+        chunksize=chunksize
+    ):
+        dates = pd.to_datetime(chunk[date_col], errors="coerce")
+        year = dates.dt.year
+        if fiscal_year_start_month != 1:
+            year = year + (dates.dt.month >= fiscal_year_start_month)
+
+        line = _map_accounts(chunk[account_col].str.strip(), account_map)
+        amount = pd.to_numeric(chunk[amount_col], errors="coerce").astype(float)
+
+        keep = line.notna() & year.notna() & amount.notna()
+        partial = amount[keep].groupby(
+            [year[keep].astype(int).rename("Year"), line[keep].rename("Line")]
+        ).sum()
+
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None or totals.empty:
+        raise ValueError("Ledger contains no mapped transactions")
+
+    annual = totals.unstack("Line", fill_value=0.0).sort_index()
+    annual.columns.name = None
+    mapped_lines = set(annual.columns)
+    annual = annual.reindex(
+        columns=sorted(mapped_lines | {
+            "Revenue", "Operating_Expense",
+            "Total_Assets", "Total_Liabilities"
+        }),
+        fill_value=0.0
+    )
+
+    income = annual[["Revenue", "Operating_Expense"]].copy()
+    if "Net_Income" in mapped_lines:
+        income["Net_Income"] = annual["Net_Income"]
+    else:
+        income["Net_Income"] = income["Revenue"] - income["Operating_Expense"]
+
+    opening = opening_balances or {}
+    balance = pd.DataFrame(index=annual.index)
+    for col in ["Total_Assets", "Total_Liabilities"]:
+        balance[col] = opening.get(col, 0.0) + annual[col].cumsum()
+    if "Equity" in mapped_lines:
+        balance["Equity"] = opening.get("Equity", 0.0) + annual["Equity"].cumsum()
+    else:
+        balance["Equity"] = balance["Total_Assets"] - balance["Total_Liabilities"]
+
+    return (
+        income[INCOME_FLOW_COLS].reset_index(),
+        balance[BALANCE_STOCK_COLS].reset_index()
+    )
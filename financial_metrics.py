@@ -1,6 +1,11 @@
+import numpy as np
 import pandas as pd
 
+from profiler import profiled
+from compact import MONEY_DTYPE, is_compact
 
+
+@profiled
 def merge_financials(
     income_df: pd.DataFrame,
     balance_df: pd.DataFrame
@@ -17,40 +22,165 @@ def merge_financials(
     return merged
 
 
-def compute_financial_ratios(df: pd.DataFrame) -> pd.DataFrame:
+# =====================================================
+# Ratio registry
+# =====================================================
+# name -> {"numerator", "denominator", "inputs", "on_zero", "group"}
+# numerator/denominator are a column name or a function of the input
+# arrays. on_zero decides the result where the denominator is 0:
+# "nan" (undefined), "inf" (keep the signed infinity) or "zero".
+RATIOS = {}
+
+ZERO_POLICIES = ("nan", "inf", "zero")
+
+# Computed when no ratios are requested (the Dashboard set)
+DEFAULT_RATIOS = [
+    "Operating_Margin",
+    "Net_Profit_Margin",
+    "ROA",
+    "ROE",
+    "Debt_Ratio"
+]
+
+
+def register_ratio(
+    name,
+    numerator,
+    denominator,
+    inputs=None,
+    on_zero="nan",
+    group="other"
+):
+    """
+    Declare a ratio. inputs lists the columns it reads; it is inferred
+    when numerator and denominator are plain column names.
+    """
+    if on_zero not in ZERO_POLICIES:
+        raise ValueError(f"on_zero must be one of {ZERO_POLICIES}")
+
+    if inputs is None:
+        inputs = [
+            part for part in (numerator, denominator)
+            if isinstance(part, str)
+        ]
+        if len(inputs) < 2:
+            raise ValueError(f"inputs are required for ratio {name}")
+
+    RATIOS[name] = {
+        "numerator": numerator,
+        "denominator": denominator,
+        "inputs": list(dict.fromkeys(inputs)),
+        "on_zero": on_zero,
+        "group": group
+    }
+
+
+# Profitability
+register_ratio(
+    "Operating_Margin",
+    lambda c: c["Revenue"] - c["Operating_Expense"], "Revenue",
+    inputs=["Revenue", "Operating_Expense"], group="profitability"
+)
+register_ratio(
+    "Net_Profit_Margin", "Net_Income", "Revenue", group="profitability"
+)
+
+# Returns
+register_ratio("ROA", "Net_Income", "Total_Assets", group="return")
+register_ratio("ROE", "Net_Income", "Equity", group="return")
+
+# Leverage
+register_ratio(
+    "Debt_Ratio", "Total_Liabilities", "Total_Assets", group="leverage"
+)
+register_ratio(
+    "Debt_To_Equity", "Total_Liabilities", "Equity", group="leverage"
+)
+
+# Liquidity
+register_ratio(
+    "Current_Ratio", "Current_Assets", "Current_Liabilities",
+    on_zero="inf", group="liquidity"
+)
+
+# Coverage
+register_ratio(
+    "Interest_Coverage", "EBIT", "Interest_Expense",
+    on_zero="inf", group="coverage"
+)
+
+
+def available_ratios(columns) -> list:
+    """Registered ratios whose inputs are all in columns."""
+    columns = set(columns)
+    return [
+        name for name, spec in RATIOS.items()
+        if set(spec["inputs"]) <= columns
+    ]
+
+
+def _part(part, arrays):
+    return arrays[part] if isinstance(part, str) else part(arrays)
+
+
+@profiled
+def compute_financial_ratios(
+    df: pd.DataFrame,
+    ratios=None,
+    dtype=None,
+    columns_only=False
+) -> pd.DataFrame:
     """
     Compute key financial ratios.
     Assumes merged, validated data.
+
+    ratios: names from RATIOS (default DEFAULT_RATIOS, "all" for every
+    ratio whose inputs are present). Each input column is read once as
+    a NumPy array and every ratio is a single vectorized division;
+    zero denominators follow the ratio's on_zero policy instead of
+    silently producing inf/NaN. dtype defaults to float32 for compact
+    input (see compact.py) and float64 otherwise.
+
+    Returns df with the ratio columns appended, or only the ratio
+    columns with columns_only=True. The input frame is not copied.
     """
-    df = df.copy()
+    if ratios is None:
+        ratios = DEFAULT_RATIOS
+    elif ratios == "all":
+        ratios = available_ratios(df.columns)
 
-    # -----------------------------
-    # Profitability Ratios
-    # -----------------------------
-    df["Operating_Margin"] = (
-        (df["Revenue"] - df["Operating_Expense"]) / df["Revenue"]
-    )
+    unknown = [name for name in ratios if name not in RATIOS]
+    if unknown:
+        raise ValueError(f"Unknown ratio(s): {unknown}")
 
-    df["Net_Profit_Margin"] = (
-        df["Net_Income"] / df["Revenue"]
-    )
+    needed = list(dict.fromkeys(
+        col for name in ratios for col in RATIOS[name]["inputs"]
+    ))
+    missing = [col for col in needed if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for ratios: {missing}")
 
-    # -----------------------------
-    # Return Ratios
-    # -----------------------------
-    df["ROA"] = (
-        df["Net_Income"] / df["Total_Assets"]
-    )
+    if dtype is None:
+        dtype = MONEY_DTYPE if is_compact(df) else np.float64
 
-    df["ROE"] = (
-        df["Net_Income"] / df["Equity"]
-    )
+    arrays = {col: df[col].to_numpy(dtype=dtype) for col in needed}
 
-    # -----------------------------
-    # Leverage Ratios
-    # -----------------------------
-    df["Debt_Ratio"] = (
-        df["Total_Liabilities"] / df["Total_Assets"]
-    )
+    results = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for name in ratios:
+            spec = RATIOS[name]
+            numerator = _part(spec["numerator"], arrays)
+            denominator = _part(spec["denominator"], arrays)
+
+            values = numerator / denominator
+            if spec["on_zero"] != "inf":
+                fill = np.nan if spec["on_zero"] == "nan" else 0.0
+                values[denominator == 0] = fill
+            results[name] = values.astype(dtype, copy=False)
+
+    ratio_df = pd.DataFrame(results, index=df.index, copy=False)
+    if columns_only:
+        return ratio_df
 
-    return df
+    existing = [name for name in ratios if name in df.columns]
+    return pd.concat([df.drop(columns=existing), ratio_df], axis=1)
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+import storage
+from forecasting import forecast_financials, ENGINE_VERSION
+
+# =====================================================
+# Cache configuration
+# =====================================================
+MEMORY_MAX_BYTES = 64 * 1024 * 1024
+DISK_MAX_BYTES = 256 * 1024 * 1024
+CACHE_FILE_NAME = "forecast_cache.db"
+
+DRIVER_DEFAULTS = {
+    "revenue_growth": 0.05,
+    "variable_cost_ratio": 0.30,
+    "fixed_cost": 200000,
+    "tax_rate": 0.25,
+    "interest_rate": 0.06,
+    "debt_change": 0.0
+}
+
+# Shared by every app session (Streamlit runs them as threads), so all
+# reads and writes of the memory tier hold _memory_lock
+_memory = OrderedDict()
+_memory_bytes = 0
+_memory_lock = threading.Lock()
+_disk_ready = set()
+
+
+def cache_path():
+    """The on-disk tier lives next to scenarios.db."""
+    return os.path.join(os.path.dirname(storage.DB_NAME), CACHE_FILE_NAME)
+
+
+# =====================================================
+# Keys
+# =====================================================
+def forecast_key(
+    historical_df, years_ahead=3, frequency="A", seasonality=None, **drivers
+):
+    """
+    Content address of a forecast: hash of the historical frame's
+    content, every driver value, years_ahead and ENGINE_VERSION, plus
+    frequency and seasonality when they are not the annual default
+    (so keys of annual forecasts are unchanged).
+    """
+    values = dict(DRIVER_DEFAULTS)
+    values.update(drivers)
+
+    content = {
+        "history": storage.hash_frame(historical_df),
+        "drivers": {k: float(v) for k, v in sorted(values.items())},
+        "years_ahead": int(years_ahead),
+        "engine": ENGINE_VERSION
+    }
+    if frequency != "A":
+        content["frequency"] = frequency
+        content["seasonality"] = (
+            seasonality if seasonality is None or isinstance(seasonality, str)
+            else [float(w) for w in seasonality]
+        )
+    payload = json.dumps(content, sort_keys=True)
+
+    return "forecast:" + hashlib.sha256(payload.encode()).hexdigest()
+
+
+# =====================================================
+# Memory tier
+# =====================================================
+def _memory_get(key):
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        _memory.move_to_end(key)
+        return entry[0]
+
+
+def _memory_put(key, df):
+    global _memory_bytes
+
+    size = int(df.memory_usage(deep=True).sum())
+    with _memory_lock:
+        if key in _memory:
+            return
+        _memory[key] = (df, size)
+        _memory_bytes += size
+
+        while _memory_bytes > MEMORY_MAX_BYTES and len(_memory) > 1:
+            _, (_, evicted_size) = _memory.popitem(last=False)
+            _memory_bytes -= evicted_size
+
+
+# =====================================================
+# Disk tier
+# =====================================================
+def _disk_connection():
+    path = cache_path()
+    conn = storage.get_connection(path)
+    if path in _disk_ready:
+        return conn
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            forecast_key TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS forecast_columns (
+            forecast_key TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            dtype TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (forecast_key, position)
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access
+        ON cache_entries (last_access)
+    """)
+    _disk_ready.add(path)
+    return conn
+
+
+@storage.with_retry
+def _disk_get(key):
+    conn = _disk_connection()
+    rows = conn.execute("""
+        SELECT column_name, dtype, data FROM forecast_columns
+        WHERE forecast_key = ?
+        ORDER BY position
+    """, (key,)).fetchall()
+
+    if not rows:
+        return None
+
+    with conn:
+        conn.execute(
+            "UPDATE cache_entries SET last_access = ? WHERE forecast_key = ?",
+            (time.time(), key)
+        )
+    return storage.decode_frame(rows)
+
+
+@storage.with_retry
+def _disk_put(key, df):
+    conn = _disk_connection()
+    rows = storage.encode_frame(key, df)
+    size = sum(len(row[-1]) for row in rows)
+
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "DELETE FROM forecast_columns WHERE forecast_key = ?", (key,)
+        )
+        conn.executemany(
+            "INSERT INTO forecast_columns VALUES (?, ?, ?, ?, ?)", rows
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)",
+            (key, size, time.time())
+        )
+
+        # Evict least recently used entries beyond the size budget
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()[0]
+        if total > DISK_MAX_BYTES:
+            for old_key, old_size in conn.execute("""
+                SELECT forecast_key, size FROM cache_entries
+                WHERE forecast_key != ?
+                ORDER BY last_access
+            """, (key,)).fetchall():
+                conn.execute(
+                    "DELETE FROM forecast_columns WHERE forecast_key = ?",
+                    (old_key,)
+                )
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE forecast_key = ?",
+                    (old_key,)
+                )
+                total -= old_size
+                if total <= DISK_MAX_BYTES:
+                    break
+
+
+# =====================================================
+# Public API
+# =====================================================
+def cached_forecast(
+    historical_df, years_ahead=3, frequency="A", seasonality=None, **drivers
+):
+    """
+    forecast_financials with a memory (LRU) and on-disk cache.
+
+    Returns (forecast_key, forecast_df). Pass the key to
+    storage.save_scenario so duplicate saves share one stored forecast.
+    """
+    key = forecast_key(
+        historical_df, years_ahead, frequency, seasonality, **drivers
+    )
+
+    df = _memory_get(key)
+    if df is None:
+        df = _disk_get(key)
+        if df is None:
+            df = forecast_financials(
+                historical_df, years_ahead=years_ahead, frequency=frequency,
+                seasonality=seasonality, **drivers
+            )
+            _disk_put(key, df)
+        _memory_put(key, df)
+
+    return key, df.copy()
+
+
+def clear_forecast_cache(disk=True):
+    global _memory_bytes
+
+    with _memory_lock:
+        _memory.clear()
+        _memory_bytes = 0
+
+    if disk:
+        conn = _disk_connection()
+        with conn:
+            conn.execute("DELETE FROM forecast_columns")
+            conn.execute("DELETE FROM cache_entries")
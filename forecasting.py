@@ -1,5 +1,12 @@
+import numpy as np
 import pandas as pd
 
+from profiler import profiled
+from compact import MONEY_DTYPE, is_compact, type_column
+
+# Bump when forecast logic changes so cached results are not reused
+ENGINE_VERSION = 1
+
 # =====================================================
 # HELPER FUNCTIONS (ADD HERE)
 # =====================================================
@@ -15,6 +22,7 @@ def calculate_break_even_revenue(fixed_cost, variable_cost_ratio):
 # =====================================================
 # MAIN FORECAST FUNCTION
 # =====================================================
+@profiled
 def forecast_financials(
     historical_df,
     years_ahead=3,
@@ -23,53 +31,371 @@ def forecast_financials(
     fixed_cost=200000,
     tax_rate=0.25,
     interest_rate=0.06,
-    debt_change=0.0
+    debt_change=0.0,
+    frequency="A",
+    seasonality=None
 ):
-    df = historical_df.copy()
-    last = df.iloc[-1]
+    """
+    Historical rows followed by years_ahead forecast rows (Type column
+    tells them apart). Compact input (see compact.py) gives compact
+    output: float32 values, the input's Year dtype and a categorical
+    Type. The input frame is not copied or modified.
 
-    revenue = last["Revenue"]
-    assets = last["Total_Assets"]
-    liabilities = last["Total_Liabilities"]
+    With frequency "Q" or "M" the model runs per quarter / month (see
+    forecast_periods) and the forecast rows are its annual_rollup.
+    """
+    periods = forecast_periods(
+        historical_df,
+        years_ahead=years_ahead,
+        revenue_growth=revenue_growth,
+        variable_cost_ratio=variable_cost_ratio,
+        fixed_cost=fixed_cost,
+        tax_rate=tax_rate,
+        interest_rate=interest_rate,
+        debt_change=debt_change,
+        frequency=frequency,
+        seasonality=seasonality
+    )
+    forecast_df = annual_rollup(periods)
 
-    forecasts = []
-    last_year = int(last["Year"])
+    if is_compact(historical_df):
+        forecast_df = forecast_df.astype({
+            col: MONEY_DTYPE for col in forecast_df.columns
+            if col not in ("Year", "Type")
+        })
+        forecast_df["Year"] = forecast_df["Year"].astype(
+            historical_df["Year"].dtype
+        )
+        forecast_df["Type"] = type_column("Forecast", len(forecast_df))
+        hist = historical_df.assign(
+            Type=type_column("Historical", len(historical_df))
+        )
+    else:
+        hist = historical_df.assign(Type="Historical")
 
-    for i in range(1, years_ahead + 1):
-        year = last_year + i
+    return pd.concat([hist, forecast_df], ignore_index=True)
 
-        revenue *= (1 + revenue_growth)
 
-        variable_cost = revenue * variable_cost_ratio
-        operating_cost = fixed_cost + variable_cost
-        ebit = revenue - operating_cost
+# =====================================================
+# BATCH (VECTORIZED) FORECAST
+# =====================================================
+BATCH_COLUMNS = [
+    "Revenue",
+    "Operating_Expense",
+    "Net_Income",
+    "EBIT",
+    "Interest_Expense",
+    "Tax",
+    "Total_Assets",
+    "Total_Liabilities",
+    "Equity"
+]
 
-        liabilities *= (1 + debt_change)
-        interest = liabilities * interest_rate
 
-        taxable_income = ebit - interest
-        tax = max(taxable_income, 0) * tax_rate
+# =====================================================
+# PERIODS AND SEASONALITY
+# =====================================================
+# Periods per year for each forecast frequency
+FREQUENCIES = {"A": 1, "Q": 4, "M": 12}
 
-        net_income = taxable_income - tax
+# Monthly revenue weights (January first); rescaled to average 1
+SEASONALITY_PROFILES = {
+    "flat": [1.0] * 12,
+    "retail": [0.8, 0.8, 0.9, 0.95, 1.0, 0.95, 0.95, 1.0, 0.95, 1.05, 1.25, 1.4],
+    "summer": [0.75, 0.8, 0.9, 1.0, 1.1, 1.25, 1.3, 1.25, 1.05, 0.95, 0.85, 0.8],
+    "year_end": [0.9, 0.9, 1.0, 0.9, 0.9, 1.0, 0.9, 0.9, 1.0, 1.0, 1.1, 1.5]
+}
 
-        assets += net_income
-        equity = assets - liabilities
+# Income statement lines are summed per year, balances take year end
+FLOW_COLUMNS = [
+    "Revenue",
+    "Operating_Expense",
+    "Net_Income",
+    "EBIT",
+    "Interest_Expense",
+    "Tax"
+]
+STOCK_COLUMNS = ["Total_Assets", "Total_Liabilities", "Equity"]
 
-        forecasts.append({
-            "Year": year,
-            "Revenue": revenue,
-            "Operating_Expense": operating_cost,
-            "Net_Income": net_income,
-            "EBIT": ebit,
-            "Interest_Expense": interest,
-            "Tax": tax,
-            "Total_Assets": assets,
-            "Total_Liabilities": liabilities,
-            "Equity": equity,
-            "Type": "Forecast"
-        })
 
-    hist = df.copy()
-    hist["Type"] = "Historical"
+def periods_per_year(frequency) -> int:
+    if frequency not in FREQUENCIES:
+        raise ValueError(
+            f"Unknown frequency: {frequency} (use one of {list(FREQUENCIES)})"
+        )
+    return FREQUENCIES[frequency]
+
+
+def seasonal_weights(seasonality, periods):
+    """
+    Revenue weight per period of the year, averaging 1, or None when
+    flat. seasonality is a SEASONALITY_PROFILES name or a sequence of
+    12 monthly or `periods` weights; monthly weights are averaged into
+    quarters for periods=4.
+    """
+    if seasonality is None or periods == 1:
+        return None
+
+    if isinstance(seasonality, str):
+        if seasonality not in SEASONALITY_PROFILES:
+            raise ValueError(f"Unknown seasonality profile: {seasonality}")
+        seasonality = SEASONALITY_PROFILES[seasonality]
+
+    weights = np.asarray(seasonality, dtype=float)
+    if len(weights) == 12 and periods != 12:
+        weights = weights.reshape(periods, -1).mean(axis=1)
+    if len(weights) != periods or not (weights > 0).all():
+        raise ValueError(
+            f"seasonality needs 12 or {periods} positive weights"
+        )
+
+    weights = weights / weights.mean()
+    return None if np.allclose(weights, 1.0) else weights
+
+
+def _compound(start, factor, years_ahead):
+    """
+    Repeated multiplication start * factor * factor * ... evaluated with
+    cumprod, in the same order as the scalar loop so results match bit
+    for bit.
+    """
+    steps = np.repeat(factor[:, None], years_ahead, axis=1)
+    return np.cumprod(np.column_stack([start, steps]), axis=1)[:, 1:]
+
+
+@profiled
+def forecast_paths(
+    revenue,
+    assets,
+    liabilities,
+    years_ahead=3,
+    revenue_growth=0.05,
+    variable_cost_ratio=0.30,
+    fixed_cost=200000,
+    tax_rate=0.25,
+    interest_rate=0.06,
+    debt_change=0.0,
+    periods=1,
+    seasonality=None
+):
+    """
+    Evaluate the forecast recurrence for many scenarios at once.
+
+    Every argument may be a scalar or a 1-D array; they are broadcast
+    to a common number of scenarios S. Returns a dict mapping each
+    column in BATCH_COLUMNS to an array of shape (S, years_ahead).
+
+    With periods > 1 (4 quarterly, 12 monthly) the recurrence steps
+    per period and arrays are (S, years_ahead * periods): growth and
+    debt change compound at the equivalent per-period rate, fixed cost
+    and interest are spread evenly, and seasonal_weights shape revenue.
+    Revenue starts from the period level whose implied prior-year
+    periods sum to the annual `revenue`, so with flat seasonality each
+    year's periods add up to the annual model's revenue. Tax is charged
+    on each period's positive taxable income.
+    """
+    (
+        revenue, assets, liabilities,
+        revenue_growth, variable_cost_ratio, fixed_cost,
+        tax_rate, interest_rate, debt_change
+    ) = (
+        np.ravel(a) for a in np.broadcast_arrays(*(
+            np.asarray(v, dtype=float) for v in (
+                revenue, assets, liabilities,
+                revenue_growth, variable_cost_ratio, fixed_cost,
+                tax_rate, interest_rate, debt_change
+            )
+        ))
+    )
+
+    steps = years_ahead * periods
+    if periods == 1:
+        growth, debt_growth = 1 + revenue_growth, 1 + debt_change
+    else:
+        growth = (1 + revenue_growth) ** (1 / periods)
+        debt_growth = (1 + debt_change) ** (1 / periods)
+        revenue = revenue / np.sum(
+            growth[:, None] ** -np.arange(periods), axis=1
+        )
+        fixed_cost = fixed_cost / periods
+        interest_rate = interest_rate / periods
+
+    rev = _compound(revenue, growth, steps)
+    weights = seasonal_weights(seasonality, periods)
+    if weights is not None:
+        rev = rev * np.tile(weights, years_ahead)
+
+    variable_cost = rev * variable_cost_ratio[:, None]
+    operating_cost = fixed_cost[:, None] + variable_cost
+    ebit = rev - operating_cost
+
+    liab = _compound(liabilities, debt_growth, steps)
+    interest = liab * interest_rate[:, None]
+
+    taxable_income = ebit - interest
+    tax = np.maximum(taxable_income, 0) * tax_rate[:, None]
+
+    net_income = taxable_income - tax
+
+    total_assets = np.cumsum(
+        np.column_stack([assets, net_income]), axis=1
+    )[:, 1:]
+    equity = total_assets - liab
+
+    return {
+        "Revenue": rev,
+        "Operating_Expense": operating_cost,
+        "Net_Income": net_income,
+        "EBIT": ebit,
+        "Interest_Expense": interest,
+        "Tax": tax,
+        "Total_Assets": total_assets,
+        "Total_Liabilities": liab,
+        "Equity": equity
+    }
+
+
+@profiled
+def forecast_batch(
+    historical_df,
+    years_ahead=3,
+    revenue_growth=0.05,
+    variable_cost_ratio=0.30,
+    fixed_cost=200000,
+    tax_rate=0.25,
+    interest_rate=0.06,
+    debt_change=0.0,
+    as_frame=False
+):
+    """
+    Batch version of forecast_financials.
+
+    Drivers may be scalars or equal-length arrays (one entry per
+    scenario). Returns an array of shape
+    (scenarios, years_ahead, len(BATCH_COLUMNS)), or with
+    as_frame=True a long-format DataFrame with Scenario and Year
+    columns holding the forecast rows only.
+    """
+    last = historical_df.iloc[-1]
+
+    paths = forecast_paths(
+        last["Revenue"],
+        last["Total_Assets"],
+        last["Total_Liabilities"],
+        years_ahead=years_ahead,
+        revenue_growth=revenue_growth,
+        variable_cost_ratio=variable_cost_ratio,
+        fixed_cost=fixed_cost,
+        tax_rate=tax_rate,
+        interest_rate=interest_rate,
+        debt_change=debt_change
+    )
+
+    if not as_frame:
+        return np.stack([paths[col] for col in BATCH_COLUMNS], axis=-1)
+
+    n_scenarios = paths["Revenue"].shape[0]
+    years = int(last["Year"]) + np.arange(1, years_ahead + 1)
+
+    frame = pd.DataFrame({
+        "Scenario": np.repeat(np.arange(n_scenarios), years_ahead),
+        "Year": np.tile(years, n_scenarios)
+    })
+    for col in BATCH_COLUMNS:
+        frame[col] = paths[col].ravel()
+
+    return frame
+
+
+# =====================================================
+# PERIODIC FORECAST
+# =====================================================
+@profiled
+def forecast_periods(
+    historical_df,
+    years_ahead=3,
+    revenue_growth=0.05,
+    variable_cost_ratio=0.30,
+    fixed_cost=200000,
+    tax_rate=0.25,
+    interest_rate=0.06,
+    debt_change=0.0,
+    frequency="M",
+    seasonality=None
+):
+    """
+    Forecast rows only, one per period ("A", "Q" or "M") over
+    years_ahead years, from the last historical year. Drivers are
+    annual; see forecast_paths for how they are applied per period.
+    Returns Year, Period (1..periods per year), BATCH_COLUMNS and Type.
+    """
+    periods = periods_per_year(frequency)
+    last = historical_df.iloc[-1]
+
+    paths = forecast_paths(
+        last["Revenue"],
+        last["Total_Assets"],
+        last["Total_Liabilities"],
+        years_ahead=years_ahead,
+        revenue_growth=revenue_growth,
+        variable_cost_ratio=variable_cost_ratio,
+        fixed_cost=fixed_cost,
+        tax_rate=tax_rate,
+        interest_rate=interest_rate,
+        debt_change=debt_change,
+        periods=periods,
+        seasonality=seasonality
+    )
+
+    steps = np.arange(years_ahead * periods)
+    columns = {
+        "Year": int(last["Year"]) + 1 + steps // periods,
+        "Period": steps % periods + 1
+    }
+    columns.update({col: paths[col][0] for col in BATCH_COLUMNS})
+    columns["Type"] = "Forecast"
+    return pd.DataFrame(columns)
+
+
+def annual_paths(paths, periods):
+    """
+    forecast_paths output rolled up to years, as in annual_rollup:
+    FLOW_COLUMNS summed over each year's periods, STOCK_COLUMNS at the
+    last period. Annual paths (periods=1) are returned unchanged.
+    """
+    if periods == 1:
+        return paths
+
+    annual = {}
+    for col in BATCH_COLUMNS:
+        values = paths[col]
+        if col in FLOW_COLUMNS:
+            annual[col] = values.reshape(len(values), -1, periods).sum(axis=2)
+        else:
+            annual[col] = values[:, periods - 1::periods]
+    return annual
+
+
+def annual_rollup(periods_df):
+    """
+    One row per Year: FLOW_COLUMNS summed over the year's periods,
+    STOCK_COLUMNS at the last period. Rows must be in period order.
+    Annual input comes back unchanged (without Period).
+    """
+    if periods_df.empty:
+        return periods_df.drop(columns="Period", errors="ignore")
+
+    years = periods_df["Year"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    ends = np.r_[starts[1:], len(years)] - 1
 
-    return pd.concat([hist, pd.DataFrame(forecasts)], ignore_index=True)
+    columns = {"Year": years[starts]}
+    for col in BATCH_COLUMNS:
+        values = periods_df[col].to_numpy()
+        if col in FLOW_COLUMNS:
+            columns[col] = np.add.reduceat(values, starts)
+        else:
+            columns[col] = values[ends]
+    if "Type" in periods_df.columns:
+        columns["Type"] = periods_df["Type"].to_numpy()[ends]
+    return pd.DataFrame(columns)
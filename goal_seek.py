@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import annual_paths, forecast_paths, periods_per_year
+
+# =====================================================
+# Goal-seek defaults
+# =====================================================
+BASE_INPUTS = {
+    "revenue_growth": 0.05,
+    "variable_cost_ratio": 0.30,
+    "fixed_cost": 200000,
+    "tax_rate": 0.25,
+    "interest_rate": 0.06,
+    "debt_change": 0.0
+}
+
+# Search interval per driver. fixed_cost is scaled by last revenue.
+DEFAULT_BOUNDS = {
+    "revenue_growth": (-0.99, 2.0),
+    "variable_cost_ratio": (0.0, 1.0),
+    "fixed_cost": (0.0, 10.0),
+    "tax_rate": (0.0, 1.0),
+    "interest_rate": (0.0, 1.0),
+    "debt_change": (-0.99, 2.0)
+}
+
+SEEK_METRICS = [
+    "Revenue",
+    "Operating_Expense",
+    "Net_Income",
+    "EBIT",
+    "Interest_Expense",
+    "Tax",
+    "Total_Assets",
+    "Total_Liabilities",
+    "Equity",
+    "Debt_Ratio"
+]
+
+MAX_ITERATIONS = 100
+
+
+def _metric(paths, metric, step):
+    if metric == "Debt_Ratio":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                paths["Total_Liabilities"][:, step]
+                / paths["Total_Assets"][:, step]
+            )
+    return paths[metric][:, step]
+
+
+# =====================================================
+# Goal seek
+# =====================================================
+def goal_seek(
+    historical_df,
+    driver,
+    target,
+    metric="Net_Income",
+    year=None,
+    years_ahead=3,
+    base_inputs=None,
+    bounds=None,
+    entity_col=None,
+    xtol=1e-9,
+    frequency="A",
+    seasonality=None
+):
+    """
+    Solve for the value of one driver that makes `metric` equal
+    `target` in forecast year `year` (1..years_ahead, default last).
+
+    Bisection runs on all problems at once: target may be a scalar or
+    an array, and with entity_col every entity in a panel is solved
+    from its own last year. The other drivers come from base_inputs.
+
+    A problem is "solved" only if metric - target changes sign across
+    the driver's bounds; otherwise Solution is NaN and Status is
+    "no_solution" (e.g. a target beyond what any value can reach, or a
+    flat region such as tax_rate when taxable income is negative).
+
+    frequency and seasonality run the model per quarter / month as in
+    forecast_periods; metrics are then read from the annual roll-up.
+
+    Returns one row per problem with Target, Solution, Achieved and
+    Status (plus entity_col for panels).
+    """
+    if driver not in BASE_INPUTS:
+        raise ValueError(f"Unknown driver: {driver}")
+    if metric not in SEEK_METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    periods = periods_per_year(frequency)
+    step = (years_ahead if year is None else year) - 1
+    if not 0 <= step < years_ahead:
+        raise ValueError(f"year must be between 1 and {years_ahead}")
+
+    if entity_col is None:
+        last = historical_df.iloc[[-1]]
+    else:
+        last = (
+            historical_df.sort_values([entity_col, "Year"])
+            .groupby(entity_col, sort=False).tail(1)
+        )
+
+    target = np.atleast_1d(np.asarray(target, dtype=float))
+    if len(last) > 1 and len(target) not in (1, len(last)):
+        raise ValueError("target must be a scalar or one value per entity")
+    n = max(len(last), len(target))
+
+    def start(col):
+        return np.broadcast_to(last[col].to_numpy(dtype=float), n)
+
+    revenue = start("Revenue")
+    assets = start("Total_Assets")
+    liabilities = start("Total_Liabilities")
+    target = np.broadcast_to(target, n)
+
+    inputs = dict(BASE_INPUTS)
+    inputs.update(
+        {k: v for k, v in (base_inputs or {}).items() if v is not None}
+    )
+
+    lo, hi = (bounds or {}).get(driver, DEFAULT_BOUNDS[driver])
+    lo = np.full(n, lo, dtype=float)
+    hi = np.full(n, hi, dtype=float)
+    if driver == "fixed_cost" and not (bounds and driver in bounds):
+        lo, hi = lo * revenue, hi * revenue
+
+    def gap(value):
+        inputs[driver] = value
+        paths = annual_paths(forecast_paths(
+            revenue, assets, liabilities, years_ahead=years_ahead,
+            periods=periods, seasonality=seasonality, **inputs
+        ), periods)
+        return _metric(paths, metric, step) - target
+
+    def open_width():
+        # Relative tolerance so large fixed costs still converge
+        scale = np.maximum(1.0, np.maximum(np.abs(lo), np.abs(hi)))
+        return hi - lo > xtol * scale
+
+    g_lo, g_hi = gap(lo), gap(hi)
+    bracketed = (
+        np.isfinite(g_lo) & np.isfinite(g_hi)
+        & (np.sign(g_lo) * np.sign(g_hi) <= 0)
+    )
+
+    # Bisection; problems that are not bracketed just ride along
+    for _ in range(MAX_ITERATIONS):
+        if not (bracketed & open_width()).any():
+            break
+        mid = (lo + hi) / 2
+        g_mid = gap(mid)
+        same_side = np.sign(g_mid) == np.sign(g_lo)
+        lo = np.where(same_side, mid, lo)
+        g_lo = np.where(same_side, g_mid, g_lo)
+        hi = np.where(same_side, hi, mid)
+
+    solution = np.where(bracketed, (lo + hi) / 2, np.nan)
+    achieved = gap(solution) + target
+
+    status = np.where(
+        ~bracketed, "no_solution",
+        np.where(open_width(), "not_converged", "solved")
+    )
+
+    years = np.broadcast_to(last["Year"].to_numpy(dtype=int), n) + step + 1
+
+    result = pd.DataFrame({
+        "Driver": driver,
+        "Metric": metric,
+        "Year": years,
+        "Target": target,
+        "Solution": solution,
+        "Achieved": achieved,
+        "Status": status
+    })
+    if entity_col is not None:
+        result.insert(
+            0, entity_col,
+            np.broadcast_to(last[entity_col].to_numpy(), n)
+        )
+    return result
@@ -0,0 +1,310 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import storage
+from profiler import profiled
+from financial_metrics import compute_financial_ratios, DEFAULT_RATIOS
+from cashflow import compute_cash_flow, CASH_FLOW_COLUMNS
+
+# =====================================================
+# Persisted history
+# =====================================================
+# One row per (Entity, Year) in history.db next to scenarios.db, with
+# the derived ratios and cash-flow lines stored alongside the inputs.
+# upsert_history only recomputes the rows an upload can affect: the
+# new / changed years and the year after each (its diff() changes).
+HISTORY_FILE_NAME = "history.db"
+DEFAULT_ENTITY = "Company"
+
+MANDATORY_COLUMNS = [
+    "Revenue",
+    "Operating_Expense",
+    "Net_Income",
+    "Total_Assets",
+    "Total_Liabilities",
+    "Equity"
+]
+OPTIONAL_COLUMNS = ["Current_Assets", "Current_Liabilities"]
+BASE_COLUMNS = MANDATORY_COLUMNS + OPTIONAL_COLUMNS
+DERIVED_COLUMNS = DEFAULT_RATIOS + CASH_FLOW_COLUMNS
+HISTORY_COLUMNS = ["Entity", "Year"] + BASE_COLUMNS + DERIVED_COLUMNS
+
+# Year-over-year change (as a fraction) reported as a suspicious jump
+MAX_JUMP = 5.0
+JUMP_COLUMNS = ["Revenue", "Total_Assets"]
+
+STATUSES = ["new", "changed", "unchanged", "recomputed"]
+
+_ready = set()
+
+
+def history_path():
+    """The history lives next to scenarios.db."""
+    return os.path.join(os.path.dirname(storage.DB_NAME), HISTORY_FILE_NAME)
+
+
+def _connection(path=None):
+    path = path or history_path()
+    conn = storage.get_connection(path)
+    if path in _ready:
+        return conn
+
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS financial_history (
+            Entity TEXT NOT NULL,
+            Year INTEGER NOT NULL,
+            {", ".join(f"{col} REAL" for col in BASE_COLUMNS + DERIVED_COLUMNS)},
+            PRIMARY KEY (Entity, Year)
+        ) WITHOUT ROWID
+    """)
+    _ready.add(path)
+    return conn
+
+
+def init_db(path=None):
+    """Create the history table if it does not exist yet."""
+    _connection(path)
+
+
+# =====================================================
+# Neighbour checks
+# =====================================================
+def _neighbour_warnings(combined, check):
+    """
+    Gap and jump warnings for the rows in `check`, against the previous
+    year of the same entity in combined (sorted by Entity, Year).
+    """
+    n = len(combined)
+    entity = combined["Entity"].to_numpy()
+    year = combined["Year"].to_numpy()
+    has_prev = np.zeros(n, dtype=bool)
+    has_prev[1:] = entity[1:] == entity[:-1]
+    check = check & has_prev
+
+    warnings = np.full(n, None, dtype=object)
+    prev_year = np.r_[0, year[:-1]]
+
+    gap = check & (year - prev_year > 1)
+    for i in np.flatnonzero(gap):
+        warnings[i] = f"No data between {prev_year[i]} and {year[i]}"
+
+    for col in JUMP_COLUMNS:
+        values = combined[col].to_numpy(dtype=float)
+        prev = np.r_[np.nan, values[:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.abs(values / prev - 1)
+        for i in np.flatnonzero(check & (change > MAX_JUMP)):
+            message = f"{col} changed by {change[i]:.0%} from {prev_year[i]}"
+            warnings[i] = message if warnings[i] is None else (
+                f"{warnings[i]}; {message}"
+            )
+
+    return warnings
+
+
+# =====================================================
+# Upsert
+# =====================================================
+def _incoming(df, entity, entity_col):
+    missing = [c for c in ["Year"] + MANDATORY_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns for history: {missing}")
+
+    columns = {
+        "Entity": (
+            df[entity_col].astype(str).to_numpy() if entity_col is not None
+            else np.full(len(df), entity or DEFAULT_ENTITY, dtype=object)
+        ),
+        "Year": df["Year"].to_numpy(dtype=np.int64)
+    }
+    for col in BASE_COLUMNS:
+        columns[col] = (
+            df[col].to_numpy(dtype=float) if col in df.columns
+            else np.full(len(df), np.nan)
+        )
+    incoming = pd.DataFrame(columns)
+
+    if incoming.duplicated(["Entity", "Year"]).any():
+        raise ValueError("Duplicate (entity, year) rows in upload")
+    return incoming
+
+
+def _stored_window(cursor, conn, incoming):
+    """
+    Stored rows of the uploaded entities from the year before the first
+    uploaded year to the year after the last one.
+    """
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS history_bounds (
+            Entity TEXT PRIMARY KEY, lo INTEGER, hi INTEGER
+        )
+    """)
+    cursor.execute("DELETE FROM history_bounds")
+
+    bounds = incoming.groupby("Entity", sort=False)["Year"].agg(["min", "max"])
+    cursor.executemany(
+        "INSERT INTO history_bounds VALUES (?, ?, ?)",
+        zip(bounds.index, bounds["min"].tolist(), bounds["max"].tolist())
+    )
+    cursor.execute("""
+        UPDATE history_bounds SET
+            lo = COALESCE((
+                SELECT MAX(h.Year) FROM financial_history h
+                WHERE h.Entity = history_bounds.Entity
+                AND h.Year < history_bounds.lo
+            ), lo),
+            hi = COALESCE((
+                SELECT MIN(h.Year) FROM financial_history h
+                WHERE h.Entity = history_bounds.Entity
+                AND h.Year > history_bounds.hi
+            ), hi)
+    """)
+
+    # CROSS JOIN keeps the (small) bounds table as the outer loop, so
+    # the history is only read through its primary key
+    stored = pd.read_sql(f"""
+        SELECT h.Entity, h.Year, {", ".join(f"h.{c}" for c in BASE_COLUMNS)}
+        FROM history_bounds b
+        CROSS JOIN financial_history h
+        ON h.Entity = b.Entity AND h.Year BETWEEN b.lo AND b.hi
+    """, conn)
+    # NULLs (and an empty result) come back as object columns
+    return stored.astype(
+        {"Entity": object, "Year": np.int64, **dict.fromkeys(BASE_COLUMNS, float)}
+    )
+
+
+def _keys(df):
+    return pd.MultiIndex.from_arrays([df["Entity"], df["Year"]])
+
+
+def _row_status(incoming, stored, positions):
+    """
+    Status of each incoming row against the stored row with its key
+    (positions: row of the key in stored, -1 when it is new).
+    """
+    is_new = positions < 0
+    matched = np.where(is_new, 0, positions)
+
+    same = ~is_new
+    for col in BASE_COLUMNS:
+        stored_values = stored[col].to_numpy()
+        if not len(stored_values):
+            break
+        same &= np.isclose(
+            incoming[col].to_numpy(), stored_values[matched],
+            rtol=0, atol=0, equal_nan=True
+        )
+    return np.where(is_new, "new", np.where(same, "unchanged", "changed"))
+
+
+@profiled
+@storage.with_retry
+def upsert_history(df, entity=None, entity_col=None, strict=False, path=None):
+    """
+    Insert or update the years in df (merged, validated statements) in
+    the stored history, keyed by (entity, Year). One company's frame
+    goes under `entity`; a panel gives its entities in entity_col.
+
+    Only new / changed years and the stored year after each are
+    recomputed (ratios are per row, cash flows diff against the
+    previous year); the rest of the history is not read. Uploaded
+    years are checked against their stored neighbours: year gaps and
+    year-over-year jumps above MAX_JUMP are reported as warnings, or
+    raise ValueError with strict=True (nothing is written).
+
+    Returns one row per uploaded or recomputed year: Entity, Year,
+    Status (see STATUSES) and Warning.
+    """
+    incoming = _incoming(df, entity, entity_col)
+
+    conn = _connection(path)
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        stored = _stored_window(cursor, conn, incoming)
+
+        positions = _keys(stored).get_indexer(_keys(incoming))
+        incoming["Status"] = _row_status(incoming, stored, positions)
+        kept = np.ones(len(stored), dtype=bool)
+        kept[positions[positions >= 0]] = False
+
+        combined = pd.concat(
+            [stored[kept].assign(Status=None), incoming], ignore_index=True
+        ).sort_values(["Entity", "Year"], ignore_index=True)
+
+        # Rows to rewrite: changed years and the year after each
+        entity_values = combined["Entity"].to_numpy()
+        changed = combined["Status"].isin(["new", "changed"]).to_numpy()
+        affected = changed.copy()
+        affected[1:] |= changed[:-1] & (entity_values[1:] == entity_values[:-1])
+
+        warnings = _neighbour_warnings(combined, affected)
+        if strict and any(w is not None for w in warnings):
+            raise ValueError(
+                "; ".join(w for w in warnings if w is not None)
+            )
+
+        cash_flow = compute_cash_flow(
+            combined, entity_col="Entity", columns_only=True
+        )
+        rows = combined[affected]
+        rows = pd.concat([
+            rows,
+            compute_financial_ratios(rows, columns_only=True),
+            cash_flow[affected]
+        ], axis=1)
+
+        cursor.executemany(
+            f"""
+            INSERT OR REPLACE INTO financial_history ({", ".join(HISTORY_COLUMNS)})
+            VALUES ({", ".join("?" * len(HISTORY_COLUMNS))})
+            """,
+            zip(*(
+                [None if v != v else v for v in rows[col].tolist()]
+                for col in HISTORY_COLUMNS
+            ))
+        )
+
+    combined["Warning"] = warnings
+    combined.loc[affected & ~changed, "Status"] = "recomputed"
+    report = combined[combined["Status"].notna()]
+    return report[["Entity", "Year", "Status", "Warning"]].reset_index(drop=True)
+
+
+# =====================================================
+# Reads
+# =====================================================
+@profiled
+@storage.with_retry
+def load_history(entity=None, years=None, path=None) -> pd.DataFrame:
+    """
+    Stored history (inputs, ratios and cash flow) sorted by Entity and
+    Year, optionally for one entity and a (first, last) year range.
+    """
+    where, params = [], []
+    if entity is not None:
+        where.append("Entity = ?")
+        params.append(entity)
+    if years is not None:
+        where.append("Year BETWEEN ? AND ?")
+        params.extend(int(y) for y in years)
+
+    return pd.read_sql(
+        f"""
+        SELECT {", ".join(HISTORY_COLUMNS)} FROM financial_history
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY Entity, Year
+        """,
+        _connection(path), params=params
+    )
+
+
+def list_entities(path=None) -> list:
+    return [
+        row[0] for row in _connection(path).execute(
+            "SELECT DISTINCT Entity FROM financial_history ORDER BY Entity"
+        )
+    ]
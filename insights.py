@@ -1,21 +1,327 @@
-def generate_insights(df):
-    insights = []
+import operator
 
-    rev_growth = (df["Revenue"].iloc[-1] / df["Revenue"].iloc[0]) - 1
-    margin_trend = df["Net_Income"].iloc[-1] - df["Net_Income"].iloc[0]
-    debt_ratio = df["Total_Liabilities"].iloc[-1] / df["Total_Assets"].iloc[-1]
+import numpy as np
+import pandas as pd
 
-    if rev_growth > 0.2:
-        insights.append("Revenue shows strong long-term growth.")
+from profiler import profiled
+from cashflow import compute_cash_flow
 
-    if margin_trend > 0:
-        insights.append("Profitability has improved over time.")
-    else:
-        insights.append("Profitability pressure observed.")
+# =====================================================
+# Thresholds
+# =====================================================
+# Named thresholds shared by rules; override per call with
+# evaluate_rules(..., thresholds={...})
+THRESHOLDS = {
+    "strong_growth": 0.20,
+    "high_debt_ratio": 0.60,
+    "margin_change": 0.02,
+    "revenue_decline": 0.0,
+    "cash_flow": 0.0
+}
 
-    if debt_ratio > 0.6:
-        insights.append("High leverage increases financial risk.")
-    else:
-        insights.append("Debt levels remain manageable.")
+SEVERITIES = ["positive", "info", "warning", "critical"]
 
-    return insights
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le
+}
+
+INSIGHT_COLUMNS = ["Rule", "Severity", "Value", "Threshold", "Message"]
+
+
+# =====================================================
+# Metric registry
+# =====================================================
+# name -> {"func", "inputs"}. func receives a _Panel and returns one
+# value per entity, computed on whole arrays.
+METRICS = {}
+
+
+def register_metric(name, func, inputs):
+    """Declare a per-entity metric that rules can test."""
+    METRICS[name] = {"func": func, "inputs": list(inputs)}
+
+
+class _Panel:
+    """
+    First / last rows of every entity of a panel, found in one sort.
+    Entities keep their order of first appearance.
+    """
+
+    def __init__(self, df, entity_col):
+        if entity_col is None:
+            codes = np.zeros(len(df), dtype=np.int64)
+            self.entities = None
+        else:
+            codes, self.entities = pd.factorize(
+                df[entity_col], use_na_sentinel=False
+            )
+
+        year = df["Year"].to_numpy()
+        order = np.lexsort((year, codes))
+        codes = codes[order]
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)] - 1
+        self.first_rows, self.last_rows = order[starts], order[ends]
+        self.codes = codes[starts]
+        self.df = df
+
+    def first(self, col):
+        return self.df[col].to_numpy(dtype=float)[self.first_rows]
+
+    def last(self, col):
+        return self.df[col].to_numpy(dtype=float)[self.last_rows]
+
+    def span(self):
+        """Years between each entity's first and last row."""
+        return self.last("Year") - self.first("Year")
+
+
+def _safe_divide(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / denominator, np.nan)
+
+
+def _divide(numerator, denominator):
+    """Plain division: signed inf for x / 0, NaN only for 0 / 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / denominator
+
+
+def _cagr(p):
+    growth = _safe_divide(p.last("Revenue"), p.first("Revenue"))
+    span = p.span()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            (growth > 0) & (span > 0), growth ** (1 / span) - 1, np.nan
+        )
+
+
+def _margin_trend(p):
+    return (
+        _safe_divide(p.last("Net_Income"), p.last("Revenue"))
+        - _safe_divide(p.first("Net_Income"), p.first("Revenue"))
+    )
+
+
+register_metric(
+    "Revenue_Growth",
+    lambda p: _divide(p.last("Revenue"), p.first("Revenue")) - 1,
+    ["Revenue"]
+)
+register_metric("Revenue_CAGR", _cagr, ["Revenue"])
+register_metric(
+    "Net_Income_Change",
+    lambda p: p.last("Net_Income") - p.first("Net_Income"),
+    ["Net_Income"]
+)
+register_metric("Net_Margin_Trend", _margin_trend, ["Net_Income", "Revenue"])
+register_metric(
+    "Debt_Ratio",
+    lambda p: _divide(p.last("Total_Liabilities"), p.last("Total_Assets")),
+    ["Total_Liabilities", "Total_Assets"]
+)
+
+# Latest-year cash-flow lines (computed by compute_cash_flow if absent)
+CASH_FLOW_METRICS = ["CFO", "CFI", "CFF", "FCF"]
+
+for _line in CASH_FLOW_METRICS:
+    register_metric(
+        _line, lambda p, line=_line: p.last(line),
+        ["Net_Income", "Total_Assets", "Total_Liabilities"]
+    )
+
+
+# =====================================================
+# Rule registry
+# =====================================================
+# name -> {"metric", "op", "threshold", "severity", "message",
+# "fire_on_nan"}. threshold is a number or a key of THRESHOLDS.
+INSIGHT_RULES = {}
+
+
+def register_rule(name, metric, op, threshold, severity, message,
+                  fire_on_nan=False):
+    """
+    Declare an insight: fires where `metric op threshold` holds, and
+    also where the metric is NaN when fire_on_nan is set.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if op not in OPERATORS:
+        raise ValueError(f"op must be one of {list(OPERATORS)}")
+    if severity not in SEVERITIES:
+        raise ValueError(f"severity must be one of {SEVERITIES}")
+
+    INSIGHT_RULES[name] = {
+        "metric": metric,
+        "op": op,
+        "threshold": threshold,
+        "severity": severity,
+        "message": message,
+        "fire_on_nan": fire_on_nan
+    }
+
+
+# Growth
+register_rule(
+    "strong_revenue_growth", "Revenue_Growth", ">", "strong_growth",
+    "positive", "Revenue shows strong long-term growth."
+)
+register_rule(
+    "revenue_decline", "Revenue_CAGR", "<", "revenue_decline",
+    "warning", "Revenue is shrinking year over year."
+)
+
+# Profitability. The "otherwise" rules also fire on NaN, as the
+# original if / else did.
+register_rule(
+    "profitability_improved", "Net_Income_Change", ">", 0,
+    "positive", "Profitability has improved over time."
+)
+register_rule(
+    "profitability_pressure", "Net_Income_Change", "<=", 0,
+    "warning", "Profitability pressure observed.", fire_on_nan=True
+)
+register_rule(
+    "margin_expanding", "Net_Margin_Trend", ">", "margin_change",
+    "positive", "Net margin is expanding."
+)
+
+# Leverage
+register_rule(
+    "high_leverage", "Debt_Ratio", ">", "high_debt_ratio",
+    "critical", "High leverage increases financial risk."
+)
+register_rule(
+    "manageable_debt", "Debt_Ratio", "<=", "high_debt_ratio",
+    "info", "Debt levels remain manageable.", fire_on_nan=True
+)
+
+# Cash flow
+register_rule(
+    "negative_operating_cash_flow", "CFO", "<", "cash_flow",
+    "critical", "Operations are consuming cash."
+)
+register_rule(
+    "negative_free_cash_flow", "FCF", "<", "cash_flow",
+    "warning", "Free cash flow is negative."
+)
+register_rule(
+    "debt_financed", "CFF", ">", "cash_flow",
+    "info", "New borrowing is funding the business."
+)
+
+# The rules generate_insights has always reported
+DEFAULT_RULES = [
+    "strong_revenue_growth",
+    "profitability_improved",
+    "profitability_pressure",
+    "high_leverage",
+    "manageable_debt"
+]
+
+
+def available_rules(columns) -> list:
+    """Registered rules whose metric inputs are all in columns."""
+    columns = set(columns) | {"Year"}
+    return [
+        name for name, rule in INSIGHT_RULES.items()
+        if set(METRICS[rule["metric"]]["inputs"]) <= columns
+    ]
+
+
+# =====================================================
+# Evaluation
+# =====================================================
+@profiled
+def evaluate_rules(df, entity_col=None, rules=None, thresholds=None):
+    """
+    Evaluate insight rules for every entity of a panel at once.
+
+    rules: names from INSIGHT_RULES (default DEFAULT_RULES, "all" for
+    every rule whose inputs are present). thresholds overrides entries
+    of THRESHOLDS. Each metric is one vectorized expression over the
+    entities' first / last rows (by Year); NaN metrics only fire rules
+    registered with fire_on_nan.
+
+    Returns a tidy frame with one row per fired rule: entity_col (when
+    given), Rule, Severity, Value, Threshold and Message, ordered by
+    entity (first appearance) then rule order.
+    """
+    if rules is None:
+        rules = DEFAULT_RULES
+    elif rules == "all":
+        rules = available_rules(df.columns)
+
+    unknown = [name for name in rules if name not in INSIGHT_RULES]
+    if unknown:
+        raise ValueError(f"Unknown rule(s): {unknown}")
+
+    metrics = list(dict.fromkeys(INSIGHT_RULES[r]["metric"] for r in rules))
+    needed = {col for m in metrics for col in METRICS[m]["inputs"]} | {"Year"}
+    missing = sorted(needed - set(df.columns))
+    if missing:
+        raise ValueError(f"Missing columns for rules: {missing}")
+
+    columns = ([entity_col] if entity_col is not None else []) + INSIGHT_COLUMNS
+    if df.empty or not rules:
+        return pd.DataFrame(columns=columns)
+
+    limits = dict(THRESHOLDS)
+    limits.update(thresholds or {})
+
+    if any(m in CASH_FLOW_METRICS for m in metrics) and "CFO" not in df.columns:
+        df = pd.concat(
+            [df, compute_cash_flow(df, entity_col=entity_col, columns_only=True)],
+            axis=1
+        )
+
+    panel = _Panel(df, entity_col)
+    values = {m: METRICS[m]["func"](panel) for m in metrics}
+
+    # Sort key entity * n_rules + rule position orders the output
+    sort_keys, parts = [], {col: [] for col in INSIGHT_COLUMNS}
+    for rule_pos, name in enumerate(rules):
+        rule = INSIGHT_RULES[name]
+        threshold = rule["threshold"]
+        threshold = float(limits[threshold] if isinstance(threshold, str)
+                          else threshold)
+        metric = values[rule["metric"]]
+
+        hit = OPERATORS[rule["op"]](metric, threshold)
+        if rule["fire_on_nan"]:
+            hit |= np.isnan(metric)
+        fired = np.flatnonzero(hit)
+        sort_keys.append(panel.codes[fired] * len(rules) + rule_pos)
+        parts["Rule"].append(np.full(len(fired), name, dtype=object))
+        parts["Severity"].append(
+            np.full(len(fired), rule["severity"], dtype=object)
+        )
+        parts["Value"].append(metric[fired])
+        parts["Threshold"].append(np.full(len(fired), threshold))
+        parts["Message"].append(
+            np.full(len(fired), rule["message"], dtype=object)
+        )
+
+    sort_keys = np.concatenate(sort_keys)
+    order = np.argsort(sort_keys, kind="stable")
+    result = pd.DataFrame({
+        col: np.concatenate(arrays)[order] for col, arrays in parts.items()
+    })
+
+    if entity_col is not None:
+        entity = panel.entities.take(sort_keys[order] // len(rules))
+        result.insert(0, entity_col, entity)
+    return result
+
+
+@profiled
+def generate_insights(df, rules=None, thresholds=None):
+    """Insight messages for one company (see evaluate_rules)."""
+    return evaluate_rules(
+        df, rules=rules, thresholds=thresholds
+    )["Message"].tolist()
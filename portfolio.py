@@ -0,0 +1,171 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_loader import load_income_statement, load_balance_sheet
+from validator import validate_income_statement, validate_balance_sheet
+from financial_metrics import merge_financials
+
+# =====================================================
+# File discovery
+# =====================================================
+INCOME_SUFFIX = "_income"
+BALANCE_SUFFIX = "_balance"
+
+
+def _list_files(source):
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.csv")))
+    return sorted(glob.glob(source))
+
+
+def discover_pairs(
+    source,
+    income_suffix=INCOME_SUFFIX,
+    balance_suffix=BALANCE_SUFFIX
+):
+    """
+    Pair income and balance files by entity name.
+
+    source is a directory (all *.csv inside) or a glob pattern. A file
+    named "<entity><income_suffix>.csv" is paired with
+    "<entity><balance_suffix>.csv".
+
+    Returns ({entity: (income_path, balance_path)}, {entity: error}).
+    """
+    income, balance = {}, {}
+
+    for path in _list_files(source):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stem.endswith(income_suffix):
+            income[stem[:-len(income_suffix)]] = path
+        elif stem.endswith(balance_suffix):
+            balance[stem[:-len(balance_suffix)]] = path
+
+    pairs = {
+        e: (income[e], balance[e])
+        for e in sorted(income.keys() & balance.keys())
+    }
+
+    unpaired = {}
+    for entity in income.keys() - balance.keys():
+        unpaired[entity] = "Balance sheet file not found"
+    for entity in balance.keys() - income.keys():
+        unpaired[entity] = "Income statement file not found"
+
+    return pairs, unpaired
+
+
+# =====================================================
+# Per-entity worker
+# =====================================================
+def _process_entity(task):
+    entity, income_path, balance_path, mode = task
+    start = time.perf_counter()
+
+    try:
+        income = validate_income_statement(
+            load_income_statement(income_path), mode=mode
+        )
+        balance = validate_balance_sheet(
+            load_balance_sheet(balance_path), mode=mode
+        )
+        merged = merge_financials(income, balance)
+        warnings = (
+            income.attrs.get("warnings", [])
+            + balance.attrs.get("warnings", [])
+        )
+        return entity, merged, None, warnings, time.perf_counter() - start
+
+    except Exception as e:
+        return entity, None, str(e), [], time.perf_counter() - start
+
+
+# =====================================================
+# Portfolio loader
+# =====================================================
+def load_portfolio(
+    source,
+    entity_col="Entity",
+    mode="auto_clean_warn",
+    workers=None,
+    income_suffix=INCOME_SUFFIX,
+    balance_suffix=BALANCE_SUFFIX,
+    progress=None
+):
+    """
+    Load, map, validate and merge every entity in a directory/glob.
+
+    Entities are processed in a process pool (workers=None uses all
+    cores, workers=1 runs inline). A failing entity never aborts the
+    run; it is recorded in the report instead.
+
+    progress : optional callable(done, total) called as entities finish.
+
+    Returns (panel, report):
+    - panel  : one frame sorted by (entity_col, Year)
+    - report : per entity status, rows, warnings, seconds and error;
+               report.attrs holds total elapsed time and throughput.
+    """
+    start = time.perf_counter()
+
+    pairs, unpaired = discover_pairs(source, income_suffix, balance_suffix)
+    tasks = [(e, inc, bal, mode) for e, (inc, bal) in pairs.items()]
+    total = len(tasks)
+
+    if workers == 1 or total <= 1:
+        results = map(_process_entity, tasks)
+        pool = None
+    else:
+        n_workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+        chunksize = max(1, total // (n_workers * 8))
+        results = pool.map(_process_entity, tasks, chunksize=chunksize)
+
+    frames, rows = [], []
+    try:
+        for done, (entity, merged, error, warnings, seconds) in enumerate(results, 1):
+            if merged is not None:
+                merged.insert(0, entity_col, entity)
+                frames.append(merged)
+
+            rows.append({
+                entity_col: entity,
+                "status": "ok" if error is None else "error",
+                "rows": 0 if merged is None else len(merged),
+                "warnings": len(warnings),
+                "seconds": seconds,
+                "error": error
+            })
+
+            if progress is not None:
+                progress(done, total)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for entity, error in sorted(unpaired.items()):
+        rows.append({
+            entity_col: entity, "status": "error", "rows": 0,
+            "warnings": 0, "seconds": 0.0, "error": error
+        })
+
+    if frames:
+        panel = pd.concat(frames, ignore_index=True)
+        panel = panel.sort_values([entity_col, "Year"], ignore_index=True)
+    else:
+        panel = pd.DataFrame(columns=[entity_col, "Year"])
+
+    report = pd.DataFrame(
+        rows,
+        columns=[entity_col, "status", "rows", "warnings", "seconds", "error"]
+    )
+
+    elapsed = time.perf_counter() - start
+    report.attrs["elapsed_seconds"] = elapsed
+    report.attrs["entities_per_second"] = total / elapsed if elapsed else 0.0
+
+    return panel, report
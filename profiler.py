@@ -0,0 +1,447 @@
+"""
+Lightweight stage profiler.
+
+Public pipeline functions are wrapped with @profiled; app code can time
+any block with `with stage("name"):`. Profiling is off by default (set
+FDSS_PROFILE=1 or call enable()), and a disabled wrapper costs one
+flag check per call.
+
+Switches and events belong to a Recorder; the module-level functions
+act on the current one (a context variable, set with use()), so
+concurrent app sessions each profile on their own.
+
+Per stage it records wall time, call count, output rows and, when
+enabled with memory=True, peak traced memory (tracemalloc) and the
+memory held by the returned frames.
+"""
+import contextvars
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# pandas is imported only by the reports, so importing the profiler (as
+# app.py does on every page) does not load it
+
+# Kept events per recorder; older events are dropped first
+MAX_EVENTS = 100000
+
+# Modules app.py imports lazily, for import_costs()
+APP_MODULES = [
+    "plotly.express",
+    "schema_mapper",
+    "data_loader",
+    "validator",
+    "financial_metrics",
+    "forecasting",
+    "forecast_cache",
+    "simulation",
+    "sensitivity",
+    "goal_seek",
+    "breakeven",
+    "cashflow",
+    "insights",
+    "storage"
+]
+
+_lock = threading.Lock()
+_local = threading.local()
+_origin = time.perf_counter()
+
+# Recorders currently enabled; profiled wrappers skip all work at 0
+_active = 0
+
+# tracemalloc is process-wide: recorders tracking memory share it and
+# it is stopped when the last one lets go (unless it was already on)
+_memory_users = 0
+_started_tracing = False
+
+
+def _acquire_tracing():
+    global _memory_users, _started_tracing
+    with _lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _memory_users += 1
+
+
+def _release_tracing():
+    global _memory_users, _started_tracing
+    with _lock:
+        _memory_users -= 1
+        if _memory_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+# =====================================================
+# Recorders
+# =====================================================
+class Recorder:
+    """
+    Switches and events of one profiling session (one Streamlit
+    session, one script). Stage events go to the current recorder.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = False
+        self.track_memory = False
+        self._events = []
+        self._events_lock = threading.Lock()
+        if enabled:
+            self.enable()
+
+    def enable(self, memory=False):
+        """Start recording. memory=True also tracks peak memory per stage."""
+        global _active
+        if memory and not self.track_memory:
+            _acquire_tracing()
+        elif not memory and self.track_memory:
+            _release_tracing()
+        self.track_memory = memory
+
+        if not self.enabled:
+            with _lock:
+                _active += 1
+        self.enabled = True
+
+    def disable(self):
+        global _active
+        if self.track_memory:
+            _release_tracing()
+            self.track_memory = False
+        if self.enabled:
+            with _lock:
+                _active -= 1
+        self.enabled = False
+
+    def __del__(self):
+        # A session that goes away while profiling gives back its share
+        try:
+            self.disable()
+        except Exception:
+            pass
+
+    def record(self, event):
+        with self._events_lock:
+            self._events.append(event)
+            if len(self._events) > MAX_EVENTS:
+                del self._events[:len(self._events) - MAX_EVENTS]
+
+    def events(self) -> list:
+        with self._events_lock:
+            return list(self._events)
+
+    def reset(self):
+        """Drop all recorded events."""
+        with self._events_lock:
+            self._events.clear()
+
+
+_default = Recorder(
+    enabled=os.environ.get("FDSS_PROFILE", "") not in ("", "0")
+)
+_current = contextvars.ContextVar("profiler_recorder", default=_default)
+
+
+def current() -> Recorder:
+    """The recorder stage events currently go to."""
+    return _current.get()
+
+
+def use(recorder):
+    """
+    Make recorder current for this thread / context (app.py sets the
+    session's recorder at the start of each rerun).
+    """
+    _current.set(recorder)
+    return recorder
+
+
+# =====================================================
+# Switches
+# =====================================================
+# Module-level switches and reports act on the current recorder
+def enable(memory=False):
+    """Start recording. memory=True also tracks peak memory per stage."""
+    current().enable(memory)
+
+
+def disable():
+    current().disable()
+
+
+def is_enabled() -> bool:
+    return current().enabled
+
+
+def reset():
+    """Drop all recorded events."""
+    current().reset()
+
+
+# =====================================================
+# Recording
+# =====================================================
+def _frame_types():
+    """DataFrame and Series, or () while pandas is not loaded."""
+    pd = sys.modules.get("pandas")
+    return (pd.DataFrame, pd.Series) if pd is not None else ()
+
+
+def _count_rows(result):
+    frame_types = _frame_types()
+    if isinstance(result, frame_types):
+        return len(result)
+    if isinstance(result, (tuple, list)):
+        return sum(
+            len(item) for item in result if isinstance(item, frame_types)
+        )
+    return None
+
+
+def _output_bytes(result):
+    frame_types = _frame_types()
+    frames = result if isinstance(result, (tuple, list)) else [result]
+    sizes = [
+        item.memory_usage(deep=True, index=True)
+        for item in frames if isinstance(item, frame_types)
+    ]
+    if not sizes:
+        return None
+    return int(sum(size.sum() for size in sizes))
+
+
+def _memory_stack():
+    stack = getattr(_local, "memory", None)
+    if stack is None:
+        stack = _local.memory = []
+    return stack
+
+
+def _child_stack():
+    """Per open stage on this thread, the seconds spent in its children."""
+    stack = getattr(_local, "children", None)
+    if stack is None:
+        stack = _local.children = []
+    return stack
+
+
+class _Timer:
+    """
+    Times one stage. Nested stages reset the tracemalloc peak, so each
+    stage folds the peak it has seen into its parent before resetting.
+    Each stage also adds its time to its parent's child time, so the
+    parent's self_seconds excludes it.
+    """
+
+    def __init__(self, name, recorder):
+        self.name = name
+        self.recorder = recorder
+        self.memory = recorder.track_memory and tracemalloc.is_tracing()
+
+    def __enter__(self):
+        if self.memory:
+            stack = _memory_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, current])
+        _child_stack().append(0.0)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop(None)
+        return False
+
+    def stop(self, result):
+        end = time.perf_counter()
+        seconds = end - self.start
+        peak_bytes = output_bytes = None
+
+        children = _child_stack()
+        child_seconds = children.pop()
+        if children:
+            children[-1] += seconds
+
+        if self.memory:
+            stack = _memory_stack()
+            start_bytes, seen_peak = stack.pop()
+            peak = max(seen_peak, tracemalloc.get_traced_memory()[1])
+            peak_bytes = max(peak - start_bytes, 0)
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            output_bytes = _output_bytes(result)
+
+        event = {
+            "stage": self.name,
+            "start": self.start - _origin,
+            "seconds": seconds,
+            "self_seconds": seconds - child_seconds,
+            "rows": _count_rows(result),
+            "peak_bytes": peak_bytes,
+            "output_bytes": output_bytes,
+            "thread": threading.get_ident()
+        }
+        self.recorder.record(event)
+
+
+def profiled(func=None, *, name=None):
+    """Decorator recording every call of func as one stage event."""
+    if func is None:
+        return lambda f: profiled(f, name=name)
+
+    stage_name = name or f"{func.__module__}.{func.__name__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _active:
+            return func(*args, **kwargs)
+        recorder = _current.get()
+        if not recorder.enabled:
+            return func(*args, **kwargs)
+        timer = _Timer(stage_name, recorder)
+        timer.__enter__()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            timer.stop(None)
+            raise
+        timer.stop(result)
+        return result
+
+    return wrapper
+
+
+@contextmanager
+def stage(name):
+    """Context manager recording the enclosed block as one stage event."""
+    recorder = _current.get()
+    if not (_active and recorder.enabled):
+        yield
+        return
+    with _Timer(name, recorder):
+        yield
+
+
+# =====================================================
+# Reports
+# =====================================================
+def events() -> list:
+    return current().events()
+
+
+def summary():
+    """
+    One row per stage: calls, total/self/mean/max time, rows, peak
+    memory and the size of the largest output (memory columns need
+    memory=True). Total_Seconds includes nested stages, so totals of
+    nested stages overlap; Self_Seconds excludes them and sums to the
+    profiled time, and rows are sorted by it.
+    """
+    import pandas as pd
+
+    columns = [
+        "Stage", "Calls", "Total_Seconds", "Self_Seconds", "Mean_ms",
+        "Max_ms",
+        "Rows", "Peak_MB", "Output_MB"
+    ]
+    df = pd.DataFrame(events())
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    grouped = df.groupby("stage", sort=False)
+    out = pd.DataFrame({
+        "Calls": grouped.size(),
+        "Total_Seconds": grouped["seconds"].sum(),
+        "Self_Seconds": grouped["self_seconds"].sum(),
+        "Mean_ms": grouped["seconds"].mean() * 1000,
+        "Max_ms": grouped["seconds"].max() * 1000,
+        "Rows": grouped["rows"].sum(min_count=1),
+        "Peak_MB": grouped["peak_bytes"].max() / 1e6,
+        "Output_MB": grouped["output_bytes"].max() / 1e6
+    })
+    out = out.rename_axis("Stage").reset_index()
+    return out.sort_values("Self_Seconds", ascending=False, ignore_index=True)
+
+
+def to_json() -> str:
+    return json.dumps({
+        "summary": summary().to_dict(orient="records"),
+        "events": events()
+    }, indent=2, default=str)
+
+
+def to_chrome_trace() -> str:
+    """Events in Chrome trace format (chrome://tracing, Perfetto)."""
+    pid = os.getpid()
+    trace = []
+    for event in events():
+        args = {"rows": event["rows"]}
+        if event["peak_bytes"] is not None:
+            args["peak_bytes"] = event["peak_bytes"]
+        if event.get("output_bytes") is not None:
+            args["output_bytes"] = event["output_bytes"]
+        trace.append({
+            "name": event["stage"],
+            "cat": event["stage"].split(".")[0],
+            "ph": "X",
+            "ts": event["start"] * 1e6,
+            "dur": event["seconds"] * 1e6,
+            "pid": pid,
+            "tid": event["thread"],
+            "args": args
+        })
+    return json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"})
+
+
+def export(path, fmt="json"):
+    """Write the profile to path as "json" or "chrome" trace."""
+    text = to_chrome_trace() if fmt == "chrome" else to_json()
+    with open(path, "w") as f:
+        f.write(text)
+
+
+# =====================================================
+# Startup cost
+# =====================================================
+def import_costs(modules=None, preload=()):
+    """
+    Cold import time of each module (default "app" and APP_MODULES),
+    measured in a fresh interpreter with `python -X importtime`. Nothing
+    is preloaded by default, so each figure is what a page importing
+    that module really pays (shared dependencies such as pandas
+    included); modules in preload are imported first and not counted.
+    """
+    import pandas as pd
+
+    rows = []
+    for module in modules or ["app"] + APP_MODULES:
+        code = "".join(f"import {m}; " for m in preload) + f"import {module}"
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        seconds = None
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                seconds = int(parts[1]) / 1e6
+        rows.append({"Module": module, "Import_Seconds": seconds})
+
+    return pd.DataFrame(rows).sort_values(
+        "Import_Seconds", ascending=False, ignore_index=True
+    )
+
+
+if __name__ == "__main__":
+    print(import_costs().to_string(index=False))
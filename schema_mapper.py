@@ -1,5 +1,22 @@
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
+# Bumped whenever synonyms are registered; part of every cache key
+MAPPING_VERSION = 0
+
+HEADER_CACHE_SIZE = 1024
+
+_compiled = {}
+
+# Shared by every app session (Streamlit runs them as threads), so all
+# reads and writes of the header cache hold _header_lock
+_header_cache = OrderedDict()
+_header_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4096)
 def normalize_column(col_name: str) -> str:
     """
     Normalize column names by:
@@ -11,21 +28,114 @@ def normalize_column(col_name: str) -> str:
     return col
 
 
+def compile_mapping(mapping_dict):
+    """
+    Build (once) the reverse index {normalized synonym: standard column}.
+    The index is rebuilt only when MAPPING_VERSION changes.
+    """
+    entry = _compiled.get(id(mapping_dict))
+    if entry and entry[0] is mapping_dict and entry[1] == MAPPING_VERSION:
+        return entry[2]
+
+    index = {}
+    for standard_col, synonyms in mapping_dict.items():
+        for synonym in synonyms:
+            index[normalize_column(synonym)] = standard_col
+
+    _compiled[id(mapping_dict)] = (mapping_dict, MAPPING_VERSION, index)
+    return index
+
+
+def _resolve(header, mapping_dict):
+    """
+    Resolve a header tuple against the compiled index.
+    Returns ({standard_col: [matching user columns]}, [unmapped columns]).
+    """
+    index = compile_mapping(mapping_dict)
+    matches = {}
+    unmapped = []
+
+    for user_col in header:
+        standard_col = index.get(normalize_column(user_col))
+        if standard_col is None:
+            unmapped.append(user_col)
+        else:
+            matches.setdefault(standard_col, []).append(user_col)
+
+    return matches, unmapped
+
+
 def map_columns(df_columns, mapping_dict):
     """
     Map user columns to internal standard columns.
     Returns a dictionary: {user_column: standard_column}
+
+    Results are cached per raw header layout, so files that share a
+    layout are mapped with a single dictionary lookup.
     """
-    normalized_cols = {col: normalize_column(col) for col in df_columns}
-    column_map = {}
+    header = tuple(df_columns)
+    key = (id(mapping_dict), MAPPING_VERSION, header)
 
-    for standard_col, synonyms in mapping_dict.items():
-        for user_col, norm_col in normalized_cols.items():
-            if norm_col in synonyms:
-                column_map[user_col] = standard_col
-                break
+    with _header_lock:
+        cached = _header_cache.get(key)
+        if cached is not None and cached[0] is mapping_dict:
+            _header_cache.move_to_end(key)
+            return dict(cached[1])
+
+    matches, _ = _resolve(header, mapping_dict)
+
+    # First matching user column wins, in standard column order
+    column_map = {
+        matches[standard_col][0]: standard_col
+        for standard_col in mapping_dict
+        if standard_col in matches
+    }
+
+    with _header_lock:
+        _header_cache[key] = (mapping_dict, column_map)
+        if len(_header_cache) > HEADER_CACHE_SIZE:
+            _header_cache.popitem(last=False)
+
+    return dict(column_map)
+
+
+def mapping_report(df_columns, mapping_dict):
+    """
+    Explain how a header maps:
+    - mapped    : {user_column: standard_column}
+    - ambiguous : {standard_column: [user columns]} when several match
+    - unmapped  : user columns matching no synonym
+    - missing   : standard columns with no matching user column
+    """
+    matches, unmapped = _resolve(tuple(df_columns), mapping_dict)
+
+    return {
+        "mapped": map_columns(df_columns, mapping_dict),
+        "ambiguous": {
+            std: cols for std, cols in matches.items() if len(cols) > 1
+        },
+        "unmapped": unmapped,
+        "missing": [std for std in mapping_dict if std not in matches]
+    }
+
+
+def register_synonyms(synonym_pack, mapping_dict):
+    """
+    Add user synonyms, e.g. {"Revenue": ["Umsatz", "Chiffre d'affaires"]}.
+    Synonyms are normalized on registration; caches are invalidated.
+    """
+    global MAPPING_VERSION
+
+    for standard_col, synonyms in synonym_pack.items():
+        known = mapping_dict.setdefault(standard_col, [])
+        for synonym in synonyms:
+            norm = normalize_column(synonym)
+            if norm not in known:
+                known.append(norm)
 
-    return column_map
+    MAPPING_VERSION += 1
+    with _header_lock:
+        _header_cache.clear()
 
 
 # ----------------------------
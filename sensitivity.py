@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import annual_paths, forecast_paths, periods_per_year
+
+# =====================================================
+# Tornado defaults
+# =====================================================
+BASE_INPUTS = {
+    "revenue_growth": 0.05,
+    "variable_cost_ratio": 0.30,
+    "fixed_cost": 200000,
+    "tax_rate": 0.25,
+    "interest_rate": 0.06,
+    "debt_change": 0.0
+}
+
+# Absolute +/- flex applied to each driver
+DEFAULT_DELTAS = {
+    "revenue_growth": 0.05,
+    "variable_cost_ratio": 0.05,
+    "fixed_cost": 50000,
+    "tax_rate": 0.05,
+    "interest_rate": 0.02,
+    "debt_change": 0.10
+}
+
+# Valid range per driver, as on the Decision Inputs sliders. Flexed
+# values are clipped to it.
+DRIVER_RANGES = {
+    "revenue_growth": (-0.20, 0.30),
+    "variable_cost_ratio": (0.10, 0.80),
+    "fixed_cost": (0.0, np.inf),
+    "tax_rate": (0.0, 0.40),
+    "interest_rate": (0.0, 0.15),
+    "debt_change": (-0.50, 0.50)
+}
+
+TORNADO_METRICS = ["Net_Income", "Equity", "Debt_Ratio"]
+
+
+# =====================================================
+# Tornado analysis
+# =====================================================
+def tornado_analysis(
+    historical_df,
+    base_inputs=None,
+    deltas=None,
+    years_ahead=3,
+    frequency="A",
+    seasonality=None,
+    ranges=None
+):
+    """
+    Flex every driver low/high around the base case and measure the
+    impact on final-year Net Income, Equity and Debt Ratio.
+
+    All 1 + 2 * len(drivers) cases are evaluated in a single batched
+    forecast. Returns a long frame with one row per (Driver, Metric)
+    sorted by swing (largest first), ready for a tornado chart.
+
+    Flexed inputs are clipped to DRIVER_RANGES (or `ranges`), so a
+    driver at the edge of its range only swings one way.
+
+    frequency and seasonality run the model per quarter / month as in
+    forecast_periods; Net Income is then the final year's total.
+    """
+    base = dict(BASE_INPUTS)
+    base.update({k: v for k, v in (base_inputs or {}).items() if v is not None})
+
+    flex = dict(DEFAULT_DELTAS)
+    flex.update(deltas or {})
+
+    drivers = list(flex)
+    cases = {name: np.full(1 + 2 * len(drivers), float(base[name]))
+             for name in BASE_INPUTS}
+
+    limits = dict(DRIVER_RANGES)
+    limits.update(ranges or {})
+
+    for i, name in enumerate(drivers):
+        cases[name][1 + 2 * i] -= flex[name]
+        cases[name][2 + 2 * i] += flex[name]
+        lo, hi = limits[name]
+        np.clip(cases[name][1 + 2 * i:3 + 2 * i], lo, hi,
+                out=cases[name][1 + 2 * i:3 + 2 * i])
+
+    periods = periods_per_year(frequency)
+    last = historical_df.iloc[-1]
+    paths = annual_paths(forecast_paths(
+        last["Revenue"],
+        last["Total_Assets"],
+        last["Total_Liabilities"],
+        years_ahead=years_ahead,
+        periods=periods,
+        seasonality=seasonality,
+        **cases
+    ), periods)
+
+    final = {
+        "Net_Income": paths["Net_Income"][:, -1],
+        "Equity": paths["Equity"][:, -1],
+        "Debt_Ratio": (
+            paths["Total_Liabilities"][:, -1] / paths["Total_Assets"][:, -1]
+        )
+    }
+
+    rows = []
+    for i, name in enumerate(drivers):
+        for metric in TORNADO_METRICS:
+            values = final[metric]
+            rows.append({
+                "Driver": name,
+                "Metric": metric,
+                "Low_Input": cases[name][1 + 2 * i],
+                "High_Input": cases[name][2 + 2 * i],
+                "Base": values[0],
+                "Low_Impact": values[1 + 2 * i] - values[0],
+                "High_Impact": values[2 + 2 * i] - values[0]
+            })
+
+    result = pd.DataFrame(rows)
+    result["Swing"] = (result["High_Impact"] - result["Low_Impact"]).abs()
+
+    return result.sort_values(
+        ["Metric", "Swing"], ascending=[True, False]
+    ).reset_index(drop=True)
@@ -0,0 +1,311 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from forecasting import annual_paths, forecast_paths, periods_per_year
+
+# =====================================================
+# DEFAULT DRIVER DISTRIBUTIONS
+# =====================================================
+DRIVERS = [
+    "revenue_growth",
+    "variable_cost_ratio",
+    "fixed_cost",
+    "tax_rate",
+    "interest_rate",
+    "debt_change"
+]
+
+DEFAULT_DISTRIBUTIONS = {
+    "revenue_growth": {"dist": "normal", "mean": 0.05, "std": 0.05},
+    "variable_cost_ratio": {"dist": "normal", "mean": 0.30, "std": 0.03,
+                            "low": 0.0, "high": 0.99},
+    "fixed_cost": {"dist": "fixed", "value": 200000},
+    "tax_rate": {"dist": "fixed", "value": 0.25},
+    "interest_rate": {"dist": "uniform", "low": 0.04, "high": 0.08},
+    "debt_change": {"dist": "normal", "mean": 0.0, "std": 0.05}
+}
+
+SIMULATED_METRICS = ["Revenue", "Net_Income", "Equity", "Debt_Ratio"]
+
+PERCENTILES = [5, 50, 95]
+
+CHUNK_SIZE = 10000
+
+# Quantile levels each chunk is reduced to before merging; the
+# simulation keeps SKETCH_POINTS x years values per metric whatever
+# n_paths is
+SKETCH_POINTS = 1001
+SKETCH_LEVELS = np.linspace(0, 1, SKETCH_POINTS)
+
+
+# =====================================================
+# Internal helpers
+# =====================================================
+def _normal_cdf(z):
+    """
+    Standard normal CDF via the Abramowitz-Stegun erf approximation
+    (absolute error < 1.5e-7), so we don't need scipy.
+    """
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (
+        1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _transform(z, spec):
+    """Map standard normal draws to the requested marginal distribution."""
+    dist = spec.get("dist", "normal")
+
+    if dist == "fixed":
+        return np.full_like(z, spec["value"])
+    if dist == "normal":
+        values = spec["mean"] + spec["std"] * z
+    elif dist == "uniform":
+        values = spec["low"] + (spec["high"] - spec["low"]) * _normal_cdf(z)
+    elif dist == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        u = _normal_cdf(z)
+        cut = (mode - low) / (high - low)
+        values = np.where(
+            u < cut,
+            low + np.sqrt(u * (high - low) * (mode - low)),
+            high - np.sqrt((1 - u) * (high - low) * (high - mode))
+        )
+    else:
+        raise ValueError(f"Unknown distribution: {dist}")
+
+    if "low" in spec or "high" in spec:
+        values = np.clip(values, spec.get("low"), spec.get("high"))
+    return values
+
+
+def _correlation_factor(correlation):
+    """
+    Cholesky factor of the driver correlation matrix built from the
+    {(driver_a, driver_b): rho} input, or None without correlation.
+    """
+    if not correlation:
+        return None
+
+    corr = np.eye(len(DRIVERS))
+    for (a, b), rho in correlation.items():
+        unknown = [name for name in (a, b) if name not in DRIVERS]
+        if unknown:
+            raise ValueError(f"Unknown driver(s) in correlation: {unknown}")
+        if a == b or not -1 <= rho <= 1:
+            raise ValueError(
+                f"Invalid correlation {rho} for ({a!r}, {b!r}): pairs need "
+                "two different drivers and a value between -1 and 1"
+            )
+        i, j = DRIVERS.index(a), DRIVERS.index(b)
+        corr[i, j] = corr[j, i] = rho
+
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        raise ValueError(
+            f"correlation {correlation} does not form a positive definite "
+            "matrix; reduce the correlations that contradict each other"
+        ) from None
+
+
+def _draw_drivers(rng, n_paths, distributions, factor):
+    """
+    Draw one value per path for every driver. Correlation (the factor
+    from _correlation_factor) is applied to the underlying standard
+    normals (Gaussian copula), so it also works for non-normal marginals.
+    """
+    z = rng.standard_normal((n_paths, len(DRIVERS)))
+
+    if factor is not None:
+        z = z @ factor.T
+
+    return {
+        name: _transform(z[:, i], distributions[name])
+        for i, name in enumerate(DRIVERS)
+    }
+
+
+def _sketch(values):
+    """
+    Values (paths x years) at SKETCH_LEVELS per year; the same linear
+    interpolation as np.quantile, from one sort.
+    """
+    ordered = np.sort(values, axis=0)
+    position = SKETCH_LEVELS * (len(ordered) - 1)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, len(ordered) - 1)
+    weight = (position - below)[:, None]
+    return ordered[below] * (1 - weight) + ordered[above] * weight
+
+
+def _merge_sketches(a, n_a, b, n_b):
+    """
+    Merge two quantile sketches (SKETCH_LEVELS x years) of n_a and n_b
+    paths: average their piecewise-linear CDFs, weighted by path
+    count, and read the merged CDF back at SKETCH_LEVELS.
+    """
+    merged = np.empty_like(a)
+    for year in range(a.shape[1]):
+        points = np.sort(np.concatenate([a[:, year], b[:, year]]))
+        cdf = (
+            n_a * np.interp(points, a[:, year], SKETCH_LEVELS)
+            + n_b * np.interp(points, b[:, year], SKETCH_LEVELS)
+        ) / (n_a + n_b)
+        merged[:, year] = np.interp(SKETCH_LEVELS, cdf, points)
+    return merged
+
+
+def _simulate_chunk(args):
+    """
+    Simulate one chunk and reduce it to fixed-size summaries: a quantile
+    sketch per metric and per-year counts for the probabilities.
+    """
+    (
+        seed, n_paths, start, years_ahead, periods, seasonality,
+        distributions, factor, debt_ratio_threshold
+    ) = args
+
+    rng = np.random.default_rng(seed)
+    drivers = _draw_drivers(rng, n_paths, distributions, factor)
+
+    paths = annual_paths(forecast_paths(
+        *start, years_ahead=years_ahead, periods=periods,
+        seasonality=seasonality, **drivers
+    ), periods)
+    paths["Debt_Ratio"] = paths["Total_Liabilities"] / paths["Total_Assets"]
+
+    sketches = {
+        metric: _sketch(paths[metric])
+        for metric in SIMULATED_METRICS
+    }
+    loss = (paths["Net_Income"] < 0).sum(axis=0)
+    high_debt = (paths["Debt_Ratio"] > debt_ratio_threshold).sum(axis=0)
+
+    return n_paths, sketches, loss, high_debt
+
+
+# =====================================================
+# Monte Carlo simulation
+# =====================================================
+def simulate_forecasts(
+    historical_df,
+    years_ahead=3,
+    n_paths=10000,
+    distributions=None,
+    correlation=None,
+    seed=None,
+    debt_ratio_threshold=0.6,
+    chunk_size=CHUNK_SIZE,
+    workers=None,
+    frequency="A",
+    seasonality=None
+):
+    """
+    Monte Carlo simulation of the forecast model.
+
+    distributions : per-driver overrides of DEFAULT_DISTRIBUTIONS, e.g.
+                    {"revenue_growth": {"dist": "normal", "mean": 0.08,
+                    "std": 0.04}}. Supported: normal, uniform,
+                    triangular, fixed (optional low/high clipping).
+    correlation   : {("revenue_growth", "variable_cost_ratio"): -0.3}
+    workers       : split chunks across a process pool of this size.
+    frequency     : "A", "Q" or "M"; with seasonality, runs the model
+                    per period as forecast_periods does. Results are
+                    per year either way.
+
+    Paths are generated in chunks with independent child seeds, so the
+    result for a given seed is the same with or without a pool. Each
+    chunk is reduced to a quantile sketch (SKETCH_POINTS levels per
+    year) that is merged into a running one, so memory is bounded by
+    chunk_size, not n_paths. Percentiles are exact for one chunk and
+    otherwise within a fraction of a percent of the P5-P95 spread.
+    A correlation that is not a valid correlation matrix raises
+    ValueError.
+
+    Returns a dict with:
+    - "percentiles"   : Year, Metric, P5, P50, P95
+    - "probabilities" : Year, P_Net_Loss, P_Debt_Ratio_Above
+    """
+    specs = dict(DEFAULT_DISTRIBUTIONS)
+    specs.update(distributions or {})
+
+    last = historical_df.iloc[-1]
+    start = (
+        float(last["Revenue"]),
+        float(last["Total_Assets"]),
+        float(last["Total_Liabilities"])
+    )
+
+    factor = _correlation_factor(correlation)
+    periods = periods_per_year(frequency)
+
+    n_chunks = max(1, -(-n_paths // chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = (
+        (
+            seeds[i],
+            min(chunk_size, n_paths - i * chunk_size),
+            start, years_ahead, periods, seasonality,
+            specs, factor, debt_ratio_threshold
+        )
+        for i in range(n_chunks)
+    )
+
+    pool = None
+    if workers and workers > 1 and n_chunks > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_simulate_chunk, tasks)
+    else:
+        results = map(_simulate_chunk, tasks)
+
+    # Fold chunks into running summaries as they arrive (in chunk order)
+    seen, sketches = 0, None
+    loss = high_debt = 0
+    try:
+        for n, chunk_sketches, chunk_loss, chunk_high_debt in results:
+            if sketches is None:
+                sketches = chunk_sketches
+            else:
+                sketches = {
+                    metric: _merge_sketches(
+                        sketches[metric], seen, chunk_sketches[metric], n
+                    )
+                    for metric in SIMULATED_METRICS
+                }
+            seen += n
+            loss = loss + chunk_loss
+            high_debt = high_debt + chunk_high_debt
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    years = int(last["Year"]) + np.arange(1, years_ahead + 1)
+    levels = np.asarray(PERCENTILES) / 100
+
+    rows = []
+    for metric in SIMULATED_METRICS:
+        sketch = sketches[metric]
+        pct = np.array([
+            np.interp(levels, SKETCH_LEVELS, sketch[:, year])
+            for year in range(years_ahead)
+        ]).T
+        rows.append(pd.DataFrame({
+            "Year": years,
+            "Metric": metric,
+            **{f"P{p}": pct[k] for k, p in enumerate(PERCENTILES)}
+        }))
+
+    probabilities = pd.DataFrame({
+        "Year": years,
+        "P_Net_Loss": loss / n_paths,
+        "P_Debt_Ratio_Above": high_debt / n_paths
+    })
+
+    return {
+        "percentiles": pd.concat(rows, ignore_index=True),
+        "probabilities": probabilities
+    }
@@ -1,20 +1,236 @@
 import sqlite3
+import hashlib
 import json
+import random
+import threading
+import time
+import zlib
 from datetime import datetime
+from functools import wraps
+import numpy as np
 import pandas as pd
 
+from profiler import profiled
+
 import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_NAME = os.path.join(BASE_DIR, "scenarios.db")
 
+# PRAGMA user_version of the current schema
+# 0: forecast_json TEXT blob per scenario
+# 1: columnar forecast storage (scenario_columns)
+# 2: materialized KPIs (scenario_kpis)
+# 3: content-addressed forecasts (forecast_columns, scenarios.forecast_key)
+SCHEMA_VERSION = 3
+
+KPI_COLUMNS = [
+    "final_year",
+    "final_revenue",
+    "final_net_income",
+    "final_equity",
+    "final_debt_ratio",
+    "cumulative_net_income",
+    "min_equity"
+]
+
+RANK_OPERATORS = ["<", "<=", ">", ">=", "="]
+
+# Lock handling: SQLite waits BUSY_TIMEOUT seconds itself, then we
+# retry the whole transaction with exponential backoff
+BUSY_TIMEOUT = 5.0
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.05
+
+SCENARIO_META_COLUMNS = [
+    "scenario_id",
+    "scenario_name",
+    "created_at",
+    "revenue_growth",
+    "opex_ratio",
+    "debt_change"
+]
+
+
 # -----------------------------
-# Database initialization
+# Connections
 # -----------------------------
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+_local = threading.local()
+_initialized = set()
+
+
+def get_connection(path=None):
+    """
+    Per-thread connection to DB_NAME (or path), opened once and reused.
+    WAL lets readers run while a writer commits.
+    """
+    path = path or DB_NAME
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -16000")
+        connections[path] = conn
+
+    return conn
+
+
+def close_connections():
+    """Close this thread's connections (e.g. at shutdown or in tests)."""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+
+def _is_lock_error(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def with_retry(func):
+    """
+    Retry a storage call when the database is locked, backing off
+    exponentially (with jitter) between attempts.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_lock_error(e) or attempt == MAX_RETRIES:
+                    raise
+                delay = RETRY_BASE_DELAY * (2 ** attempt)
+                time.sleep(delay * (1 + random.random()))
+    return wrapper
+
+
+# -----------------------------
+# Column encoding
+# -----------------------------
+def _encode_column(values: np.ndarray, dtype):
+    """
+    Encode one column as (dtype, compressed bytes).
+    Numeric, bool and datetime columns are stored as raw NumPy
+    buffers, categoricals as int32 codes with their categories in the
+    dtype field, and anything else as a JSON list tagged with its
+    pandas dtype ("json:<dtype>") so decoding restores it.
+    """
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        values = np.ascontiguousarray(values, dtype=dtype)
+        return dtype.str, zlib.compress(values.tobytes())
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = pd.Categorical(values, dtype=dtype).codes.astype(np.int32)
+        spec = json.dumps({
+            "categories": dtype.categories.tolist(),
+            "ordered": bool(dtype.ordered)
+        })
+        return "category:" + spec, zlib.compress(codes.tobytes())
+
+    items = np.where(pd.isna(values), None, values).tolist()
+    return (
+        f"json:{dtype}",
+        zlib.compress(json.dumps(items).encode("utf-8"))
+    )
+
+
+def _decode_column(dtype: str, data: bytes):
+    raw = zlib.decompress(data)
+    if dtype.startswith("category:"):
+        spec = json.loads(dtype[len("category:"):])
+        return pd.Categorical.from_codes(
+            np.frombuffer(raw, dtype=np.int32),
+            categories=spec["categories"],
+            ordered=spec["ordered"]
+        )
+    if dtype == "json":
+        # Written before dtypes were recorded
+        return json.loads(raw.decode("utf-8"))
+    if dtype.startswith("json:"):
+        return pd.Series(
+            json.loads(raw.decode("utf-8")), dtype=dtype[len("json:"):]
+        )
+    return np.frombuffer(raw, dtype=np.dtype(dtype)).copy()
+
+
+def _frame_columns(df: pd.DataFrame):
+    """
+    (column, dtype, values) per column, numeric values as typed arrays.
+    One object-array conversion is much cheaper than building a Series
+    per column when saving thousands of small forecasts.
+    """
+    values = df.to_numpy(dtype=object)
+    columns = []
+    names, dtypes = df.columns.tolist(), df.dtypes.tolist()
+    for i, (col, dtype) in enumerate(zip(names, dtypes)):
+        if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+            column = values[:, i].astype(dtype)
+        elif dtype.kind in "mM":
+            column = df.iloc[:, i].to_numpy()
+        else:
+            column = values[:, i]
+        columns.append((str(col), dtype, column))
+    return columns
+
+
+def _encode_columns(columns):
+    """(column, dtype, blob) rows from _frame_columns."""
+    return [
+        (name, *_encode_column(values, dtype))
+        for name, dtype, values in columns
+    ]
+
+
+@profiled
+def encode_frame(key, df: pd.DataFrame):
+    """
+    Encode a frame as rows of (key, position, column, dtype, blob)
+    for the forecast_columns table.
+    """
+    columns = _encode_columns(_frame_columns(df))
+    return [(key, i, *column) for i, column in enumerate(columns)]
+
+
+@profiled
+def decode_frame(rows) -> pd.DataFrame:
+    """Rebuild a frame from (column, dtype, blob) rows."""
+    return pd.DataFrame({
+        name: _decode_column(dtype, data) for name, dtype, data in rows
+    })
+
+
+@profiled
+def hash_frame(df: pd.DataFrame) -> str:
+    """Content hash of a frame's column names, dtypes and values."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(json.dumps([str(d) for d in df.dtypes]).encode())
+    digest.update(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+    )
+    return digest.hexdigest()
 
+
+def _hash_blobs(rows) -> str:
+    digest = hashlib.sha256()
+    for name, dtype, data in rows:
+        digest.update(f"{name}\0{dtype}\0".encode())
+        digest.update(data)
+    return "blob:" + digest.hexdigest()
+
+
+# -----------------------------
+# Database initialization
+# -----------------------------
+def _create_tables(cursor):
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS scenarios (
             scenario_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -23,28 +239,270 @@ def init_db():
             revenue_growth REAL,
             opex_ratio REAL,
             debt_change REAL,
-            forecast_json TEXT
+            forecast_key TEXT
         )
     """)
 
-    conn.commit()
-    conn.close()
+    # Forecasts are content-addressed: identical forecasts saved under
+    # several scenarios are stored once
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS forecast_columns (
+            forecast_key TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            dtype TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (forecast_key, position)
+        )
+    """)
+
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS scenario_kpis (
+            scenario_id INTEGER PRIMARY KEY,
+            {", ".join(f"{col} REAL" for col in KPI_COLUMNS)}
+        )
+    """)
+
+    for col in KPI_COLUMNS[1:]:
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_scenario_kpis_{col}
+            ON scenario_kpis ({col})
+        """)
+
+
+def _create_indexes(cursor):
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_scenarios_forecast_key
+        ON scenarios (forecast_key)
+    """)
+
+
+def _forecast_stored(cursor, key) -> bool:
+    return cursor.execute(
+        "SELECT 1 FROM forecast_columns WHERE forecast_key = ? LIMIT 1",
+        (key,)
+    ).fetchone() is not None
+
+
+def _store_forecast(cursor, key, rows):
+    """Insert encoded forecast rows unless the key is already stored."""
+    if not _forecast_stored(cursor, key):
+        cursor.executemany(
+            "INSERT INTO forecast_columns VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+
+def _migrate_forecast_json(conn):
+    """
+    Schema 0 -> 3: move forecast_json blobs into forecast_columns and
+    rebuild the scenarios table with metadata columns only.
+    """
+    cursor = conn.cursor()
+    cursor.execute("ALTER TABLE scenarios RENAME TO scenarios_v0")
+    _create_tables(cursor)
+
+    cursor.execute(f"""
+        INSERT INTO scenarios ({", ".join(SCENARIO_META_COLUMNS)})
+        SELECT {", ".join(SCENARIO_META_COLUMNS)} FROM scenarios_v0
+    """)
+
+    rows = cursor.execute(
+        "SELECT scenario_id, forecast_json FROM scenarios_v0"
+    ).fetchall()
+    for scenario_id, forecast_json in rows:
+        forecast_df = pd.DataFrame(json.loads(forecast_json or "[]"))
+        key = hash_frame(forecast_df)
+        _store_forecast(cursor, key, encode_frame(key, forecast_df))
+        cursor.execute(
+            "UPDATE scenarios SET forecast_key = ? WHERE scenario_id = ?",
+            (key, scenario_id)
+        )
+
+    cursor.execute("DROP TABLE scenarios_v0")
+
+
+def _migrate_scenario_columns(cursor):
+    """
+    Schema 1/2 -> 3: move per-scenario column blobs into the
+    content-addressed forecast_columns table.
+    """
+    columns = [
+        row[1] for row in cursor.execute("PRAGMA table_info(scenarios)")
+    ]
+    if "forecast_key" not in columns:
+        cursor.execute("ALTER TABLE scenarios ADD COLUMN forecast_key TEXT")
+
+    stored = {}
+    for scenario_id, name, dtype, data in cursor.execute("""
+        SELECT scenario_id, column_name, dtype, data FROM scenario_columns
+        ORDER BY scenario_id, position
+    """).fetchall():
+        stored.setdefault(scenario_id, []).append((name, dtype, data))
+
+    for scenario_id, rows in stored.items():
+        key = _hash_blobs(rows)
+        _store_forecast(cursor, key, [
+            (key, i, *row) for i, row in enumerate(rows)
+        ])
+        cursor.execute(
+            "UPDATE scenarios SET forecast_key = ? WHERE scenario_id = ?",
+            (key, scenario_id)
+        )
+
+    cursor.execute("DROP TABLE scenario_columns")
+
+
+def _backfill_kpis(cursor):
+    """Schema 1 -> 2: compute KPIs for scenarios saved before the table existed."""
+    ids = [row[0] for row in cursor.execute("""
+        SELECT scenario_id FROM scenarios
+        WHERE scenario_id NOT IN (SELECT scenario_id FROM scenario_kpis)
+    """)]
+
+    for scenario_id in ids:
+        rows = cursor.execute(_FORECAST_QUERY, (scenario_id,)).fetchall()
+        _insert_kpis(cursor, scenario_id, compute_kpis(decode_frame(rows)))
+
+
+@profiled
+def init_db(force=False, path=None):
+    """
+    Create or migrate the schema of path (default DB_NAME). Runs once
+    per process and database path; later calls return immediately
+    unless force=True.
+    """
+    path = path or DB_NAME
+    if path in _initialized and not force:
+        return
+
+    conn = get_connection(path)
+    _init_schema(conn)
+    _initialized.add(path)
+
+
+@with_retry
+def _init_schema(conn):
+    cursor = conn.cursor()
+
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    columns = [
+        row[1] for row in cursor.execute("PRAGMA table_info(scenarios)")
+    ]
+    tables = [
+        row[0] for row in
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    ]
+
+    migrated = False
+    with conn:
+        cursor.execute("BEGIN IMMEDIATE")
+        if "forecast_json" in columns:
+            _migrate_forecast_json(conn)
+            migrated = True
+        else:
+            _create_tables(cursor)
+
+        if "scenario_columns" in tables:
+            _migrate_scenario_columns(cursor)
+            migrated = True
+
+        _create_indexes(cursor)
+
+        if version < 2:
+            _backfill_kpis(cursor)
+
+        if version != SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # Reclaim the space of the old blobs
+    if migrated:
+        conn.execute("VACUUM")
+
+
+# -----------------------------
+# Scenario KPIs
+# -----------------------------
+@profiled
+def compute_kpis(forecast_df: pd.DataFrame) -> dict:
+    """
+    Summary KPIs of the forecast rows (Type == "Forecast"; all rows
+    when there is no Type column). Missing inputs give None.
+    """
+    return _kpis(_frame_columns(forecast_df))
+
+
+def _kpis(columns) -> dict:
+    """compute_kpis on the arrays from _frame_columns."""
+    arrays = {name: values for name, _, values in columns}
+    rows = slice(None)
+    n_rows = len(columns[0][2]) if columns else 0
+    if "Type" in arrays:
+        rows = arrays["Type"] == "Forecast"
+        n_rows = int(rows.sum())
+
+    if not n_rows:
+        return {col: None for col in KPI_COLUMNS}
+
+    def column(name):
+        if name in arrays:
+            return np.asarray(arrays[name][rows], dtype=float)
+        return np.full(n_rows, np.nan)
+
+    net_income = column("Net_Income")
+    equity = column("Equity")
+    assets = column("Total_Assets")
+    liabilities = column("Total_Liabilities")
+
+    kpis = {
+        "final_year": column("Year")[-1],
+        "final_revenue": column("Revenue")[-1],
+        "final_net_income": net_income[-1],
+        "final_equity": equity[-1],
+        "final_debt_ratio": (
+            liabilities[-1] / assets[-1] if assets[-1] else np.nan
+        ),
+        "cumulative_net_income": net_income.sum(),
+        "min_equity": equity.min()
+    }
+
+    return {
+        col: None if np.isnan(value) else float(value)
+        for col, value in kpis.items()
+    }
+
+
+def _insert_kpis(cursor, scenario_id, kpis):
+    cursor.execute(
+        f"""
+        INSERT OR REPLACE INTO scenario_kpis (scenario_id, {", ".join(KPI_COLUMNS)})
+        VALUES ({", ".join("?" * (len(KPI_COLUMNS) + 1))})
+        """,
+        (scenario_id, *(kpis[col] for col in KPI_COLUMNS))
+    )
 
 
 # -----------------------------
 # Save scenario
 # -----------------------------
-def save_scenario(
-    scenario_name: str,
-    revenue_growth: float,
-    opex_ratio: float,
-    debt_change: float,
-    forecast_df: pd.DataFrame
-):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+def _insert_scenario(cursor, scenario):
+    # The same arrays feed the encoding, the content key and the KPIs,
+    # instead of a pandas pass for each
+    columns = _frame_columns(scenario["forecast_df"])
 
-    forecast_json = forecast_df.to_json(orient="records")
+    encoded = None
+    key = scenario.get("forecast_key")
+    if not key:
+        encoded = _encode_columns(columns)
+        key = _hash_blobs(encoded)
+
+    # Duplicate saves reference the stored forecast instead of copying it
+    if not _forecast_stored(cursor, key):
+        if encoded is None:
+            encoded = _encode_columns(columns)
+        cursor.executemany(
+            "INSERT INTO forecast_columns VALUES (?, ?, ?, ?, ?)",
+            [(key, i, *row) for i, row in enumerate(encoded)]
+        )
 
     cursor.execute("""
         INSERT INTO scenarios (
@@ -53,59 +511,239 @@ def save_scenario(
             revenue_growth,
             opex_ratio,
             debt_change,
-            forecast_json
+            forecast_key
         )
         VALUES (?, ?, ?, ?, ?, ?)
     """, (
-        scenario_name,
+        scenario["scenario_name"],
         datetime.now().isoformat(),
-        revenue_growth,
-        opex_ratio,
-        debt_change,
-        forecast_json
+        scenario["revenue_growth"],
+        scenario["opex_ratio"],
+        scenario["debt_change"],
+        key
     ))
 
-    conn.commit()
-    conn.close()
+    scenario_id = cursor.lastrowid
+    _insert_kpis(cursor, scenario_id, _kpis(columns))
+    return scenario_id
+
+
+@profiled
+@with_retry
+def save_scenarios(scenarios, path=None) -> list:
+    """
+    Save many scenarios in a single transaction.
+
+    scenarios: iterable of dicts with scenario_name, revenue_growth,
+    opex_ratio, debt_change, forecast_df and optionally forecast_key
+    (defaults to a content hash of forecast_df). Returns the new ids.
+    """
+    conn = get_connection(path)
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        return [_insert_scenario(cursor, s) for s in scenarios]
+
+
+@profiled
+def save_scenario(
+    scenario_name: str,
+    revenue_growth: float,
+    opex_ratio: float,
+    debt_change: float,
+    forecast_df: pd.DataFrame,
+    forecast_key: str = None,
+    path=None
+):
+    return save_scenarios([{
+        "scenario_name": scenario_name,
+        "revenue_growth": revenue_growth,
+        "opex_ratio": opex_ratio,
+        "debt_change": debt_change,
+        "forecast_df": forecast_df,
+        "forecast_key": forecast_key
+    }], path=path)[0]
 
 
 # -----------------------------
 # Load scenarios
 # -----------------------------
-def load_scenarios():
-    conn = sqlite3.connect(DB_NAME)
-    df = pd.read_sql("SELECT * FROM scenarios", conn)
-    conn.close()
-    return df
+@profiled
+@with_retry
+def load_scenarios(path=None):
+    return pd.read_sql(
+        f"SELECT {', '.join(SCENARIO_META_COLUMNS)} FROM scenarios",
+        get_connection(path)
+    )
 
 
 # -----------------------------
 # Load single scenario forecast
 # -----------------------------
-def load_scenario_forecast(scenario_id: int) -> pd.DataFrame:
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+_FORECAST_QUERY = """
+    SELECT f.column_name, f.dtype, f.data
+    FROM scenarios s
+    JOIN forecast_columns f ON f.forecast_key = s.forecast_key
+    WHERE s.scenario_id = ?
+    ORDER BY f.position
+"""
 
-    cursor.execute("""
-        SELECT forecast_json FROM scenarios
-        WHERE scenario_id = ?
-    """, (scenario_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+@profiled
+@with_retry
+def load_scenario_forecast(scenario_id: int, path=None) -> pd.DataFrame:
+    rows = get_connection(path).execute(
+        _FORECAST_QUERY, (int(scenario_id),)
+    ).fetchall()
 
-    if row is None:
+    if not rows:
         return pd.DataFrame()
 
-    return pd.DataFrame(json.loads(row[0]))
-def delete_scenario(scenario_id: int):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    return decode_frame(rows)
 
-    cursor.execute(
-        "DELETE FROM scenarios WHERE scenario_id = ?",
+
+# -----------------------------
+# Load many scenario forecasts
+# -----------------------------
+@profiled
+@with_retry
+def load_scenario_forecasts(scenario_ids, path=None) -> pd.DataFrame:
+    """
+    Fetch several forecasts in one query. Returns a long frame with a
+    leading scenario_id column, in the order the ids were given.
+    """
+    ids = [int(sid) for sid in scenario_ids]
+    if not ids:
+        return pd.DataFrame()
+
+    rows = get_connection(path).execute(f"""
+        SELECT s.scenario_id, f.column_name, f.dtype, f.data
+        FROM scenarios s
+        JOIN forecast_columns f ON f.forecast_key = s.forecast_key
+        WHERE s.scenario_id IN ({", ".join("?" * len(ids))})
+        ORDER BY s.scenario_id, f.position
+    """, ids).fetchall()
+
+    columns = {}
+    for sid, name, dtype, data in rows:
+        columns.setdefault(sid, []).append((name, dtype, data))
+
+    frames = []
+    for sid in ids:
+        if sid in columns:
+            frame = decode_frame(columns[sid])
+            frame.insert(0, "scenario_id", sid)
+            frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# -----------------------------
+# Rank scenarios by KPI
+# -----------------------------
+@profiled
+@with_retry
+def rank_scenarios(
+    order_by: str = "final_equity",
+    ascending: bool = False,
+    limit: int = 20,
+    filters=None,
+    path=None
+) -> pd.DataFrame:
+    """
+    Rank scenarios in SQL using the materialized KPIs, e.g. the top 20
+    by final equity with debt ratio below 0.6:
+
+        rank_scenarios("final_equity", filters={"final_debt_ratio": ("<", 0.6)})
+
+    filters: {kpi column: (operator, value)}, operators in RANK_OPERATORS.
+    """
+    if order_by not in KPI_COLUMNS:
+        raise ValueError(f"Unknown KPI: {order_by}")
+
+    where, params = [], []
+    for col, (op, value) in (filters or {}).items():
+        if col not in KPI_COLUMNS or op not in RANK_OPERATORS:
+            raise ValueError(f"Invalid filter: {col} {op}")
+        where.append(f"k.{col} {op} ?")
+        params.append(value)
+
+    query = f"""
+        SELECT
+            {", ".join(f"s.{col}" for col in SCENARIO_META_COLUMNS)},
+            {", ".join(f"k.{col}" for col in KPI_COLUMNS)}
+        FROM scenario_kpis k
+        JOIN scenarios s ON s.scenario_id = k.scenario_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY k.{order_by} {"ASC" if ascending else "DESC"}
+        LIMIT ?
+    """
+    params.append(int(limit))
+
+    return pd.read_sql(query, get_connection(path), params=params)
+
+
+def _delete_scenario(cursor, scenario_id):
+    scenario_id = int(scenario_id)
+    row = cursor.execute(
+        "SELECT forecast_key FROM scenarios WHERE scenario_id = ?",
         (scenario_id,)
+    ).fetchone()
+    cursor.execute(
+        "DELETE FROM scenario_kpis WHERE scenario_id = ?", (scenario_id,)
+    )
+    cursor.execute(
+        "DELETE FROM scenarios WHERE scenario_id = ?", (scenario_id,)
     )
 
-    conn.commit()
-    conn.close()
+    # Drop the stored forecast once no scenario references it
+    if row is not None:
+        cursor.execute("""
+            DELETE FROM forecast_columns
+            WHERE forecast_key = ?
+            AND NOT EXISTS (
+                SELECT 1 FROM scenarios WHERE forecast_key = ?
+            )
+        """, (row[0], row[0]))
+    return scenario_id
+
+
+@profiled
+@with_retry
+def delete_scenario(scenario_id: int, path=None):
+    conn = get_connection(path)
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        _delete_scenario(cursor, scenario_id)
+
+
+# -----------------------------
+# Batched writes
+# -----------------------------
+WRITE_OPERATIONS = {
+    "save": _insert_scenario,
+    "delete": _delete_scenario
+}
+
+
+@profiled
+@with_retry
+def apply_writes(operations, path=None) -> list:
+    """
+    Apply ("save", scenario dict) and ("delete", scenario_id) operations
+    in order, in a single transaction on path (default DB_NAME).
+    Scenario dicts are as for save_scenarios. Returns the scenario id of
+    each operation; any failure rolls back the whole batch.
+    """
+    for kind, _ in operations:
+        if kind not in WRITE_OPERATIONS:
+            raise ValueError(f"Unknown write operation: {kind}")
+
+    conn = get_connection(path)
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        return [
+            WRITE_OPERATIONS[kind](cursor, arg) for kind, arg in operations
+        ]
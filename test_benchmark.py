@@ -0,0 +1,47 @@
+import storage
+from benchmark import make_statements, compare, run_case, bulk_save_case
+
+
+def test_generators_are_seeded():
+    a, _ = make_statements(100, 4, seed=1)
+    b, _ = make_statements(100, 4, seed=1)
+    assert a.equals(b)
+    assert a["Entity"].nunique() == 4
+
+
+def test_run_case_covers_pipeline(tmp_path):
+    default_db = storage.DB_NAME
+    results = run_case(10, 1, repeat=1, workdir=str(tmp_path))
+    assert storage.DB_NAME == default_db
+    stages = {r["stage"] for r in results}
+    assert {"load_income_statement", "forecast_financials",
+            "compute_cash_flow", "storage.load_scenarios"} <= stages
+    assert all(r["seconds"] >= 0 for r in results)
+
+
+def test_bulk_save_case_saves_every_scenario(tmp_path):
+    [result] = bulk_save_case(50, repeat=2, workdir=str(tmp_path))
+    assert result["stage"] == "storage.save_scenarios (bulk)"
+    assert result["rows"] == 50
+    for run in range(2):
+        path = str(tmp_path / f"bulk_50_{run}.db")
+        assert len(storage.load_scenarios(path=path)) == 50
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"results": [
+        {"stage": "a", "rows": 10, "entities": 1, "seconds": 0.010},
+        {"stage": "b", "rows": 10, "entities": 1, "seconds": 0.010},
+    ]}
+    results = [
+        {"stage": "a", "rows": 10, "entities": 1, "seconds": 0.020},
+        {"stage": "b", "rows": 10, "entities": 1, "seconds": 0.011},
+    ]
+    regressions = compare(results, baseline, tolerance=0.25)
+    assert [r["stage"] for r in regressions] == ["a"]
+
+
+if __name__ == "__main__":
+    test_generators_are_seeded()
+    test_compare_flags_regressions_beyond_tolerance()
+    print("benchmark tests passed")
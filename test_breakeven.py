@@ -0,0 +1,49 @@
+import numpy as np
+
+from breakeven import (
+    break_even_revenue,
+    break_even_surface,
+    margin_of_safety,
+    operating_leverage
+)
+from forecasting import calculate_break_even_revenue
+
+
+def test_matches_scalar_and_masks_invalid_ratios():
+    result = break_even_revenue([200000, 200000, 200000], [0.3, 1.0, 1.2])
+    assert result[0] == calculate_break_even_revenue(200000, 0.3)
+    assert np.isnan(result[1:]).all()
+
+
+def test_margin_of_safety_and_operating_leverage():
+    be = break_even_revenue(200000, 0.5)
+    assert margin_of_safety(800000, be) == 0.5
+    # contribution 400k, operating income 200k
+    assert operating_leverage(800000, 200000, 0.5) == 2.0
+    assert np.isnan(operating_leverage(400000, 200000, 0.5))
+
+
+def test_surface_shapes():
+    fixed = np.linspace(0, 1e6, 1000)
+    ratios = np.linspace(0, 1.2, 1000)
+    revenues = [0.0, 1e6, 2e6]
+
+    surface = break_even_surface(fixed, ratios)
+    assert surface["Break_Even_Revenue"].shape == (1000, 1000)
+
+    surface = break_even_surface(fixed, ratios, revenues)
+    assert surface["Margin_Of_Safety"].shape == (3, 1000, 1000)
+    assert np.isnan(surface["Margin_Of_Safety"][0]).all()
+    assert np.isnan(surface["Operating_Leverage"][:, :, ratios >= 1]).all()
+
+    expected = margin_of_safety(
+        1e6, break_even_revenue(fixed[:, None], ratios[None, :])
+    )
+    np.testing.assert_array_equal(surface["Margin_Of_Safety"][1], expected)
+
+
+if __name__ == "__main__":
+    test_matches_scalar_and_masks_invalid_ratios()
+    test_margin_of_safety_and_operating_leverage()
+    test_surface_shapes()
+    print("break-even tests passed")
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from cashflow import compute_cash_flow, CASH_FLOW_COLUMNS
+from forecasting import forecast_financials
+from test_forecasting import _sample_history
+
+
+def _panel():
+    history = _sample_history()
+    other = history.assign(
+        Total_Assets=history["Total_Assets"] * 10,
+        Total_Liabilities=history["Total_Liabilities"] * 10
+    )
+    return pd.concat(
+        [history.assign(Entity="A"), other.assign(Entity="B")],
+        ignore_index=True
+    )
+
+
+def test_single_company_matches_simple_model():
+    forecast = forecast_financials(_sample_history())
+    result = compute_cash_flow(forecast)
+
+    assert list(result.columns[-len(CASH_FLOW_COLUMNS):]) == CASH_FLOW_COLUMNS
+    assert result["CFO"].equals(forecast["Net_Income"].astype(float))
+    expected_cfi = -forecast["Total_Assets"].diff().fillna(0)
+    np.testing.assert_array_equal(result["CFI"], expected_cfi)
+    np.testing.assert_array_equal(result["FCF"], result["CFO"] + result["CFI"])
+
+
+def test_panel_does_not_diff_across_entities():
+    result = compute_cash_flow(_panel(), entity_col="Entity")
+    first_b = result[result["Entity"] == "B"].iloc[0]
+    assert first_b["CFI"] == 0 and first_b["CFF"] == 0
+
+
+def test_row_order_does_not_matter():
+    panel = _panel()
+    shuffled = panel.sample(frac=1, random_state=1)
+
+    expected = compute_cash_flow(panel, entity_col="Entity", columns_only=True)
+    result = compute_cash_flow(shuffled, entity_col="Entity", columns_only=True)
+
+    assert list(result.columns) == CASH_FLOW_COLUMNS
+    pd.testing.assert_frame_equal(result.sort_index(), expected)
+
+
+def test_working_capital_reduces_cfo():
+    history = _sample_history().assign(
+        Current_Assets=[300000, 350000, 420000],
+        Current_Liabilities=[100000, 100000, 100000]
+    )
+    result = compute_cash_flow(history)
+    assert list(result["Change_In_Working_Capital"]) == [0, 50000, 70000]
+    assert list(result["CFO"]) == list(
+        history["Net_Income"] - result["Change_In_Working_Capital"]
+    )
+
+
+if __name__ == "__main__":
+    test_single_company_matches_simple_model()
+    test_panel_does_not_diff_across_entities()
+    test_row_order_does_not_matter()
+    test_working_capital_reduces_cfo()
+    print("cash flow tests passed")
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import cli
+import storage
+
+BASE_DIR = os.path.dirname(__file__)
+
+
+def _data_dir(tmp_path, bad=False):
+    data = tmp_path / "data"
+    data.mkdir()
+    for entity in ["ACME", "BETA"]:
+        shutil.copy(
+            os.path.join(BASE_DIR, "sample_income_statement.csv"),
+            data / f"{entity}_income.csv"
+        )
+        shutil.copy(
+            os.path.join(BASE_DIR, "sample_balance_sheet.csv"),
+            data / f"{entity}_balance.csv"
+        )
+    if bad:
+        (data / "BAD_income.csv").write_text("Year,Foo\n2020,1\n")
+        (data / "BAD_balance.csv").write_text("Year,Bar\n2020,1\n")
+    return str(data)
+
+
+def _assumptions(tmp_path):
+    path = tmp_path / "assumptions.json"
+    path.write_text(json.dumps({
+        "years_ahead": 2,
+        "scenarios": [
+            {"name": "Base"},
+            {"name": "Downside", "revenue_growth": -0.05}
+        ]
+    }))
+    return str(path)
+
+
+def test_columnar_output(tmp_path):
+    out = tmp_path / "out"
+    code = cli.main([
+        _data_dir(tmp_path), "--assumptions", _assumptions(tmp_path),
+        "--output-dir", str(out), "--format", "csv", "--workers", "1"
+    ])
+    assert code == 0
+
+    forecasts = pd.read_csv(out / "forecasts.csv")
+    assert set(forecasts["Entity"]) == {"ACME", "BETA"}
+    assert set(forecasts["Scenario"]) == {"Base", "Downside"}
+    assert {"CFO", "CFI", "CFF"} <= set(forecasts.columns)
+    assert (out / "ratios.csv").exists() and (out / "insights.csv").exists()
+
+
+def test_sqlite_output_and_error_exit(tmp_path, capsys):
+    default_db = storage.DB_NAME
+    db = tmp_path / "results.db"
+
+    code = cli.main([
+        _data_dir(tmp_path, bad=True), "--assumptions",
+        _assumptions(tmp_path), "--db", str(db), "--workers", "1"
+    ])
+    storage.close_connections()
+
+    assert code == 1
+    assert "BAD" in capsys.readouterr().err
+    assert storage.DB_NAME == default_db
+
+    conn = sqlite3.connect(db)
+    names = [r[0] for r in conn.execute("SELECT scenario_name FROM scenarios")]
+    runs = pd.read_sql("SELECT * FROM pipeline_runs", conn)
+    conn.close()
+
+    assert sorted(names) == [
+        "ACME / Base", "ACME / Downside", "BETA / Base", "BETA / Downside"
+    ]
+    assert runs.set_index("Entity").loc["BAD", "status"] == "error"
+
+
+def test_unknown_assumption_rejected(tmp_path):
+    path = tmp_path / "a.json"
+    path.write_text(json.dumps({"scenarios": [{"growth": 0.1}]}))
+    with pytest.raises(ValueError, match="growth"):
+        cli.load_assumptions(str(path))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
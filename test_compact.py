@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from compact import MONEY_DTYPE, compact_frame, is_compact
+from data_loader import load_income_statement, load_balance_sheet
+from validator import validate_income_statement, validate_balance_sheet
+from financial_metrics import merge_financials, compute_financial_ratios
+from forecasting import forecast_financials
+from cashflow import compute_cash_flow
+
+INCOME_CSV = """Year,Revenue,Operating_Expense,Net_Income
+2020,1000000,600000,250000
+2021,1100000,650000,280000
+2022,1250000,700000,330000
+"""
+
+BALANCE_CSV = """Year,Total_Assets,Total_Liabilities,Equity
+2020,5000000,3000000,2000000
+2021,5400000,3100000,2300000
+2022,5900000,3250000,2650000
+"""
+
+
+def _pipeline(compact):
+    income = validate_income_statement(
+        load_income_statement(io.StringIO(INCOME_CSV), compact=compact)
+    )
+    balance = validate_balance_sheet(
+        load_balance_sheet(io.StringIO(BALANCE_CSV), compact=compact)
+    )
+    merged = merge_financials(income, balance)
+    forecast = forecast_financials(merged, years_ahead=2)
+    return {
+        "merged": merged,
+        "ratios": compute_financial_ratios(merged),
+        "cash_flow": compute_cash_flow(forecast)
+    }
+
+
+def test_compact_dtypes_survive_the_pipeline():
+    result = _pipeline(compact=True)
+
+    for df in result.values():
+        assert is_compact(df)
+        assert df["Year"].dtype.itemsize <= 2
+
+    cash_flow = result["cash_flow"]
+    assert cash_flow["Type"].dtype == "category"
+    assert cash_flow["CFO"].dtype == MONEY_DTYPE
+    assert result["ratios"]["ROE"].dtype == MONEY_DTYPE
+
+
+def test_compact_results_match_float64():
+    compact, default = _pipeline(compact=True), _pipeline(compact=False)
+
+    for name in ("ratios", "cash_flow"):
+        numeric = default[name].select_dtypes("number").columns
+        np.testing.assert_allclose(
+            compact[name][numeric].to_numpy(dtype=float),
+            default[name][numeric].to_numpy(dtype=float),
+            rtol=1e-6, atol=1.0  # FCF nets two ~1e6 lines to ~0
+        )
+
+
+def test_non_numeric_values_are_still_reported():
+    csv = INCOME_CSV.replace("280000", "abc")
+    income = validate_income_statement(
+        load_income_statement(io.StringIO(csv), compact=True)
+    )
+    assert len(income) == 2
+    assert is_compact(income)
+    codes = [a["code"] for a in income.attrs["anomalies"]]
+    assert "NON_NUMERIC" in codes
+
+
+def test_text_columns_load_as_categories():
+    csv = "Entity,Year,Revenue,Operating_Expense,Net_Income,Employees\n" + "".join(
+        f"E{i % 2},{2020 + i // 2},1000,600,300,{10 + i}\n" for i in range(6)
+    )
+    income = load_income_statement(io.StringIO(csv), compact=True)
+    assert isinstance(income["Entity"].dtype, pd.CategoricalDtype)
+    assert income["Year"].dtype == np.int16
+    assert pd.api.types.is_integer_dtype(income["Employees"])
+
+
+def test_compact_frame_shares_untouched_columns():
+    df = pd.DataFrame({"Revenue": [1.0, 2.0], "Note": ["a", "b"]})
+    compact = compact_frame(df)
+    assert compact["Revenue"].dtype == MONEY_DTYPE
+    assert df["Revenue"].dtype == np.float64
@@ -0,0 +1,113 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import forecast_cache
+import storage
+from compact import compact_frame
+from forecasting import forecast_financials
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DB_NAME", str(tmp_path / "scenarios.db"))
+    forecast_cache.clear_forecast_cache(disk=False)
+    return tmp_path
+
+
+def _history():
+    return pd.DataFrame({
+        "Year": [2022, 2023],
+        "Revenue": [1100000, 1200000],
+        "Operating_Expense": [650000, 700000],
+        "Net_Income": [220000, 250000],
+        "Total_Assets": [1600000, 1700000],
+        "Total_Liabilities": [750000, 800000],
+        "Equity": [850000, 900000],
+    })
+
+
+def test_cache_hits_memory_then_disk(cache, monkeypatch):
+    history = _history()
+    key, first = forecast_cache.cached_forecast(history, revenue_growth=0.1)
+
+    pd.testing.assert_frame_equal(
+        first, forecast_financials(history, revenue_growth=0.1)
+    )
+    assert (cache / forecast_cache.CACHE_FILE_NAME).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("forecast recomputed")
+
+    monkeypatch.setattr(forecast_cache, "forecast_financials", fail)
+
+    # Same content (fresh copy) and same drivers -> memory hit
+    key2, again = forecast_cache.cached_forecast(
+        history.copy(), revenue_growth=0.1
+    )
+    assert key2 == key
+    pd.testing.assert_frame_equal(again, first)
+
+    # New process: memory tier empty -> disk hit
+    forecast_cache.clear_forecast_cache(disk=False)
+    _, from_disk = forecast_cache.cached_forecast(history, revenue_growth=0.1)
+    pd.testing.assert_frame_equal(from_disk, first)
+
+
+def test_disk_hits_keep_compact_dtypes(cache):
+    history = compact_frame(_history())
+    _, first = forecast_cache.cached_forecast(history)
+
+    forecast_cache.clear_forecast_cache(disk=False)
+    _, from_disk = forecast_cache.cached_forecast(history)
+    pd.testing.assert_frame_equal(from_disk, first)
+    assert isinstance(from_disk["Type"].dtype, pd.CategoricalDtype)
+
+
+def test_concurrent_lookups_keep_the_memory_tier_consistent(cache, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "MEMORY_MAX_BYTES", 4000)
+    history = _history()
+
+    def run(offset):
+        for i in range(30):
+            forecast_cache.cached_forecast(
+                history, revenue_growth=(offset + i % 6) / 100
+            )
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sizes = sum(size for _, size in forecast_cache._memory.values())
+    assert forecast_cache._memory_bytes == sizes
+
+
+def test_key_changes_with_inputs():
+    history = _history()
+    base = forecast_cache.forecast_key(history, revenue_growth=0.1)
+
+    assert base == forecast_cache.forecast_key(
+        history, revenue_growth=0.1, debt_change=0.0
+    )
+    assert base != forecast_cache.forecast_key(history, revenue_growth=0.11)
+    assert base != forecast_cache.forecast_key(
+        history, years_ahead=4, revenue_growth=0.1
+    )
+
+    changed = history.copy()
+    changed.loc[1, "Revenue"] += 1
+    assert base != forecast_cache.forecast_key(changed, revenue_growth=0.1)
+
+
+def test_disk_eviction(cache, monkeypatch):
+    monkeypatch.setattr(forecast_cache, "DISK_MAX_BYTES", 1)
+    history = _history()
+
+    for growth in [0.01, 0.02, 0.03]:
+        forecast_cache.cached_forecast(history, revenue_growth=growth)
+
+    conn = storage.get_connection(forecast_cache.cache_path())
+    assert conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] == 1
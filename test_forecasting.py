@@ -1,5 +1,14 @@
+import numpy as np
 import pandas as pd
-from forecasting import forecast_financials
+import pytest
+
+from forecasting import (
+    forecast_financials,
+    forecast_batch,
+    forecast_periods,
+    annual_rollup,
+    BATCH_COLUMNS
+)
 
 def test_forecast_basic():
     data = {
@@ -33,5 +42,120 @@ def test_forecast_basic():
 
     print("Forecast test PASSED")
 
+
+def _sample_history():
+    return pd.DataFrame({
+        "Year": [2021, 2022, 2023],
+        "Revenue": [1000000, 1100000, 1200000],
+        "Operating_Expense": [600000, 650000, 700000],
+        "Net_Income": [200000, 220000, 250000],
+        "Total_Assets": [1500000, 1600000, 1700000],
+        "Total_Liabilities": [700000, 750000, 800000],
+        "Equity": [800000, 850000, 900000],
+    })
+
+
+def test_forecast_batch_matches_scalar():
+    df = _sample_history()
+
+    drivers = {
+        "revenue_growth": np.array([-0.20, 0.0, 0.05, 0.30]),
+        "variable_cost_ratio": np.array([0.8, 0.3, 0.5, 0.1]),
+        "fixed_cost": np.array([900000, 200000, 0, 50000]),
+        "tax_rate": np.array([0.25, 0.0, 0.3, 0.4]),
+        "interest_rate": np.array([0.15, 0.06, 0.0, 0.02]),
+        "debt_change": np.array([0.5, 0.0, -0.5, 0.1]),
+    }
+
+    batch = forecast_batch(df, years_ahead=5, **drivers)
+    assert batch.shape == (4, 5, len(BATCH_COLUMNS))
+
+    for s in range(4):
+        scalar = forecast_financials(
+            df, years_ahead=5,
+            **{k: v[s] for k, v in drivers.items()}
+        )
+        expected = scalar[scalar["Type"] == "Forecast"][BATCH_COLUMNS]
+        np.testing.assert_array_equal(batch[s], expected.to_numpy(float))
+
+
+def test_forecast_batch_frame():
+    df = _sample_history()
+
+    frame = forecast_batch(
+        df, years_ahead=3, revenue_growth=[0.0, 0.1], as_frame=True
+    )
+
+    assert len(frame) == 6
+    assert frame["Year"].tolist() == [2024, 2025, 2026] * 2
+    assert frame["Scenario"].tolist() == [0, 0, 0, 1, 1, 1]
+    assert (frame.loc[frame["Scenario"] == 0, "Revenue"] == 1200000).all()
+
+
+def test_monthly_forecast_rolls_up_to_annual():
+    df = _sample_history()
+    months = forecast_periods(
+        df, years_ahead=30, frequency="M", revenue_growth=0.0,
+        variable_cost_ratio=0.3, fixed_cost=120000, tax_rate=0.0,
+        interest_rate=0.12, debt_change=0.0
+    )
+    assert len(months) == 360
+    assert months["Period"].tolist()[:13] == list(range(1, 13)) + [1]
+
+    annual = annual_rollup(months)
+    assert annual["Year"].tolist() == list(range(2024, 2054))
+    # No growth: each year repeats last year's revenue and costs
+    np.testing.assert_allclose(annual["Revenue"], 1200000)
+    np.testing.assert_allclose(annual["Operating_Expense"], 480000)
+    np.testing.assert_allclose(annual["Interest_Expense"], 96000)
+    np.testing.assert_allclose(
+        annual["Total_Assets"], months["Total_Assets"].iloc[11::12]
+    )
+
+
+def test_annual_frequency_is_unchanged_and_seasonality_keeps_totals():
+    df = _sample_history()
+    annual = forecast_financials(df, years_ahead=3)
+    periods = forecast_periods(df, years_ahead=3, frequency="A")
+    np.testing.assert_array_equal(
+        annual_rollup(periods)[BATCH_COLUMNS],
+        annual[annual["Type"] == "Forecast"][BATCH_COLUMNS]
+    )
+
+    flat = forecast_periods(df, frequency="Q", revenue_growth=0.0)
+    retail = forecast_periods(
+        df, frequency="Q", revenue_growth=0.0, seasonality="retail"
+    )
+    assert retail["Revenue"].iloc[3] > retail["Revenue"].iloc[0]
+    np.testing.assert_allclose(
+        annual_rollup(retail)["Revenue"], annual_rollup(flat)["Revenue"]
+    )
+
+    with pytest.raises(ValueError):
+        forecast_periods(df, frequency="W")
+    with pytest.raises(ValueError):
+        forecast_periods(df, frequency="Q", seasonality=[1, 2, 3])
+
+
+@pytest.mark.parametrize("frequency", ["Q", "M"])
+def test_flat_periods_roll_up_to_the_annual_forecast(frequency):
+    df = _sample_history()
+    annual = forecast_periods(
+        df, years_ahead=5, frequency="A", revenue_growth=0.10
+    )
+    periods = forecast_periods(
+        df, years_ahead=5, frequency=frequency, revenue_growth=0.10
+    )
+    rollup = annual_rollup(periods)
+    for col in ["Revenue", "Net_Income", "Total_Assets", "Equity"]:
+        np.testing.assert_allclose(rollup[col], annual[col])
+
+
 if __name__ == "__main__":
     test_forecast_basic()
+    test_forecast_batch_matches_scalar()
+    test_forecast_batch_frame()
+    test_monthly_forecast_rolls_up_to_annual()
+    test_annual_frequency_is_unchanged_and_seasonality_keeps_totals()
+    test_flat_periods_roll_up_to_the_annual_forecast("Q")
+    test_flat_periods_roll_up_to_the_annual_forecast("M")
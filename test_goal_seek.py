@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import forecast_financials
+from goal_seek import goal_seek
+from test_forecasting import _sample_history
+
+
+def test_solution_reproduces_target():
+    history = _sample_history()
+    row = goal_seek(history, "revenue_growth", 150000.0).iloc[0]
+    assert row["Status"] == "solved"
+
+    forecast = forecast_financials(history, revenue_growth=row["Solution"])
+    assert abs(forecast["Net_Income"].iloc[-1] - 150000.0) < 1e-3
+
+
+def test_periodic_solution_reproduces_target():
+    history = _sample_history()
+    row = goal_seek(
+        history, "revenue_growth", 150000.0,
+        frequency="M", seasonality="retail"
+    ).iloc[0]
+    assert row["Status"] == "solved"
+
+    forecast = forecast_financials(
+        history, revenue_growth=row["Solution"],
+        frequency="M", seasonality="retail"
+    )
+    assert abs(forecast["Net_Income"].iloc[-1] - 150000.0) < 1e-3
+
+
+def test_max_fixed_cost_keeps_equity_positive():
+    history = _sample_history()
+    row = goal_seek(history, "fixed_cost", 0.0, metric="Equity").iloc[0]
+    assert row["Status"] == "solved"
+
+    below = forecast_financials(history, fixed_cost=row["Solution"] * 0.99)
+    above = forecast_financials(history, fixed_cost=row["Solution"] * 1.01)
+    assert below["Equity"].iloc[-1] > 0 > above["Equity"].iloc[-1]
+
+
+def test_unreachable_target_reports_no_solution():
+    history = _sample_history()
+    # Net income can never exceed EBIT - interest, whatever the tax rate
+    row = goal_seek(history, "tax_rate", 1e12).iloc[0]
+    assert row["Status"] == "no_solution"
+    assert np.isnan(row["Solution"])
+
+
+def test_panel_and_many_targets_vectorized():
+    history = _sample_history()
+    panel = pd.concat(
+        [history.assign(Entity=e) for e in ["A", "B"]], ignore_index=True
+    )
+    result = goal_seek(panel, "revenue_growth", [1e5, 2e5], entity_col="Entity")
+    assert list(result["Entity"]) == ["A", "B"]
+    assert (result["Status"] == "solved").all()
+
+    targets = np.linspace(0, 3e5, 10000)
+    result = goal_seek(history, "revenue_growth", targets)
+    assert len(result) == 10000
+    assert (result["Status"] == "solved").all()
+    np.testing.assert_array_equal(result["Target"], targets)
+
+
+if __name__ == "__main__":
+    test_solution_reproduces_target()
+    test_periodic_solution_reproduces_target()
+    test_max_fixed_cost_keeps_equity_positive()
+    test_unreachable_target_reports_no_solution()
+    test_panel_and_many_targets_vectorized()
+    print("goal seek tests passed")
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import history
+from cashflow import compute_cash_flow
+from financial_metrics import compute_financial_ratios
+from test_forecasting import _sample_history
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history.db")
+
+
+def _statuses(report):
+    return dict(zip(report["Year"], report["Status"]))
+
+
+def test_append_change_and_recompute(path):
+    df = _sample_history()
+    report = history.upsert_history(df.iloc[:2], path=path)
+    assert _statuses(report) == {2021: "new", 2022: "new"}
+
+    report = history.upsert_history(df.iloc[1:], path=path)
+    assert _statuses(report) == {2022: "unchanged", 2023: "new"}
+
+    # A changed year rewrites the following year (its cash flow diffs)
+    changed = df.iloc[[1]].assign(Total_Assets=1650000)
+    report = history.upsert_history(changed, path=path)
+    assert _statuses(report) == {2022: "changed", 2023: "recomputed"}
+
+    stored = history.load_history("Company", path=path)
+    assert stored["Year"].tolist() == [2021, 2022, 2023]
+    assert stored["CFI"].tolist() == [0.0, -150000.0, -50000.0]
+    assert history.list_entities(path) == ["Company"]
+
+
+def test_stored_history_matches_full_recompute(path):
+    df = _sample_history()
+    panel = pd.concat(
+        [df.assign(Entity="A"), df.assign(Entity="B", Revenue=df["Revenue"] * 2)],
+        ignore_index=True
+    )
+    # Uploaded in pieces, out of order
+    history.upsert_history(panel.iloc[[2, 5]], entity_col="Entity", path=path)
+    history.upsert_history(panel.iloc[[0, 3, 4]], entity_col="Entity", path=path)
+    history.upsert_history(panel.iloc[[1]], entity_col="Entity", path=path)
+
+    stored = history.load_history(path=path)
+    expected = compute_cash_flow(
+        compute_financial_ratios(panel), entity_col="Entity"
+    )
+    for col in history.DERIVED_COLUMNS:
+        np.testing.assert_allclose(
+            stored[col].to_numpy(dtype=float),
+            expected[col].to_numpy(dtype=float),
+            equal_nan=True
+        )
+
+
+def test_gaps_warn_or_raise_in_strict_mode(path):
+    df = _sample_history()
+    history.upsert_history(df.iloc[[0]], path=path)
+
+    report = history.upsert_history(df.iloc[[2]], path=path)
+    assert report["Warning"].iloc[0] == "No data between 2021 and 2023"
+
+    with pytest.raises(ValueError, match="changed by"):
+        history.upsert_history(
+            df.iloc[[1]].assign(Revenue=1e9), strict=True, path=path
+        )
+    assert history.load_history(path=path)["Year"].tolist() == [2021, 2023]
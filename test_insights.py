@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insights import evaluate_rules, generate_insights, INSIGHT_COLUMNS
+from test_forecasting import _sample_history
+
+
+def _panel():
+    growing = _sample_history()
+    shrinking = growing.assign(
+        Revenue=growing["Revenue"][::-1].to_numpy(),
+        Net_Income=[250000, 100000, -50000],
+        Total_Liabilities=[1000000, 1300000, 1500000]
+    )
+    # Rows out of order and entities interleaved
+    panel = pd.concat(
+        [growing.assign(Entity="GROW"), shrinking.assign(Entity="SHRINK")],
+        ignore_index=True
+    )
+    return panel.sample(frac=1, random_state=0)
+
+
+def test_default_rules_keep_single_company_messages():
+    assert generate_insights(_sample_history()) == [
+        "Profitability has improved over time.",
+        "Debt levels remain manageable."
+    ]
+    assert generate_insights(
+        _sample_history(), thresholds={"strong_growth": 0.1}
+    )[0] == "Revenue shows strong long-term growth."
+
+
+def test_nan_metrics_fall_to_the_otherwise_rules():
+    history = _sample_history()
+    history.loc[0, "Net_Income"] = np.nan
+    history.loc[2, "Total_Assets"] = 0
+    history.loc[2, "Total_Liabilities"] = 0
+
+    # As the original if / else: NaN is not "improved" nor "high"
+    assert generate_insights(history) == [
+        "Profitability pressure observed.",
+        "Debt levels remain manageable."
+    ]
+    result = evaluate_rules(
+        history, rules=["profitability_improved", "margin_expanding",
+                        "profitability_pressure"]
+    )
+    assert result["Rule"].tolist() == ["profitability_pressure"]
+    assert np.isnan(result["Value"].iloc[0])
+
+
+def test_division_by_zero_keeps_the_baseline_insights():
+    history = _sample_history()
+    history.loc[0, "Revenue"] = 0
+    history.loc[2, "Total_Assets"] = 0
+
+    # As the original division: x / 0 is inf, so growth is strong and
+    # leverage high rather than "manageable"
+    assert generate_insights(history) == [
+        "Revenue shows strong long-term growth.",
+        "Profitability has improved over time.",
+        "High leverage increases financial risk."
+    ]
+
+
+def test_panel_matches_each_company_alone():
+    panel = _panel()
+    result = evaluate_rules(panel, entity_col="Entity", rules="all")
+    assert list(result.columns) == ["Entity"] + INSIGHT_COLUMNS
+
+    for entity, rows in result.groupby("Entity", sort=False):
+        alone = evaluate_rules(
+            panel[panel["Entity"] == entity], rules="all"
+        )
+        assert rows["Rule"].tolist() == alone["Rule"].tolist()
+        np.testing.assert_allclose(rows["Value"], alone["Value"])
+
+    shrink = result[result["Entity"] == "SHRINK"].set_index("Rule")
+    assert shrink.loc["high_leverage", "Severity"] == "critical"
+    assert shrink.loc["negative_operating_cash_flow", "Value"] == -50000
+    assert shrink.loc["revenue_decline", "Value"] == pytest.approx(
+        (1000000 / 1200000) ** 0.5 - 1
+    )
+
+
+def test_missing_inputs_are_reported():
+    with pytest.raises(ValueError):
+        evaluate_rules(_sample_history()[["Year", "Revenue"]])
+    with pytest.raises(ValueError):
+        evaluate_rules(_sample_history(), rules=["no_such_rule"])
@@ -0,0 +1,70 @@
+import io
+from data_loader import load_ledger
+from validator import validate_income_statement, validate_balance_sheet
+
+LEDGER = """Date,Account,Amount,Memo
+2022-01-10,4000,100,sale
+2022-03-01,6100,40,rent
+2022-05-01,1000,500,cash
+2022-06-01,2000,200,loan
+2023-02-01,4010,150,sale
+2023-04-01,6100,60,rent
+2023-05-01,1000,100,cash
+2023-05-01,9999,100,unmapped
+"""
+
+ACCOUNTS = {
+    "4*": "Revenue",
+    "6*": "Operating_Expense",
+    "1*": "Total_Assets",
+    "2*": "Total_Liabilities"
+}
+
+
+def test_ledger_aggregates_across_chunks():
+    income, balance = load_ledger(io.StringIO(LEDGER), ACCOUNTS, chunksize=3)
+
+    assert income.to_dict("list") == {
+        "Year": [2022, 2023],
+        "Revenue": [100.0, 150.0],
+        "Operating_Expense": [40.0, 60.0],
+        "Net_Income": [60.0, 90.0]
+    }
+    assert balance["Total_Assets"].tolist() == [500.0, 600.0]
+    assert balance["Equity"].tolist() == [300.0, 400.0]
+
+    # Output is in the shape the validator expects
+    validate_income_statement(income, mode="strict")
+    validate_balance_sheet(balance, mode="strict")
+
+
+def test_ledger_fiscal_year_and_opening_balances():
+    income, balance = load_ledger(
+        io.StringIO(LEDGER), ACCOUNTS,
+        fiscal_year_start_month=4,
+        opening_balances={"Total_Assets": 1000}
+    )
+
+    assert income["Year"].tolist() == [2022, 2023, 2024]
+    assert income["Revenue"].tolist() == [100.0, 150.0, 0.0]
+    assert balance["Total_Assets"].tolist() == [1000.0, 1500.0, 1600.0]
+
+
+def test_longest_prefix_wins():
+    ledger = """Date,Account,Amount
+2022-01-10,4000,100
+2022-02-10,4900,30
+2022-03-10,4910,5
+"""
+    # The generic prefix comes first but must not capture 49xx
+    accounts = {"4*": "Revenue", "49*": "Operating_Expense", "4910": "Revenue"}
+    income, _ = load_ledger(io.StringIO(ledger), accounts)
+
+    assert income["Revenue"].tolist() == [105.0]
+    assert income["Operating_Expense"].tolist() == [30.0]
+
+
+if __name__ == "__main__":
+    test_ledger_aggregates_across_chunks()
+    test_ledger_fiscal_year_and_opening_balances()
+    test_longest_prefix_wins()
@@ -0,0 +1,34 @@
+import shutil
+from portfolio import load_portfolio
+
+
+def test_load_portfolio(tmp_path):
+    for entity in ["acme", "globex"]:
+        shutil.copy("sample_income_statement.csv", tmp_path / f"{entity}_income.csv")
+        shutil.copy("sample_balance_sheet.csv", tmp_path / f"{entity}_balance.csv")
+
+    # Unpaired file and an entity that fails validation
+    shutil.copy("sample_income_statement.csv", tmp_path / "initech_income.csv")
+    shutil.copy("sample_income_statement.csv", tmp_path / "broken_income.csv")
+    shutil.copy("sample_income_statement.csv", tmp_path / "broken_balance.csv")
+
+    progress = []
+    panel, report = load_portfolio(
+        str(tmp_path), workers=2,
+        progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert panel["Entity"].unique().tolist() == ["acme", "globex"]
+    assert len(panel) == 10
+    assert {"Revenue", "Total_Assets", "Equity"} <= set(panel.columns)
+
+    status = report.set_index("Entity")["status"].to_dict()
+    assert status == {
+        "acme": "ok", "globex": "ok", "broken": "error", "initech": "error"
+    }
+    assert progress[-1] == (3, 3)
+
+
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_load_portfolio(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,138 @@
+import contextvars
+import json
+import os
+import subprocess
+import sys
+import threading
+import tracemalloc
+
+import pytest
+
+import profiler
+from cashflow import compute_cash_flow
+from forecasting import forecast_financials
+from test_forecasting import _sample_history
+
+
+def _profile(memory=False):
+    profiler.reset()
+    profiler.enable(memory=memory)
+    try:
+        forecast = forecast_financials(_sample_history())
+        compute_cash_flow(forecast)
+        with profiler.stage("custom"):
+            sum(range(1000))
+    finally:
+        profiler.disable()
+    return profiler.summary()
+
+
+def test_disabled_records_nothing():
+    profiler.reset()
+    profiler.disable()
+    forecast_financials(_sample_history())
+    assert profiler.events() == []
+
+
+def test_summary_counts_calls_and_rows():
+    summary = _profile().set_index("Stage")
+    assert summary.loc["forecasting.forecast_financials", "Calls"] == 1
+    assert summary.loc["cashflow.compute_cash_flow", "Rows"] > 0
+    assert "custom" in summary.index
+
+
+def test_self_time_excludes_nested_stages():
+    summary = _profile().set_index("Stage")
+    outer = summary.loc["forecasting.forecast_financials"]
+    inner = summary.loc[[
+        "forecasting.forecast_periods", "forecasting.forecast_paths"
+    ]]
+    # forecast_periods (and forecast_paths in it) run inside
+    assert outer["Self_Seconds"] < outer["Total_Seconds"]
+    assert inner["Self_Seconds"].sum() <= inner["Total_Seconds"].sum()
+
+    wall = sum(
+        e["seconds"] for e in profiler.events()
+        if e["stage"] in ("forecasting.forecast_financials",
+                          "cashflow.compute_cash_flow", "custom")
+    )
+    assert summary["Self_Seconds"].sum() == pytest.approx(wall)
+    assert summary["Self_Seconds"].is_monotonic_decreasing
+
+
+def test_memory_tracking_and_exports():
+    summary = _profile(memory=True)
+    assert (summary["Peak_MB"] >= 0).all()
+
+    data = json.loads(profiler.to_json())
+    stages = [e["stage"] for e in data["events"]]
+    # forecast_financials runs forecast_periods -> forecast_paths inside
+    assert stages == [
+        "forecasting.forecast_paths",
+        "forecasting.forecast_periods",
+        "forecasting.forecast_financials",
+        "cashflow.compute_cash_flow",
+        "custom"
+    ]
+
+    trace = json.loads(profiler.to_chrome_trace())
+    assert {e["ph"] for e in trace["traceEvents"]} == {"X"}
+
+
+def test_sessions_record_and_switch_independently():
+    profiler.reset()
+    first, second = profiler.Recorder(), profiler.Recorder()
+
+    def run(recorder, ready, done):
+        profiler.use(recorder)
+        profiler.enable(memory=True)
+        ready.set()
+        done.wait(10)
+        forecast_financials(_sample_history())
+        profiler.disable()
+
+    ready, done = threading.Event(), threading.Event()
+    worker = threading.Thread(target=run, args=(first, ready, done))
+    worker.start()
+    ready.wait(10)
+
+    def switch(recorder):
+        profiler.use(recorder)
+        profiler.enable(memory=True)
+        profiler.disable()
+
+    # Another session switching off leaves the first one tracing
+    contextvars.copy_context().run(switch, second)
+    assert tracemalloc.is_tracing()
+
+    done.set()
+    worker.join(10)
+    assert not tracemalloc.is_tracing()
+    assert first.events() and second.events() == []
+    assert profiler.events() == []
+
+
+def test_app_startup_does_not_load_pandas():
+    code = "import sys, app; print('pandas' in sys.modules)"
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(profiler.__file__))
+    )
+    assert proc.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_import_costs_measures_each_module():
+    costs = profiler.import_costs(["forecasting"], preload=())
+    assert costs.loc[0, "Module"] == "forecasting"
+    assert costs.loc[0, "Import_Seconds"] > 0
+
+
+if __name__ == "__main__":
+    test_disabled_records_nothing()
+    test_summary_counts_calls_and_rows()
+    test_self_time_excludes_nested_stages()
+    test_memory_tracking_and_exports()
+    test_sessions_record_and_switch_independently()
+    test_app_startup_does_not_load_pandas()
+    test_import_costs_measures_each_module()
+    print("profiler tests passed")
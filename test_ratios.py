@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import financial_metrics
+from financial_metrics import (
+    compute_financial_ratios,
+    register_ratio,
+    available_ratios,
+    DEFAULT_RATIOS,
+    RATIOS
+)
+from test_forecasting import _sample_history
+
+
+def test_default_ratios_unchanged():
+    df = _sample_history()
+    result = compute_financial_ratios(df)
+
+    assert list(result.columns) == list(df.columns) + DEFAULT_RATIOS
+    np.testing.assert_allclose(
+        result["Operating_Margin"],
+        (df["Revenue"] - df["Operating_Expense"]) / df["Revenue"]
+    )
+    np.testing.assert_allclose(
+        result["Debt_Ratio"], df["Total_Liabilities"] / df["Total_Assets"]
+    )
+
+
+def test_selected_ratios_only_and_float32():
+    result = compute_financial_ratios(
+        _sample_history(), ratios=["ROE"], dtype=np.float32, columns_only=True
+    )
+    assert list(result.columns) == ["ROE"]
+    assert result["ROE"].dtype == np.float32
+
+
+def test_zero_denominator_policies():
+    df = pd.DataFrame({
+        "Revenue": [0.0, 100.0],
+        "Operating_Expense": [0.0, 50.0],
+        "Net_Income": [10.0, 20.0],
+        "EBIT": [10.0, 10.0],
+        "Interest_Expense": [0.0, 5.0]
+    })
+    result = compute_financial_ratios(
+        df, ratios=["Net_Profit_Margin", "Interest_Coverage"],
+        columns_only=True
+    )
+    assert np.isnan(result["Net_Profit_Margin"].iloc[0])
+    assert np.isinf(result["Interest_Coverage"].iloc[0])
+    assert result["Interest_Coverage"].iloc[1] == 2.0
+
+
+def test_registry_extension_and_availability(monkeypatch):
+    monkeypatch.setattr(financial_metrics, "RATIOS", dict(RATIOS))
+    register_ratio("Asset_Turnover", "Revenue", "Total_Assets", on_zero="zero")
+
+    df = _sample_history()
+    assert "Asset_Turnover" in available_ratios(df.columns)
+    assert "Current_Ratio" not in available_ratios(df.columns)
+
+    result = compute_financial_ratios(df, ratios="all", columns_only=True)
+    assert "Asset_Turnover" in result.columns
+
+    with pytest.raises(ValueError):
+        compute_financial_ratios(df, ratios=["Current_Ratio"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
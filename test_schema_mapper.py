@@ -0,0 +1,81 @@
+import threading
+
+import schema_mapper
+from schema_mapper import (
+    map_columns,
+    mapping_report,
+    register_synonyms,
+    INCOME_STATEMENT_MAPPING,
+    BALANCE_SHEET_MAPPING
+)
+
+
+def test_map_columns_sample_headers():
+    income = map_columns(
+        ["Year", "Sales", "Operating Cost", "Net Profit", "Random Column"],
+        INCOME_STATEMENT_MAPPING
+    )
+    assert income == {
+        "Year": "Year",
+        "Sales": "Revenue",
+        "Operating Cost": "Operating_Expense",
+        "Net Profit": "Net_Income"
+    }
+
+    balance = map_columns(
+        ["Fiscal Year", "Assets", "Liabilities", "Shareholders Equity"],
+        BALANCE_SHEET_MAPPING
+    )
+    assert balance["Fiscal Year"] == "Year"
+    assert balance["Shareholders Equity"] == "Equity"
+
+
+def test_cached_result_is_not_shared():
+    header = ["Year", "Revenue"]
+    first = map_columns(header, INCOME_STATEMENT_MAPPING)
+    first["Year"] = "changed"
+    assert map_columns(header, INCOME_STATEMENT_MAPPING)["Year"] == "Year"
+
+
+def test_mapping_report_and_synonym_packs():
+    mapping = {k: list(v) for k, v in INCOME_STATEMENT_MAPPING.items()}
+    header = ["Year", "Sales", "Revenue", "Umsatz Kosten", "Notes"]
+
+    report = mapping_report(header, mapping)
+    assert report["ambiguous"] == {"Revenue": ["Sales", "Revenue"]}
+    assert report["unmapped"] == ["Umsatz Kosten", "Notes"]
+    assert report["missing"] == ["Operating_Expense", "Net_Income"]
+    assert report["mapped"]["Sales"] == "Revenue"
+
+    register_synonyms({"Operating_Expense": ["Umsatz-Kosten"]}, mapping)
+    assert map_columns(header, mapping)["Umsatz Kosten"] == "Operating_Expense"
+    assert "umsatzkosten" not in INCOME_STATEMENT_MAPPING["Operating_Expense"]
+
+
+def test_concurrent_lookups_keep_the_header_cache_bounded(monkeypatch):
+    monkeypatch.setattr(schema_mapper, "HEADER_CACHE_SIZE", 8)
+    monkeypatch.setattr(schema_mapper, "_header_cache", schema_mapper.OrderedDict())
+    errors = []
+
+    def run(offset):
+        try:
+            for i in range(300):
+                header = ["Year", "Sales", f"Extra {(offset + i) % 20}"]
+                assert map_columns(header, INCOME_STATEMENT_MAPPING)["Sales"] == "Revenue"
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(schema_mapper._header_cache) <= 8
+
+
+if __name__ == "__main__":
+    test_map_columns_sample_headers()
+    test_cached_result_is_not_shared()
+    test_mapping_report_and_synonym_packs()
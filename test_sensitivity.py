@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from forecasting import forecast_financials
+from sensitivity import tornado_analysis
+
+
+def _history():
+    return pd.DataFrame({
+        "Year": [2022, 2023],
+        "Revenue": [1100000, 1200000],
+        "Operating_Expense": [650000, 700000],
+        "Net_Income": [220000, 250000],
+        "Total_Assets": [1600000, 1700000],
+        "Total_Liabilities": [750000, 800000],
+        "Equity": [850000, 900000],
+    })
+
+
+def test_tornado_matches_individual_forecasts():
+    df = _history()
+
+    base = {"revenue_growth": 0.08, "fixed_cost": 300000}
+    result = tornado_analysis(df, base_inputs=base)
+
+    assert set(result["Driver"]) == {
+        "revenue_growth", "variable_cost_ratio", "fixed_cost",
+        "tax_rate", "interest_rate", "debt_change"
+    }
+    assert len(result) == 18
+
+    base_ni = forecast_financials(df, **base).iloc[-1]["Net_Income"]
+    high_growth_ni = forecast_financials(
+        df, revenue_growth=0.13, fixed_cost=300000
+    ).iloc[-1]["Net_Income"]
+
+    row = result[
+        (result["Driver"] == "revenue_growth")
+        & (result["Metric"] == "Net_Income")
+    ].iloc[0]
+    np.testing.assert_allclose(row["Base"], base_ni)
+    np.testing.assert_allclose(row["High_Impact"], high_growth_ni - base_ni)
+    assert row["Low_Impact"] < 0 < row["High_Impact"]
+
+
+def test_tornado_follows_horizon_and_frequency():
+    df = _history()
+    result = tornado_analysis(
+        df, years_ahead=5, frequency="Q", seasonality="retail"
+    )
+
+    final = forecast_financials(
+        df, years_ahead=5, frequency="Q", seasonality="retail"
+    ).iloc[-1]
+    base = result.drop_duplicates("Metric").set_index("Metric")["Base"]
+    np.testing.assert_allclose(base["Net_Income"], final["Net_Income"])
+    np.testing.assert_allclose(base["Equity"], final["Equity"])
+
+
+def test_flexed_drivers_stay_in_range():
+    base = {"tax_rate": 0.02, "variable_cost_ratio": 0.78, "debt_change": 0.0}
+    result = tornado_analysis(_history(), base_inputs=base)
+    inputs = result.drop_duplicates("Driver").set_index("Driver")
+
+    assert inputs.loc["tax_rate", "Low_Input"] == 0.0
+    np.testing.assert_allclose(inputs.loc["tax_rate", "High_Input"], 0.07)
+    assert inputs.loc["variable_cost_ratio", "High_Input"] == 0.80
+    assert inputs.loc["debt_change", "Low_Input"] == -0.10
+
+    result = tornado_analysis(
+        _history(), base_inputs={"tax_rate": 0.0}, deltas={"tax_rate": 0.5}
+    )
+    tax = result[result["Driver"] == "tax_rate"].iloc[0]
+    assert (tax["Low_Input"], tax["High_Input"]) == (0.0, 0.40)
+    assert tax["Low_Impact"] == 0.0
+
+
+if __name__ == "__main__":
+    test_tornado_matches_individual_forecasts()
+    test_tornado_follows_horizon_and_frequency()
+    test_flexed_drivers_stay_in_range()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import forecast_financials
+from simulation import (
+    simulate_forecasts, _simulate_chunk, DEFAULT_DISTRIBUTIONS, SKETCH_POINTS
+)
+
+
+def _sample_history():
+    return pd.DataFrame({
+        "Year": [2022, 2023],
+        "Revenue": [1100000, 1200000],
+        "Operating_Expense": [650000, 700000],
+        "Net_Income": [220000, 250000],
+        "Total_Assets": [1600000, 1700000],
+        "Total_Liabilities": [750000, 800000],
+        "Equity": [850000, 900000],
+    })
+
+
+def test_fixed_distributions_match_deterministic_forecast():
+    df = _sample_history()
+    fixed = {
+        "revenue_growth": {"dist": "fixed", "value": 0.05},
+        "variable_cost_ratio": {"dist": "fixed", "value": 0.30},
+        "interest_rate": {"dist": "fixed", "value": 0.06},
+        "debt_change": {"dist": "fixed", "value": 0.0},
+    }
+
+    result = simulate_forecasts(
+        df, years_ahead=3, n_paths=100, distributions=fixed, seed=0
+    )
+    expected = forecast_financials(df, years_ahead=3).iloc[-3:]
+
+    pct = result["percentiles"]
+    ni = pct[pct["Metric"] == "Net_Income"]
+    np.testing.assert_allclose(ni["P5"], expected["Net_Income"])
+    np.testing.assert_allclose(ni["P95"], expected["Net_Income"])
+    assert (result["probabilities"]["P_Net_Loss"] == 0).all()
+
+    # Quarterly with seasonality follows the quarterly forecast
+    result = simulate_forecasts(
+        df, years_ahead=3, n_paths=100, distributions=fixed, seed=0,
+        frequency="Q", seasonality="retail"
+    )
+    expected = forecast_financials(
+        df, years_ahead=3, frequency="Q", seasonality="retail"
+    ).iloc[-3:]
+    pct = result["percentiles"]
+    ni = pct[pct["Metric"] == "Net_Income"]
+    np.testing.assert_allclose(ni["P50"], expected["Net_Income"])
+
+
+def test_seeded_runs_are_reproducible_across_chunking():
+    df = _sample_history()
+    corr = {("revenue_growth", "variable_cost_ratio"): -0.5}
+
+    serial = simulate_forecasts(
+        df, n_paths=5000, seed=42, correlation=corr, chunk_size=1000
+    )
+    pooled = simulate_forecasts(
+        df, n_paths=5000, seed=42, correlation=corr, chunk_size=1000,
+        workers=2
+    )
+
+    pd.testing.assert_frame_equal(serial["percentiles"], pooled["percentiles"])
+    pd.testing.assert_frame_equal(
+        serial["probabilities"], pooled["probabilities"]
+    )
+
+    pct = serial["percentiles"]
+    assert (pct["P5"] <= pct["P50"]).all()
+    assert (pct["P50"] <= pct["P95"]).all()
+
+
+def test_chunks_reduce_to_fixed_size_and_bad_correlation_is_rejected():
+    for n_paths in (500, 5000):
+        _, sketches, _, _ = _simulate_chunk((
+            np.random.SeedSequence(0), n_paths, (1.2e6, 1.7e6, 8e5), 4,
+            1, None, DEFAULT_DISTRIBUTIONS, None, 0.6
+        ))
+        assert all(s.shape == (SKETCH_POINTS, 4) for s in sketches.values())
+
+    contradictory = {
+        ("revenue_growth", "variable_cost_ratio"): 0.9,
+        ("revenue_growth", "tax_rate"): 0.9,
+        ("variable_cost_ratio", "tax_rate"): -0.9
+    }
+    with pytest.raises(ValueError, match="positive definite"):
+        simulate_forecasts(_sample_history(), correlation=contradictory)
+    with pytest.raises(ValueError, match="Unknown driver"):
+        simulate_forecasts(
+            _sample_history(), correlation={("growth", "tax_rate"): 0.1}
+        )
+
+
+if __name__ == "__main__":
+    test_fixed_distributions_match_deterministic_forecast()
+    test_seeded_runs_are_reproducible_across_chunking()
+    test_chunks_reduce_to_fixed_size_and_bad_correlation_is_rejected()
@@ -0,0 +1,251 @@
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import storage
+from forecasting import forecast_financials
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "scenarios.db")
+    monkeypatch.setattr(storage, "DB_NAME", path)
+    return path
+
+
+def _forecast():
+    history = pd.DataFrame({
+        "Year": [2022, 2023],
+        "Revenue": [1100000, 1200000],
+        "Operating_Expense": [650000, 700000],
+        "Net_Income": [220000, 250000],
+        "Total_Assets": [1600000, 1700000],
+        "Total_Liabilities": [750000, 800000],
+        "Equity": [850000, 900000],
+    })
+    return forecast_financials(history, years_ahead=3)
+
+
+def test_round_trip_preserves_columns_and_dtypes(db):
+    storage.init_db()
+    forecast = _forecast()
+
+    storage.save_scenario("Base", 0.05, 0.3, 0.0, forecast)
+    scenarios = storage.load_scenarios()
+
+    assert scenarios.columns.tolist() == storage.SCENARIO_META_COLUMNS
+    loaded = storage.load_scenario_forecast(scenarios["scenario_id"][0])
+    pd.testing.assert_frame_equal(loaded, forecast, check_dtype=False)
+    assert loaded["Year"].dtype == forecast["Year"].dtype
+
+    storage.delete_scenario(scenarios["scenario_id"][0])
+    assert storage.load_scenarios().empty
+    assert storage.load_scenario_forecast(1).empty
+
+
+def test_migrates_forecast_json_databases(db):
+    forecast = _forecast()
+
+    conn = sqlite3.connect(db)
+    conn.execute("""
+        CREATE TABLE scenarios (
+            scenario_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scenario_name TEXT,
+            created_at TEXT,
+            revenue_growth REAL,
+            opex_ratio REAL,
+            debt_change REAL,
+            forecast_json TEXT
+        )
+    """)
+    conn.execute(
+        "INSERT INTO scenarios VALUES (7, 'Old', '2024-01-01', 0.05, 0.3, 0.0, ?)",
+        (forecast.to_json(orient="records"),)
+    )
+    conn.commit()
+    conn.close()
+
+    storage.init_db()
+
+    conn = sqlite3.connect(db)
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(scenarios)")]
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    assert "forecast_json" not in columns
+    assert version == storage.SCHEMA_VERSION
+
+    loaded = storage.load_scenario_forecast(7)
+    np.testing.assert_allclose(loaded["Net_Income"], forecast["Net_Income"])
+    assert loaded["Type"].tolist() == forecast["Type"].tolist()
+
+    ranked = storage.rank_scenarios("final_net_income")
+    assert ranked["scenario_id"].tolist() == [7]
+    np.testing.assert_allclose(
+        ranked["final_net_income"], forecast["Net_Income"].iloc[-1]
+    )
+
+    # Running init_db again is a no-op
+    storage.init_db()
+    assert storage.load_scenarios()["scenario_name"].tolist() == ["Old"]
+
+
+def test_bulk_save_and_connection_reuse(db):
+    storage.init_db()
+    forecast = _forecast()
+
+    ids = storage.save_scenarios([
+        {
+            "scenario_name": f"Sweep {i}",
+            "revenue_growth": i / 100,
+            "opex_ratio": 0.3,
+            "debt_change": 0.0,
+            "forecast_df": forecast
+        }
+        for i in range(50)
+    ])
+
+    assert len(ids) == 50
+    assert storage.load_scenarios()["scenario_id"].tolist() == ids
+    assert storage.get_connection() is storage.get_connection()
+
+    mode = storage.get_connection().execute("PRAGMA journal_mode").fetchone()
+    assert mode[0] == "wal"
+
+
+def test_duplicate_saves_share_one_forecast(db):
+    storage.init_db()
+    forecast = _forecast()
+
+    first = storage.save_scenario("A", 0.05, 0.3, 0.0, forecast)
+    second = storage.save_scenario("B", 0.05, 0.3, 0.0, forecast.copy())
+
+    conn = storage.get_connection()
+    stored = conn.execute(
+        "SELECT COUNT(DISTINCT forecast_key) FROM forecast_columns"
+    ).fetchone()[0]
+    assert stored == 1
+
+    storage.delete_scenario(first)
+    pd.testing.assert_frame_equal(
+        storage.load_scenario_forecast(second), forecast, check_dtype=False
+    )
+
+    storage.delete_scenario(second)
+    assert conn.execute("SELECT COUNT(*) FROM forecast_columns").fetchone()[0] == 0
+
+
+def test_migrates_per_scenario_column_blobs(db):
+    forecast = _forecast()
+
+    conn = sqlite3.connect(db)
+    conn.execute("""
+        CREATE TABLE scenarios (
+            scenario_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scenario_name TEXT,
+            created_at TEXT,
+            revenue_growth REAL,
+            opex_ratio REAL,
+            debt_change REAL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE scenario_columns (
+            scenario_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            dtype TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (scenario_id, position)
+        )
+    """)
+    for sid in (1, 2):
+        conn.execute(
+            "INSERT INTO scenarios VALUES (?, 'Old', '2024-01-01', 0.05, 0.3, 0.0)",
+            (sid,)
+        )
+        conn.executemany(
+            "INSERT INTO scenario_columns VALUES (?, ?, ?, ?, ?)",
+            storage.encode_frame(sid, forecast)
+        )
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    storage.init_db()
+
+    both = storage.load_scenario_forecasts([1, 2])
+    assert len(both) == 2 * len(forecast)
+    assert len(storage.rank_scenarios()) == 2
+
+    conn = storage.get_connection()
+    keys = conn.execute(
+        "SELECT COUNT(DISTINCT forecast_key) FROM forecast_columns"
+    ).fetchone()[0]
+    assert keys == 1
+
+
+def test_kpis_ranking_and_batched_load(db):
+    storage.init_db()
+    forecast = _forecast()
+    history = forecast[forecast["Type"] == "Historical"]
+
+    ids = []
+    for growth in [0.0, 0.10, 0.20]:
+        scenario = forecast_financials(
+            history.drop(columns="Type"), revenue_growth=growth,
+            debt_change=growth
+        )
+        ids.append(storage.save_scenario(f"g{growth}", growth, 0.3, growth, scenario))
+
+    ranked = storage.rank_scenarios("final_equity", limit=2)
+    assert ranked["scenario_id"].tolist() == [ids[2], ids[1]]
+
+    expected = scenario[scenario["Type"] == "Forecast"]
+    top = ranked.iloc[0]
+    assert top["final_year"] == expected["Year"].iloc[-1]
+    np.testing.assert_allclose(top["min_equity"], expected["Equity"].min())
+    np.testing.assert_allclose(
+        top["cumulative_net_income"], expected["Net_Income"].sum()
+    )
+
+    low_debt = storage.rank_scenarios(
+        "final_equity", filters={"final_debt_ratio": ("<", 0.33)}
+    )
+    assert low_debt["final_debt_ratio"].lt(0.33).all()
+    assert low_debt["scenario_id"].tolist() == [ids[1], ids[0]]
+
+    with pytest.raises(ValueError):
+        storage.rank_scenarios("1; DROP TABLE scenarios")
+
+    both = storage.load_scenario_forecasts([ids[2], ids[0]])
+    assert both["scenario_id"].unique().tolist() == [ids[2], ids[0]]
+    assert len(both) == 2 * len(forecast)
+
+
+def test_retry_on_lock(monkeypatch):
+    monkeypatch.setattr(storage, "RETRY_BASE_DELAY", 0)
+    calls = []
+
+    @storage.with_retry
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "done"
+
+    assert flaky() == "done"
+    assert len(calls) == 3
+
+    @storage.with_retry
+    def broken():
+        raise sqlite3.OperationalError("no such table: x")
+
+    with pytest.raises(sqlite3.OperationalError):
+        broken()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
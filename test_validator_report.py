@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_loader import load_income_statement, load_balance_sheet
+from validator import validate_income_statement, validate_balance_sheet
+
+
+def test_income_anomalies_are_structured():
+    df = validate_income_statement(
+        load_income_statement("income_anomalous.csv"),
+        mode="auto_clean_warn"
+    )
+
+    assert df["Year"].tolist() == [2019, 2020, 2023, 2024]
+    assert df["Revenue"].dtype == float
+
+    report = {(a["code"], a["column"]): a for a in df.attrs["anomalies"]}
+    assert set(report) == {
+        ("MISSING_VALUE", "Operating_Expense"),
+        ("MISSING_VALUE", "Net_Income"),
+        ("NON_NUMERIC", "Revenue"),
+        ("DUPLICATE_YEAR", "Year"),
+    }
+    np.testing.assert_array_equal(report[("NON_NUMERIC", "Revenue")]["rows"], [3])
+    np.testing.assert_array_equal(report[("DUPLICATE_YEAR", "Year")]["rows"], [2])
+    assert len(df.attrs["warnings"]) == 4
+
+
+def test_balance_identity_check():
+    df = pd.DataFrame({
+        "Year": [2022, 2023],
+        "Total_Assets": [1000, 1000],
+        "Total_Liabilities": [600, 600],
+        "Equity": [400, 100],
+    })
+
+    clean = validate_balance_sheet(df, mode="auto_clean")
+    assert len(clean) == 2
+    assert "warnings" not in clean.attrs
+    (anomaly,) = clean.attrs["anomalies"]
+    assert anomaly["code"] == "IDENTITY_MISMATCH"
+    np.testing.assert_array_equal(anomaly["rows"], [1])
+
+
+def test_strict_mode_fails_fast():
+    with pytest.raises(ValueError, match="missing values in column: Total_Liabilities"):
+        validate_balance_sheet(
+            load_balance_sheet("balance_anomalous.csv"), mode="strict"
+        )
+
+    clean = validate_balance_sheet(
+        load_balance_sheet("sample_balance_sheet.csv"), mode="strict"
+    )
+    assert clean.attrs["anomalies"] == []
+
+
+if __name__ == "__main__":
+    test_income_anomalies_are_structured()
+    test_balance_identity_check()
+    test_strict_mode_fails_fast()
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+import storage
+import write_queue
+from write_queue import WriteQueue
+from test_storage_columnar import _forecast
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "scenarios.db")
+    monkeypatch.setattr(storage, "DB_NAME", path)
+    storage.init_db()
+    return path
+
+
+def test_saves_and_deletes_are_written_in_order(db):
+    queue = WriteQueue(db)
+    forecast = _forecast()
+    tickets = [queue.save(f"S{i}", 0.05, 0.3, 0.0, forecast) for i in range(5)]
+    assert queue.flush(timeout=10)
+
+    saved = queue.status(tickets)["tickets"]
+    ids = [saved[t]["scenario_id"] for t in tickets]
+    assert all(saved[t]["status"] == "written" for t in tickets)
+
+    queue.delete(ids[0])
+    assert queue.close()
+    names = storage.load_scenarios()["scenario_name"].tolist()
+    assert names == ["S1", "S2", "S3", "S4"]
+
+
+def test_pending_writes_share_one_transaction(db, monkeypatch):
+    queue = WriteQueue(db)
+    release = threading.Event()
+    apply_writes = storage.apply_writes
+
+    def slow_apply(operations, path=None):
+        release.wait(5)
+        return apply_writes(operations, path=path)
+
+    monkeypatch.setattr(storage, "apply_writes", slow_apply)
+    forecast = _forecast()
+    for i in range(10):
+        queue.save(f"S{i}", 0.05, 0.3, 0.0, forecast)
+    assert queue.status()["pending"] == 10
+
+    release.set()
+    assert queue.close()
+    status = queue.status()
+    assert status["written"] == 10
+    assert status["batches"] <= 2
+
+
+def test_failed_write_does_not_block_the_batch(db):
+    queue = WriteQueue(db, synchronous=True)
+    bad = queue.save("Bad", 0.05, 0.3, 0.0, None)
+    good = queue.save("Good", 0.05, 0.3, 0.0, _forecast())
+
+    tickets = queue.status([bad, good])["tickets"]
+    assert tickets[bad]["status"] == "failed"
+    assert tickets[good]["status"] == "written"
+    assert storage.load_scenarios()["scenario_name"].tolist() == ["Good"]
+
+
+def test_synchronous_mode_writes_before_returning(db, monkeypatch):
+    monkeypatch.setenv("FDSS_SYNC_WRITES", "1")
+    queue = write_queue.get_queue()
+    try:
+        assert queue.synchronous
+        queue.save("Now", 0.05, 0.3, 0.0, _forecast())
+        assert len(storage.load_scenarios()) == 1
+    finally:
+        queue.close()
+
+
+def test_closed_queue_rejects_writes(db):
+    queue = WriteQueue(db)
+    queue.close()
+    with pytest.raises(RuntimeError):
+        queue.delete(1)
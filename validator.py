@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
 
+from profiler import profiled
+from compact import MONEY_DTYPE, is_compact, compact_year
+
 # =====================================================
 # Mandatory columns
 # =====================================================
@@ -17,6 +21,9 @@ BALANCE_MANDATORY_COLS = [
     "Equity"
 ]
 
+# Relative tolerance for Assets = Liabilities + Equity
+IDENTITY_TOLERANCE = 0.01
+
 # =====================================================
 # Internal helpers
 # =====================================================
@@ -28,117 +35,186 @@ def _check_mandatory_columns(df, required_cols, statement_name):
         )
 
 
-def _convert_numeric(df, cols):
-    for col in cols:
-        if col != "Year":
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
+def _anomaly(code, column, mask, index, message):
+    return {
+        "code": code,
+        "column": column,
+        "rows": index[mask].to_numpy(),
+        "message": message
+    }
+
+
+def _duplicated_years(year):
+    """
+    Year.duplicated() as an array; strictly increasing years (the usual
+    upload) are recognised without building a hash table.
+    """
+    values = year.to_numpy()
+    if year.dtype.kind in "iu" and (values[1:] > values[:-1]).all():
+        return np.zeros(len(values), dtype=bool)
+    return year.duplicated().to_numpy()
 
 
-def _collect_anomalies(df, mandatory_cols):
+def _scan(df, mandatory_cols, check_identity, fail_fast, dtype=float):
+    """
+    Convert every mandatory column exactly once and run all checks on
+    the converted arrays.
+
+    Returns (converted, keep, anomalies):
+    - converted : {column: numeric ndarray of dtype} (Year is left as is)
+    - keep      : boolean mask of rows with every mandatory value valid
+    - anomalies : list of {code, column, rows, message}
+
+    With fail_fast the first anomaly raises ValueError immediately.
+    """
     anomalies = []
+    index = df.index
 
-    # Missing mandatory values
-    missing_rows = df[df[mandatory_cols].isnull().any(axis=1)]
-    if not missing_rows.empty:
-        anomalies.append(
-            f"{len(missing_rows)} rows have missing mandatory values"
-        )
+    def report(record):
+        if fail_fast:
+            raise ValueError(record["message"])
+        anomalies.append(record)
 
-    # Duplicate years
-    dup_years = df[df.duplicated(subset="Year")]
-    if not dup_years.empty:
-        anomalies.append(
-            f"Duplicate years detected: {dup_years['Year'].tolist()}"
-        )
+    converted = {}
+    keep = np.ones(len(df), dtype=bool)
 
-    # Non-numeric values
     for col in mandatory_cols:
-        if col != "Year":
-            non_numeric = df[pd.to_numeric(df[col], errors="coerce").isna()]
-            if not non_numeric.empty:
-                anomalies.append(
-                    f"Non-numeric values detected in column: {col}"
-                )
+        raw = df[col]
+        missing = raw.isna().to_numpy()
+
+        if missing.any():
+            report(_anomaly(
+                "MISSING_VALUE", col, missing, index,
+                f"{int(missing.sum())} rows have missing values in column: {col}"
+            ))
+
+        if col == "Year":
+            keep &= ~missing
+            continue
+
+        # Columns already in the target dtype are checked in place
+        if raw.dtype == dtype:
+            values = raw.to_numpy()
+        else:
+            values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=dtype)
+        invalid = np.isnan(values)
+        non_numeric = invalid & ~missing
+
+        if non_numeric.any():
+            report(_anomaly(
+                "NON_NUMERIC", col, non_numeric, index,
+                f"Non-numeric values detected in column: {col}"
+            ))
+
+        converted[col] = values
+        keep &= ~invalid
+
+    duplicated = _duplicated_years(df["Year"])
+    if duplicated.any():
+        report(_anomaly(
+            "DUPLICATE_YEAR", "Year", duplicated, index,
+            f"Duplicate years detected: {df['Year'][duplicated].tolist()}"
+        ))
+
+    if check_identity:
+        assets = converted["Total_Assets"]
+        gap = np.abs(
+            assets
+            - converted["Total_Liabilities"]
+            - converted["Equity"]
+        )
+        mismatch = gap > IDENTITY_TOLERANCE * np.maximum(np.abs(assets), 1)
+
+        if mismatch.any():
+            report(_anomaly(
+                "IDENTITY_MISMATCH", "Total_Assets", mismatch, index,
+                f"{int(mismatch.sum())} rows where Assets != Liabilities + Equity"
+            ))
+
+    return converted, keep, anomalies
+
+
+def _validate(df, mandatory_cols, statement_name, mode, check_identity):
+    _check_mandatory_columns(df, mandatory_cols, statement_name)
+
+    # Compact input (float32 from the loader) stays compact
+    compact = is_compact(df)
+    converted, keep, anomalies = _scan(
+        df, mandatory_cols, check_identity, fail_fast=(mode == "strict"),
+        dtype=MONEY_DTYPE if compact else float
+    )
+
+    # Drop rows with missing/non-numeric mandatory values, then
+    # duplicate years among the remaining rows (first one wins)
+    if any(a["code"] == "DUPLICATE_YEAR" for a in anomalies):
+        kept = np.flatnonzero(keep)
+        repeat = df["Year"].iloc[kept].duplicated().to_numpy()
+        keep[kept[repeat]] = False
+
+    # Clean input is only re-wrapped, never copied row by row
+    if keep.all():
+        clean = df.copy(deep=False)
+        for col, values in converted.items():
+            if df[col].dtype != values.dtype:
+                clean[col] = values
+    else:
+        clean = df[keep].copy(deep=False)
+        for col, values in converted.items():
+            clean[col] = values[keep]
+
+    if compact:
+        clean["Year"] = compact_year(clean["Year"])
+
+    # Sort by year
+    if not clean["Year"].is_monotonic_increasing:
+        clean = clean.sort_values("Year")
+
+    clean.attrs["anomalies"] = anomalies
+    if anomalies and mode == "auto_clean_warn":
+        clean.attrs["warnings"] = [a["message"] for a in anomalies]
+
+    return clean
 
-    return anomalies
 
 # =====================================================
 # Income Statement Validation
 # =====================================================
+@profiled
 def validate_income_statement(
     df: pd.DataFrame,
     mode: str = "auto_clean_warn"
 ) -> pd.DataFrame:
     """
     mode:
-    - strict            : reject on any anomaly
+    - strict            : reject on the first anomaly (fail-fast)
     - auto_clean        : clean silently
     - auto_clean_warn   : clean and attach warnings (recommended)
-    """
-
-    df = df.copy()
-
-    _check_mandatory_columns(df, INCOME_MANDATORY_COLS, "Income Statement")
-
-    anomalies = _collect_anomalies(df, INCOME_MANDATORY_COLS)
 
-    if anomalies and mode == "strict":
-        raise ValueError(" | ".join(anomalies))
-
-    # Convert numeric columns
-    df = _convert_numeric(df, INCOME_MANDATORY_COLS)
-
-    # Drop rows with missing mandatory values
-    df = df.dropna(subset=INCOME_MANDATORY_COLS)
-
-    # Remove duplicate years
-    df = df.drop_duplicates(subset="Year")
-
-    # Sort by year
-    df = df.sort_values("Year")
-
-    if anomalies and mode == "auto_clean_warn":
-        df.attrs["warnings"] = anomalies
-
-    return df
+    The structured report is always in df.attrs["anomalies"].
+    """
+    return _validate(
+        df, INCOME_MANDATORY_COLS, "Income Statement", mode,
+        check_identity=False
+    )
 
 # =====================================================
 # Balance Sheet Validation
 # =====================================================
+@profiled
 def validate_balance_sheet(
     df: pd.DataFrame,
     mode: str = "auto_clean_warn"
 ) -> pd.DataFrame:
     """
     mode:
-    - strict            : reject on any anomaly
+    - strict            : reject on the first anomaly (fail-fast)
     - auto_clean        : clean silently
     - auto_clean_warn   : clean and attach warnings (recommended)
-    """
-
-    df = df.copy()
 
-    _check_mandatory_columns(df, BALANCE_MANDATORY_COLS, "Balance Sheet")
-
-    anomalies = _collect_anomalies(df, BALANCE_MANDATORY_COLS)
-
-    if anomalies and mode == "strict":
-        raise ValueError(" | ".join(anomalies))
-
-    # Convert numeric columns
-    df = _convert_numeric(df, BALANCE_MANDATORY_COLS)
-
-    # Drop rows with missing mandatory values
-    df = df.dropna(subset=BALANCE_MANDATORY_COLS)
-
-    # Remove duplicate years
-    df = df.drop_duplicates(subset="Year")
-
-    # Sort by year
-    df = df.sort_values("Year")
-
-    if anomalies and mode == "auto_clean_warn":
-        df.attrs["warnings"] = anomalies
-
-    return df
+    Also checks the identity Assets = Liabilities + Equity. The
+    structured report is always in df.attrs["anomalies"].
+    """
+    return _validate(
+        df, BALANCE_MANDATORY_COLS, "Balance Sheet", mode,
+        check_identity=True
+    )
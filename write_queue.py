@@ -0,0 +1,256 @@
+"""
+Write-behind queue for scenario saves and deletes.
+
+    queue = get_queue()
+    ticket = queue.save("Base", 0.05, 0.3, 0.0, forecast_df)
+    queue.status([ticket])      # pending / written / failed per ticket
+    queue.flush()               # wait until everything is written
+
+save() and delete() return at once; a background thread drains the
+queue and writes whatever is pending as one storage.apply_writes
+transaction, so callers never wait for SQLite. Writes keep their order.
+If a batch fails, its writes are retried one by one so a single bad
+write can't take the others down. Queues are flushed at interpreter
+exit.
+
+Synchronous mode (synchronous=True, or FDSS_SYNC_WRITES=1) writes in
+the calling thread instead, for scripts and tests that need the row on
+disk when the call returns.
+
+Forecast frames are written as they are when the batch runs, so don't
+modify a frame after queueing it.
+"""
+import atexit
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import storage
+
+# Most writes one transaction takes from the queue
+MAX_BATCH = 500
+
+# Ticket results kept for status(); older tickets are dropped first
+KEPT_TICKETS = 1000
+
+# Seconds close() waits for pending writes at shutdown
+SHUTDOWN_TIMEOUT = 10.0
+
+
+class WriteQueue:
+    """Ordered, batched background writer for one database file."""
+
+    def __init__(self, path=None, synchronous=False, max_batch=MAX_BATCH):
+        self.path = os.path.abspath(path or storage.DB_NAME)
+        self.synchronous = synchronous
+        self.max_batch = max_batch
+
+        self._queue = queue.Queue()
+        self._done = threading.Condition()
+        self._outstanding = 0
+        self._ids = itertools.count(1)
+        self._tickets = OrderedDict()
+        self._thread = None
+        self._closed = False
+        self._stats = {
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_batch_seconds": None,
+            "last_error": None
+        }
+
+    # -----------------------------
+    # Submitting
+    # -----------------------------
+    def save(
+        self,
+        scenario_name,
+        revenue_growth,
+        opex_ratio,
+        debt_change,
+        forecast_df,
+        forecast_key=None
+    ) -> int:
+        """Queue a scenario save (see storage.save_scenario). Returns a ticket."""
+        return self._submit(("save", {
+            "scenario_name": scenario_name,
+            "revenue_growth": revenue_growth,
+            "opex_ratio": opex_ratio,
+            "debt_change": debt_change,
+            "forecast_df": forecast_df,
+            "forecast_key": forecast_key
+        }))
+
+    def delete(self, scenario_id) -> int:
+        """Queue a scenario delete. Returns a ticket."""
+        return self._submit(("delete", int(scenario_id)))
+
+    def _submit(self, operation):
+        if self._closed:
+            raise RuntimeError("Write queue is closed")
+
+        kind, arg = operation
+        with self._done:
+            ticket = next(self._ids)
+            self._tickets[ticket] = {
+                "operation": kind,
+                "status": "pending",
+                "scenario_id": arg if kind == "delete" else None,
+                "error": None
+            }
+            while len(self._tickets) > KEPT_TICKETS:
+                self._tickets.popitem(last=False)
+            self._outstanding += 1
+
+        if self.synchronous:
+            self._write([(ticket, operation)])
+        else:
+            self._start_worker()
+            self._queue.put((ticket, operation))
+        return ticket
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def _start_worker(self):
+        with self._done:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="scenario-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        try:
+            stop = False
+            while not stop:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                # None is the stop signal from close()
+                if None in batch:
+                    stop = True
+                    batch = [item for item in batch if item is not None]
+                if batch:
+                    self._write(batch)
+        finally:
+            storage.close_connections()
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        operations = [operation for _, operation in batch]
+
+        try:
+            outcomes = [
+                (scenario_id, None) for scenario_id in
+                storage.apply_writes(operations, path=self.path)
+            ]
+        except Exception:
+            outcomes = [self._write_one(operation) for operation in operations]
+
+        with self._done:
+            for (ticket, _), (scenario_id, error) in zip(batch, outcomes):
+                record = self._tickets.get(ticket)
+                if record is not None:
+                    record["status"] = "failed" if error else "written"
+                    record["scenario_id"] = scenario_id or record["scenario_id"]
+                    record["error"] = error
+                if error:
+                    self._stats["failed"] += 1
+                    self._stats["last_error"] = error
+                else:
+                    self._stats["written"] += 1
+
+            self._stats["batches"] += 1
+            self._stats["last_batch_seconds"] = time.perf_counter() - start
+            self._outstanding -= len(batch)
+            self._done.notify_all()
+
+    def _write_one(self, operation):
+        try:
+            return storage.apply_writes([operation], path=self.path)[0], None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    # -----------------------------
+    # Status and shutdown
+    # -----------------------------
+    def status(self, tickets=None) -> dict:
+        """
+        Queue counters (pending, written, failed, batches,
+        last_batch_seconds, last_error) plus, when tickets are given,
+        {"tickets": {ticket: record}} for the ones still known.
+        """
+        with self._done:
+            status = {"pending": self._outstanding, **self._stats}
+            if tickets is not None:
+                status["tickets"] = {
+                    t: dict(self._tickets[t])
+                    for t in tickets if t in self._tickets
+                }
+        return status
+
+    def pending_deletes(self) -> set:
+        """Scenario ids with a delete that hasn't been written yet."""
+        with self._done:
+            return {
+                record["scenario_id"] for record in self._tickets.values()
+                if record["operation"] == "delete"
+                and record["status"] == "pending"
+            }
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until every queued write is done. False on timeout."""
+        with self._done:
+            return self._done.wait_for(
+                lambda: self._outstanding == 0, timeout
+            )
+
+    def close(self, timeout=SHUTDOWN_TIMEOUT) -> bool:
+        """Flush, then stop the worker. Later submits raise RuntimeError."""
+        self._closed = True
+        flushed = self.flush(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        return flushed
+
+
+# =====================================================
+# Shared queues
+# =====================================================
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue(path=None, synchronous=None) -> WriteQueue:
+    """
+    The process-wide queue for path (default storage.DB_NAME).
+    synchronous=None follows the FDSS_SYNC_WRITES environment variable.
+    """
+    path = os.path.abspath(path or storage.DB_NAME)
+    if synchronous is None:
+        synchronous = os.environ.get("FDSS_SYNC_WRITES", "") not in ("", "0")
+
+    with _queues_lock:
+        write_queue = _queues.get(path)
+        if write_queue is None or write_queue._closed:
+            write_queue = _queues[path] = WriteQueue(path, synchronous)
+        return write_queue
+
+
+@atexit.register
+def close_all(timeout=SHUTDOWN_TIMEOUT):
+    """Flush and stop every shared queue (also runs at exit)."""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for write_queue in queues:
+        write_queue.close(timeout)